@@ -1,30 +1,38 @@
 import json
 import time
-import random
 import re
 import os
 import sqlite3
-from datetime import datetime
-from typing import List, Dict, Any, Optional
-import requests
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Callable
 from urllib.parse import quote_plus
 from rake_nltk import Rake
 
 # Import from other modules
 from config import (
-    DB_FILE, OPENAI_API_KEY, OPENAI_MODEL, CATEGORIES, DEFAULT_CATEGORY,
-    COMPANY_TICKERS, COUNTRY_DATA, trends_cache, trends_last_request,
-    get_pytrends
+    DB_FILE, OPENAI_API_KEY, OPENAI_MODEL, MARKET_DATA_CLIENT, CATEGORIES, DEFAULT_CATEGORY,
+    COMPANY_TICKERS, COUNTRY_DATA,
+    ANALYSIS_REFETCH_AFTER_HOURS, NEAR_DUPLICATE_WAIT_SECONDS,
+    TRENDS_CACHE_DB, TRENDS_CACHE_TTL, TRENDS_CACHE_STALE_SECONDS, TRENDS_CACHE_MAX_ENTRIES,
+    ANALYSIS_PROMPT_VERSION, ANALYSIS_PROMPT_MAX_TOKENS, ANALYSIS_WORKERS,
+    ANALYSIS_STAGE_WORKERS, TREND_SIGNAL_WORKERS
 )
 from database import get_db_connection
+from scrape_retries import record_scrape_failure, clear_scrape_retry
 from utils import get_favicon_url, get_domain_name
+import http_client
+from ttl_cache import PersistentTTLCache
+from trends_broker import get_trends_broker, is_blocked
+from circuit_breaker import get_circuit_breaker, CircuitOpenError
+from llm_cache import get_llm_cache, completion_key
+from llm_usage import llm_call_context, record_llm_call, current_call_context
+from prompt_budget import count_tokens, truncate_tokens, fit_article
+from stage_graph import StageGraph
 
-# OpenAI Setup
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+# OpenAI Setup (one shared async client, see llm_client.py)
+from llm_client import get_llm_client, OPENAI_AVAILABLE
 
 # --- KEYWORD EXTRACTION ---
 def extract_keywords(text: str, top_n: int = 8) -> List[Dict[str, Any]]:
@@ -88,12 +96,33 @@ def extract_keywords(text: str, top_n: int = 8) -> List[Dict[str, Any]]:
 
 
 # --- ENHANCED MULTI-SOURCE TREND ANALYSIS ---
+_trends_cache = None
+_trends_cache_lock = threading.Lock()
+
+# Reddit/HN lookups of _compute_unified_trends (a pool of their own: they never wait on other work)
+_signal_executor = ThreadPoolExecutor(max_workers=TREND_SIGNAL_WORKERS, thread_name_prefix="trend-signals")
+
+
+def get_trends_cache() -> PersistentTTLCache:
+    """Lazy initialization of the persistent unified-trends cache (shared by all threads)."""
+    global _trends_cache
+    with _trends_cache_lock:
+        if _trends_cache is None:
+            _trends_cache = PersistentTTLCache(
+                TRENDS_CACHE_DB, "trends_cache", TRENDS_CACHE_TTL,
+                stale_seconds=TRENDS_CACHE_STALE_SECONDS, max_entries=TRENDS_CACHE_MAX_ENTRIES
+            )
+    return _trends_cache
+
+
+def get_trends_cache_stats() -> Dict[str, Any]:
+    return get_trends_cache().get_stats()
+
+
 def get_unified_trends(keywords: List[str], period_months: int = 6) -> Dict[str, Any]:
     """
     UNIFIED TRENDS OBJECT - Single source of truth for all trend data.
     """
-    global trends_cache, trends_last_request
-    
     # Clean keywords
     clean_keywords = []
     for kw in keywords[:5]:  # Google Trends allows max 5
@@ -101,11 +130,25 @@ def get_unified_trends(keywords: List[str], period_months: int = 6) -> Dict[str,
         if 2 <= len(kw_clean) <= 50:
             clean_keywords.append(kw_clean)
     
+    if not clean_keywords:
+        return _empty_trends_result(clean_keywords, period_months)
+    
+    # Full keyword list and period: any difference changes the graph and the scores
+    cache_key = json.dumps([period_months] + [kw.lower() for kw in clean_keywords])
+    result, state = get_trends_cache().get_or_compute(
+        cache_key, lambda: _compute_unified_trends(clean_keywords, period_months)
+    )
+    if state != "computed":
+        result["cached"] = True
+        print(f"   📊 Using {'stale ' if state == 'stale' else ''}cached trends for '{result['primary_keyword']}'")
+    return result
+
+
+def _empty_trends_result(clean_keywords: List[str], period_months: int) -> Dict[str, Any]:
     primary_keyword = clean_keywords[0] if clean_keywords else "cybersecurity"
-    cache_key = "_".join(clean_keywords[:3]).lower()
     
     # Unified result structure
-    result = {
+    return {
         # === SCORING ===
         "trend_score": 0,                    # Composite 0-100 (for ranking)
         "trend_direction": "stable",         # surging, rising, stable, falling, declining
@@ -162,27 +205,24 @@ def get_unified_trends(keywords: List[str], period_months: int = 6) -> Dict[str,
         "generated_at": datetime.now().isoformat(),
         "cached": False
     }
+
+
+def _compute_unified_trends(clean_keywords: List[str], period_months: int) -> Dict[str, Any]:
+    """Fetch all trend sources for the keywords and build the unified trends object."""
+    result = _empty_trends_result(clean_keywords, period_months)
+    primary_keyword = result["primary_keyword"]
     
-    if not clean_keywords:
-        return result
-    
-    # Check cache (30 min validity)
-    if cache_key in trends_cache:
-        cached = trends_cache[cache_key]
-        if time.time() - cached["timestamp"] < 1800:
-            cached_result = cached["data"].copy()
-            cached_result["cached"] = True
-            print(f"   📊 Using cached trends for '{primary_keyword}'")
-            return cached_result
+    # ====== 2-3. REDDIT AND HACKER NEWS SIGNALS (alongside Google Trends, each fills its own source) ======
+    reddit_future = _signal_executor.submit(_fetch_reddit_signals_unified, primary_keyword, result)
+    hn_future = _signal_executor.submit(_fetch_hackernews_signals_unified, primary_keyword, result)
     
     # ====== 1. GOOGLE TRENDS (Primary Source + Graph Data) ======
     google_score = _fetch_unified_google_trends(clean_keywords, result, period_months)
-    
-    # ====== 2. REDDIT SIGNALS ======
-    reddit_score = _fetch_reddit_signals_unified(primary_keyword, result)
-    
-    # ====== 3. HACKER NEWS SIGNALS ======
-    hn_score = _fetch_hackernews_signals_unified(primary_keyword, result)
+    reddit_score = reddit_future.result()
+    hn_score = hn_future.result()
+    if google_score is None:
+        # Fallback graph is built from the Reddit/HN activity, so it waits for both
+        google_score = _generate_fallback_trend_graph(clean_keywords, result)
     
     # ====== 4. CALCULATE COMPOSITE TREND SCORE ======
     # Weighted: Google 50%, Reddit 25%, HN 25%
@@ -223,60 +263,26 @@ def get_unified_trends(keywords: List[str], period_months: int = 6) -> Dict[str,
     result["trend_direction"] = result["sources"]["google"]["direction"]
     result["change_percent"] = result["sources"]["google"]["change_percent"]
     
-    # Cache result
-    trends_cache[cache_key] = {"data": result, "timestamp": time.time()}
-    
     print(f"   📈 Trend Score: {result['trend_score']} (G:{google_score}, R:{reddit_score}, HN:{hn_score})")
     
     return result
 
 
-def _fetch_unified_google_trends(keywords: List[str], result: Dict, period_months: int) -> int:
+def _fetch_unified_google_trends(keywords: List[str], result: Dict, period_months: int) -> Optional[int]:
     """
     Fetch Google Trends with multi-keyword aggregation for graph plotting.
-    Returns normalized score (0-100).
+    Returns normalized score (0-100), or None if Google Trends failed (fallback graph needed).
     """
-    global trends_last_request
-    
-    # Rate limiting
-    time_since_last = time.time() - trends_last_request
-    if time_since_last < 3:
-        time.sleep(3 - time_since_last)
+    broker = get_trends_broker()
     
     try:
-        pt = get_pytrends()
-        trends_last_request = time.time()
-        
-        # Batch request for all keywords
+        # Keywords are packed with other articles' keywords by the broker
         timeframe = f"today {period_months}-m"
-        
-        # Try to build payload with better error handling
-        try:
-            pt.build_payload(keywords, cat=0, timeframe=timeframe, geo='', gprop='')
-        except Exception as build_error:
-            error_msg = str(build_error)
-            if "400" in error_msg or "429" in error_msg or "rate limit" in error_msg.lower():
-                print(f"   ⚠️ Google Trends blocked during payload build, using fallback")
-                return _generate_fallback_trend_graph(keywords, result)
-            raise  # Re-raise if it's a different error
-        
-        # Try to get interest data
-        try:
-            interest_df = pt.interest_over_time()
-        except Exception as fetch_error:
-            error_msg = str(fetch_error)
-            if "400" in error_msg or "429" in error_msg or "rate limit" in error_msg.lower():
-                print(f"   ⚠️ Google Trends blocked during data fetch, using fallback")
-                return _generate_fallback_trend_graph(keywords, result)
-            raise
+        interest_df, related = broker.interest_over_time(keywords, timeframe)
         
         if interest_df.empty:
             print(f"   ⚠️ Google Trends returned empty data, using fallback")
-            return _generate_fallback_trend_graph(keywords, result)
-        
-        # Drop isPartial column
-        if 'isPartial' in interest_df.columns:
-            interest_df = interest_df.drop(columns=['isPartial'])
+            return None
         
         # Calculate composite score (average across all keywords per date)
         interest_df['composite'] = interest_df.mean(axis=1)
@@ -356,49 +362,26 @@ def _fetch_unified_google_trends(keywords: List[str], result: Dict, period_month
                 elif change < -15:
                     result["sources"]["google"]["direction"] = "falling"
         
-        # === FETCH RELATED QUERIES ===
-        time.sleep(1)
-        try:
-            related = pt.related_queries()
-            primary_kw = keywords[0]
-            if primary_kw in related:
-                rising = related[primary_kw].get('rising')
-                if rising is not None and not rising.empty:
-                    for _, row in rising.head(5).iterrows():
-                        result["sources"]["google"]["related_queries"].append({
-                            "query": row['query'],
-                            "growth": str(row.get('value', 'N/A'))
-                        })
-        except:
-            pass
+        # === RELATED QUERIES (fetched with the interest data) ===
+        result["sources"]["google"]["related_queries"] = related.get(keywords[0], [])
         
         # === FETCH REGIONAL INTEREST ===
-        time.sleep(1)
         try:
-            pt.build_payload([keywords[0]], timeframe='now 7-d', geo='')
-            regions = pt.interest_by_region(resolution='COUNTRY')
-            if not regions.empty:
-                top_regions = regions[keywords[0]].nlargest(5)
-                for country, score in top_regions.items():
-                    if score > 0:
-                        result["sources"]["google"]["trending_regions"].append({
-                            "country": country,
-                            "interest": int(score)
-                        })
+            result["sources"]["google"]["trending_regions"] = broker.trending_regions(keywords[0])
         except:
             pass
         
         return recent_score
         
     except Exception as e:
-        error_msg = str(e)
-        if "400" in error_msg or "429" in error_msg or "rate limit" in error_msg.lower():
+        # Fallback: Generate synthetic graph data from Reddit/HN activity
+        if isinstance(e, CircuitOpenError):
+            print(f"   ⏭️ Google Trends circuit open, using fallback data from Reddit/HN")
+        elif is_blocked(e):
             print(f"   ⚠️ Google Trends rate limited/blocked, using fallback data from Reddit/HN")
-            # Fallback: Generate synthetic graph data from Reddit/HN activity
-            return _generate_fallback_trend_graph(keywords, result)
         else:
             print(f"   ⚠️ Google Trends error: {e}")
-            return _generate_fallback_trend_graph(keywords, result)
+        return None
 
 
 def _generate_fallback_trend_graph(keywords: List[str], result: Dict) -> int:
@@ -466,15 +449,29 @@ def _generate_fallback_trend_graph(keywords: List[str], result: Dict) -> int:
         return 0
 
 
+def source_unhealthy(status_code: int) -> bool:
+    """Responses that count against a source's circuit breaker (blocked, throttled, server errors)."""
+    return status_code in (403, 429) or status_code >= 500
+
+
 def _fetch_reddit_signals_unified(keyword: str, result: Dict) -> int:
     """Fetch Reddit signals. Returns normalized score (0-100)."""
+    breaker = get_circuit_breaker("reddit")
+    if not breaker.allow():
+        return 0
+    
     try:
         search_url = f"https://www.reddit.com/search.json?q={quote_plus(keyword)}&sort=new&limit=25&t=day"
         headers = {"User-Agent": "NewsAnalyzer/3.1"}
         
-        response = requests.get(search_url, headers=headers, timeout=10)
+        response = http_client.get(search_url, headers=headers, timeout=10)
         if response.status_code != 200:
+            if source_unhealthy(response.status_code):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
             return 0
+        breaker.record_success()
         
         data = response.json()
         posts = data.get("data", {}).get("children", [])
@@ -505,22 +502,31 @@ def _fetch_reddit_signals_unified(keyword: str, result: Dict) -> int:
         normalized = min(100, (post_count / 25) * 100 + (avg_score / 100) * 20)
         result["sources"]["reddit"]["score"] = int(normalized)
         
-        time.sleep(1)  # Rate limit
         return int(normalized)
         
     except Exception as e:
+        breaker.record_failure()
         print(f"   ⚠️ Reddit error: {e}")
         return 0
 
 
 def _fetch_hackernews_signals_unified(keyword: str, result: Dict) -> int:
     """Fetch Hacker News signals. Returns normalized score (0-100)."""
+    breaker = get_circuit_breaker("hackernews")
+    if not breaker.allow():
+        return 0
+    
     try:
         search_url = f"https://hn.algolia.com/api/v1/search_by_date?query={quote_plus(keyword)}&tags=story&hitsPerPage=25"
         
-        response = requests.get(search_url, timeout=10)
+        response = http_client.get(search_url, timeout=10)
         if response.status_code != 200:
+            if source_unhealthy(response.status_code):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
             return 0
+        breaker.record_success()
         
         data = response.json()
         hits = data.get("hits", [])
@@ -543,17 +549,66 @@ def _fetch_hackernews_signals_unified(keyword: str, result: Dict) -> int:
         return int(normalized)
         
     except Exception as e:
+        breaker.record_failure()
         print(f"   ⚠️ HN error: {e}")
         return 0
 
 
 # --- COMPREHENSIVE AI ANALYSIS (GPT-4o) ---
-def generate_ai_analysis(text: str, title: str, existing_keywords: List[Dict] = None) -> Dict[str, Any]:
+# Sampling parameters of the analysis completion (part of the response cache key)
+ANALYSIS_PARAMS = {"response_format": {"type": "json_object"}, "temperature": 0.3}
+
+
+def build_analysis_messages(text: str, title: str, existing_keywords: List[Dict] = None) -> List[Dict[str, str]]:
     """
-    Generate comprehensive AI analysis using GPT-4o.
+    Chat messages of the analysis prompt (shared by the interactive and batch paths).
+    The content is fitted into what ANALYSIS_PROMPT_MAX_TOKENS leaves after the rest of the prompt.
+    """
+    # Prepare context
+    keyword_str = ", ".join([k["keyword"] for k in (existing_keywords or [])[:5]])
+    title = truncate_tokens(title or "", 100)
+    system = "You are a cybersecurity analyst. Return only valid JSON."
+    
+    def render(content: str) -> str:
+        return f"""
+    Analyze this cybersecurity news article.
+    
+    Title: {title}
+    Keywords: {keyword_str}
+    Content: {content}
+    
+    Return a JSON object with:
+    1. scores:
+       - confidence_score (0-100): How factual/reliable?
+       - relevance_score (0-100): Impact on tech industry?
+       - sentiment_score (-100 to 100): Negative (breach) to Positive (launch)
+    2. content:
+       - short_description: 2 sentences max (for cards)
+       - long_description: 4-5 sentences (detailed summary)
+       - category: Choose ONE from [Security, Product Launch, Legal, Market, AI, DevOps]
+    3. metadata:
+       - keywords: List of 3-5 key entities/topics
+       - trend_keywords: List of 3-5 terms for Google Trends search
+       - primary_company: Main company involved (or null)
+       - affected_regions: List of 2-letter country codes (e.g. US, CN)
+       - actionable: boolean (true if reader needs to patch/act)
     """
     
-    default_result = {
+    budget = ANALYSIS_PROMPT_MAX_TOKENS - count_tokens(system) - count_tokens(render(""))
+    content = fit_article(title, existing_keywords, text, budget)
+    messages = [
+        {"role": "system", "content": system},
+        {"role": "user", "content": render(content)}
+    ]
+    return messages
+
+
+def analysis_cache_key(messages: List[Dict[str, str]]) -> str:
+    return completion_key(OPENAI_MODEL, ANALYSIS_PROMPT_VERSION, messages, **ANALYSIS_PARAMS)
+
+
+def default_analysis(title: str) -> Dict[str, Any]:
+    return {
         "content": {
             "title": title,
             "short_description": "",
@@ -574,52 +629,36 @@ def generate_ai_analysis(text: str, title: str, existing_keywords: List[Dict] =
             "actionable": False
         }
     }
+
+
+def generate_ai_analysis(text: str, title: str, existing_keywords: List[Dict] = None) -> Dict[str, Any]:
+    """
+    Generate comprehensive AI analysis using GPT-4o.
+    """
+    
+    default_result = default_analysis(title)
     
     if not OPENAI_AVAILABLE or not OPENAI_API_KEY:
         print("   ⚠️ OpenAI not available, skipping AI analysis")
         return default_result
         
     try:
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        
-        # Prepare context
-        keyword_str = ", ".join([k["keyword"] for k in (existing_keywords or [])[:5]])
-        
-        prompt = f"""
-        Analyze this cybersecurity news article.
-        
-        Title: {title}
-        Keywords: {keyword_str}
-        Content: {text[:4000]}
-        
-        Return a JSON object with:
-        1. scores:
-           - confidence_score (0-100): How factual/reliable?
-           - relevance_score (0-100): Impact on tech industry?
-           - sentiment_score (-100 to 100): Negative (breach) to Positive (launch)
-        2. content:
-           - short_description: 2 sentences max (for cards)
-           - long_description: 4-5 sentences (detailed summary)
-           - category: Choose ONE from [Security, Product Launch, Legal, Market, AI, DevOps]
-        3. metadata:
-           - keywords: List of 3-5 key entities/topics
-           - trend_keywords: List of 3-5 terms for Google Trends search
-           - primary_company: Main company involved (or null)
-           - affected_regions: List of 2-letter country codes (e.g. US, CN)
-           - actionable: boolean (true if reader needs to patch/act)
-        """
-        
-        response = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": "You are a cybersecurity analyst. Return only valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.3
-        )
-        
-        result = json.loads(response.choices[0].message.content)
+        messages = build_analysis_messages(text, title, existing_keywords)
+        
+        def create():
+            completion = get_llm_client().complete(messages, model=OPENAI_MODEL, purpose="analysis", **ANALYSIS_PARAMS)
+            return {
+                "result": json.loads(completion["content"]),
+                "usage": completion["usage"],
+                "latency": completion["latency"]
+            }
+        
+        # Unchanged content (re-analysis, duplicates) is answered from the response cache
+        entry, hit = get_llm_cache().get_or_create(analysis_cache_key(messages), create)
+        if hit:
+            print(f"   🤖 AI analysis from cache")
+            record_llm_call("analysis", OPENAI_MODEL, cached=True)
+        result = entry["result"]
         
         # Merge with default structure to ensure all fields exist
         merged = default_result.copy()
@@ -633,12 +672,139 @@ def generate_ai_analysis(text: str, title: str, existing_keywords: List[Dict] =
 
 
 # --- ENHANCED ANALYSIS PIPELINE ---
+def stored_article_details(article: Dict[str, Any],
+                           max_age_hours: Optional[float] = ANALYSIS_REFETCH_AFTER_HOURS) -> Optional[Dict[str, Any]]:
+    """
+    Details from the scrape already stored on the row, or None if they are
+    missing, failed ("Content unavailable.") or older than max_age_hours.
+    """
+    scraped_at = article.get("scraped_at")
+    full_text = article.get("full_text") or ""
+    if not full_text.strip() or full_text == "Content unavailable.":
+        return None
+    if max_age_hours is not None and not scraped_at:
+        return None
+    try:
+        if max_age_hours is not None and \
+                datetime.now() - datetime.fromisoformat(scraped_at) > timedelta(hours=max_age_hours):
+            return None
+        return {
+            "full_text": full_text,
+            "author": article.get("author"),
+            "category": json.loads(article["category"]) if article.get("category") else None,
+            "tags": json.loads(article.get("tags_json") or "[]"),
+            "sources": json.loads(article.get("sources_json") or "[]"),
+            "reading_time": max(1, round(len(full_text.split()) / 200)),
+            "image_url": article.get("image_url"),
+            "media_type": article.get("media_type") or "none"
+        }
+    except (ValueError, TypeError):
+        return None
+
+
+# Analysis columns a near-duplicate copies from its canonical article
+REUSED_ANALYSIS_COLUMNS = [
+    "keywords_json", "trends_json", "ai_summary_json", "ai_analysis_json",
+    "confidence_score", "relevance_score", "sentiment_score", "trend_score",
+    "short_description", "long_description", "ai_category", "actionable",
+    "trend_graph_json", "geo_impact_json", "tech_stack_json", "market_data_json",
+    "actions_json", "enrichment_json"
+]
+
+
+def reuse_canonical_analysis(c: sqlite3.Cursor, article: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Copy the analysis of the article's canonical (near-identical) article onto it.
+    Returns None if the canonical article has not been analyzed yet. Does not commit.
+    """
+    columns = ", ".join(REUSED_ANALYSIS_COLUMNS)
+    c.execute(f"SELECT {columns} FROM articles WHERE id = ? AND analyzed_at IS NOT NULL",
+              (article["duplicate_of"],))
+    row = c.fetchone()
+    if not row:
+        return None
+    assignments = ", ".join(f"{column} = ?" for column in REUSED_ANALYSIS_COLUMNS)
+    analyzed_at = datetime.now().isoformat()
+    c.execute(f"UPDATE articles SET {assignments}, analyzed_at = ? WHERE id = ?",
+              (*row, analyzed_at, article["id"]))
+    article.update(dict(zip(REUSED_ANALYSIS_COLUMNS, row)))
+    article["analyzed_at"] = analyzed_at
+    article["reused_from"] = article["duplicate_of"]
+    return article
+
+
+# Analyses running in this process, so a near-duplicate can wait for its canonical article
+_in_flight: Dict[str, threading.Event] = {}
+_in_flight_lock = threading.Lock()
+
+# Enrichment steps of all articles being analyzed (see the stage graph in _analyze_article)
+_stage_executor = ThreadPoolExecutor(max_workers=ANALYSIS_STAGE_WORKERS, thread_name_prefix="analysis-stage")
+
+
+def record_analysis_timings(c: sqlite3.Cursor, article_id: str, timings: Dict[str, Any]):
+    """Store the step timings of one analysis run in analysis_timings. Does not commit."""
+    c.execute('''
+        INSERT INTO analysis_timings (article_id, run_id, analyzed_at, content_seconds, stages_seconds,
+        graph_seconds, total_seconds, stages_json) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (article_id, current_call_context().get("run_id"), datetime.now().isoformat(), timings["content_seconds"],
+          timings["stages_seconds"], timings["graph_seconds"], timings["total_seconds"], json.dumps(timings["stages"])))
+
+
+def get_analysis_timing_stats(run_id: str = None, limit: int = 200) -> Dict[str, Any]:
+    """
+    Step timings over the last `limit` analysis runs (of one run_id if given): p50/p95
+    per step, and the summed step time against the graph's wall clock.
+    """
+    conn = get_db_connection()
+    if run_id:
+        rows = conn.execute("SELECT * FROM analysis_timings WHERE run_id = ? ORDER BY id DESC LIMIT ?",
+                            (run_id, limit)).fetchall()
+    else:
+        rows = conn.execute("SELECT * FROM analysis_timings ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+    conn.close()
+    
+    samples: Dict[str, List[float]] = {}
+    for row in rows:
+        for name, timing in json.loads(row["stages_json"] or "{}").items():
+            samples.setdefault(name, []).append(timing["seconds"])
+    
+    def p(values: List[float], q: float) -> float:
+        ordered = sorted(values)
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 3) if ordered else 0
+    
+    mean = lambda column: round(sum(row[column] or 0 for row in rows) / len(rows), 3) if rows else 0
+    stages_seconds, graph_seconds = mean("stages_seconds"), mean("graph_seconds")
+    return {
+        "runs": len(rows),
+        "avg_content_seconds": mean("content_seconds"),
+        "avg_stages_seconds": stages_seconds,
+        "avg_graph_seconds": graph_seconds,
+        "avg_total_seconds": mean("total_seconds"),
+        "concurrency_speedup": round(stages_seconds / graph_seconds, 2) if graph_seconds else None,
+        "stages": {name: {"count": len(values), "p50_seconds": p(values, 0.5), "p95_seconds": p(values, 0.95)}
+                   for name, values in samples.items()}
+    }
+
+
 def analyze_article(article_id: str, force: bool = False) -> Dict[str, Any]:
     """
     Run comprehensive AI analysis on article.
     """
+    done = threading.Event()
+    with _in_flight_lock:
+        _in_flight[article_id] = done
+    try:
+        return _analyze_article(article_id, force)
+    finally:
+        with _in_flight_lock:
+            if _in_flight.get(article_id) is done:
+                del _in_flight[article_id]
+        done.set()
+
+
+def _analyze_article(article_id: str, force: bool) -> Dict[str, Any]:
     # Import scraper here to avoid circular dependency
-    from scraper import scrape_article_details
+    from scraper import try_scrape_article_details
     
     conn = get_db_connection()
     c = conn.cursor()
@@ -657,10 +823,45 @@ def analyze_article(article_id: str, force: bool = False) -> Dict[str, Any]:
         return {"message": "Already analyzed"}
     
     print(f"\n🔍 Analyzing: {article['title'][:50]}...")
-    
-    # ====== STEP 1: Scrape article details ======
-    print("   📰 Scraping full content...")
-    details = scrape_article_details(article["url"])
+    started = time.perf_counter()
+    
+    # ====== Near-duplicates reuse their canonical article's analysis ======
+    if article.get("duplicate_of") and not force:
+        with _in_flight_lock:
+            canonical_running = _in_flight.get(article["duplicate_of"])
+        if canonical_running:
+            canonical_running.wait(NEAR_DUPLICATE_WAIT_SECONDS)
+        reused = reuse_canonical_analysis(c, article)
+        if reused:
+            conn.commit()
+            conn.close()
+            print(f"   🪞 Reused analysis of near-duplicate {article['duplicate_of']}")
+            return reused
+    
+    # ====== STEP 1: Article details (reuse a fresh stored scrape) ======
+    details = None if force else stored_article_details(article)
+    if details:
+        print("   📰 Reusing stored scrape")
+    else:
+        print("   📰 Scraping full content...")
+        details, error = try_scrape_article_details(article["url"])
+        if error:
+            # Fall back to older stored content; without any, wait for the retry queue
+            details = stored_article_details(article, max_age_hours=None)
+            if details is None:
+                outcome = record_scrape_failure(conn, article_id, article["url"], error)
+                conn.commit()
+                conn.close()
+                print(f"   ⏸️ Content unavailable ({error.error_class}), analysis deferred "
+                      f"(attempt {outcome['attempts']}, {outcome['status']})")
+                return {"message": "Analysis deferred until content is available",
+                        "deferred": True, "error_class": error.error_class}
+        else:
+            article["scraped_at"] = datetime.now().isoformat()
+            clear_scrape_retry(conn, article_id)
+            # Not held open through the steps: their LLM calls are recorded on other connections
+            conn.commit()
+    content_seconds = time.perf_counter() - started
     
     if len(details["full_text"]) > len(article.get("full_text") or ""):
         article["full_text"] = details["full_text"]
@@ -673,118 +874,93 @@ def analyze_article(article_id: str, force: bool = False) -> Dict[str, Any]:
     article["image_url"] = details["image_url"]
     article["media_type"] = details["media_type"]
     
-    # ====== STEP 2: Extract keywords ======
-    print("   🔑 Extracting keywords...")
-    keywords = extract_keywords(article["full_text"], top_n=8)
-    article["keywords"] = keywords
+    # ====== STEPS 2-9: Enrichment as a dependency graph ======
+    # keywords -> GPT -> trends -> geo impact is the critical path; tech stack, market data and
+    # actions only need the GPT result and run alongside the trend lookups.
+    text, title = article["full_text"], article["title"]
     
-    # ====== STEP 3: GPT-4o AI Analysis ======
-    print("   🤖 Running AI analysis (GPT-4o)...")
-    ai_analysis = generate_ai_analysis(
-        text=article["full_text"],
-        title=article["title"],
-        existing_keywords=keywords
-    )
+    def keywords_stage(done):
+        print("   🔑 Extracting keywords...")
+        return extract_keywords(text, top_n=8)
+    
+    def ai_analysis_stage(done):
+        print("   🤖 Running AI analysis (GPT-4o)...")
+        with llm_call_context(article_id=article_id):
+            ai_analysis = generate_ai_analysis(text=text, title=title, existing_keywords=done["keywords"])
+        
+        # Merge AI keywords with RAKE keywords (the later steps see the merged list)
+        keywords = done["keywords"]
+        ai_keywords = ai_analysis["metadata"]["keywords"]
+        if ai_keywords:
+            keyword_set = {kw["keyword"].lower() for kw in keywords}
+            for ai_kw in ai_keywords:
+                if ai_kw.lower() not in keyword_set:
+                    keywords.append({"keyword": ai_kw, "score": 50})
+        return ai_analysis
+    
+    def trends_stage(done):
+        print("   📊 Fetching unified trends data...")
+        trend_keywords = build_trend_keywords(article, done["ai_analysis"], done["keywords"])
+        trends = get_unified_trends(trend_keywords, period_months=6)
+        done["ai_analysis"]["scores"]["trend_score"] = trends.get("trend_score", 0)
+        return trends
+    
+    def tech_stack_stage(done):
+        print("   🔧 Extracting tech stack...")
+        return extract_tech_stack(text, done["keywords"])
+    
+    def market_data_stage(done):
+        primary_company = done["ai_analysis"]["metadata"].get("primary_company")
+        if not primary_company:
+            return None
+        print(f"   💹 Fetching market data for {primary_company}...")
+        return fetch_market_data(primary_company)
+    
+    def geo_impact_stage(done):
+        print("   🌍 Generating geo impact...")
+        return generate_geo_impact(done["ai_analysis"], text, title, done["trends"])
+    
+    def actions_stage(done):
+        print("   📋 Generating actions...")
+        return generate_actions(done["ai_analysis"], title, done["keywords"])
+    
+    graph = StageGraph()
+    graph.add("keywords", keywords_stage)
+    graph.add("ai_analysis", ai_analysis_stage, after=("keywords",))
+    graph.add("trends", trends_stage, after=("ai_analysis",))
+    graph.add("tech_stack", tech_stack_stage, after=("ai_analysis",))
+    graph.add("market_data", market_data_stage, after=("ai_analysis",))
+    graph.add("geo_impact", geo_impact_stage, after=("trends",))
+    graph.add("actions", actions_stage, after=("ai_analysis",))
+    graph_started = time.perf_counter()
+    done, stage_timings = graph.run(_stage_executor)
+    graph_seconds = time.perf_counter() - graph_started
+    
+    keywords = done["keywords"]
+    ai_analysis = done["ai_analysis"]
+    trends = done["trends"]  # Unified trends object: score, graph, sources, virality
+    tech_stack = done["tech_stack"]
+    market_data = done["market_data"]
+    geo_impact = done["geo_impact"]
+    actions = done["actions"]
+    
+    article["keywords"] = keywords
+    article["ai_analysis"] = ai_analysis
+    article["trends"] = trends
+    article["tech_stack"] = tech_stack
+    article["market_data"] = market_data
+    article["geo_impact"] = geo_impact
+    article["actions"] = actions
     
     # Extract scores and descriptions from AI analysis
     confidence_score = ai_analysis["scores"]["confidence_score"]
     relevance_score = ai_analysis["scores"]["relevance_score"]
     sentiment_score = ai_analysis["scores"]["sentiment_score"]
+    trend_score = ai_analysis["scores"]["trend_score"]
     short_description = ai_analysis["content"]["short_description"]
     long_description = ai_analysis["content"]["long_description"]
     ai_category = ai_analysis["content"]["category"]
     actionable = ai_analysis["metadata"]["actionable"]
-    ai_keywords = ai_analysis["metadata"]["keywords"]
-    
-    # Merge AI keywords with RAKE keywords
-    if ai_keywords:
-        keyword_set = {kw["keyword"].lower() for kw in keywords}
-        for ai_kw in ai_keywords:
-            if ai_kw.lower() not in keyword_set:
-                keywords.append({"keyword": ai_kw, "score": 50})
-    
-    article["ai_analysis"] = ai_analysis
-    
-    # ====== STEP 4: Multi-source Trend Analysis ======
-    print("   📈 Fetching trend data...")
-    
-    # Use AI-extracted trend keywords (preferred) or build from other sources
-    trend_keywords = ai_analysis["metadata"].get("trend_keywords", [])
-    
-    # If no AI trend keywords, fall back to regular keywords
-    if not trend_keywords:
-        if ai_keywords:
-            trend_keywords = ai_keywords[:3]
-    
-    # Add well-known trending terms from title
-    known_trending_terms = {
-        'phishing', 'ransomware', 'malware', 'hacking', 'cybersecurity', 'data breach',
-        'vulnerability', 'exploit', 'zero-day', 'microsoft', 'google', 'apple', 'android',
-        'ios', 'chrome', 'windows', 'linux', 'bitcoin', 'cryptocurrency', 'ai', 'chatgpt',
-        'openai', 'hacker', 'privacy', 'encryption', 'vpn', 'firewall', 'antivirus',
-        'password', 'authentication', 'security', 'cyber attack', 'threat', 'botnet',
-        'crowdstrike', 'cloudflare', 'aws', 'azure', 'nvidia', 'meta', 'facebook'
-    }
-    
-    title_lower = article["title"].lower()
-    for term in known_trending_terms:
-        if term in title_lower and term.title() not in trend_keywords:
-            trend_keywords.insert(0, term.title() if len(term) > 3 else term.upper())
-            break
-    
-    # Add RAKE keywords as fallback
-    for kw in keywords:
-        if len(trend_keywords) >= 5:
-            break
-        kw_text = kw["keyword"]
-        if len(kw_text.split()) <= 2 and len(kw_text) >= 3:
-            if kw_text not in trend_keywords:
-                trend_keywords.append(kw_text)
-    
-    # Fallback: category-based term
-    if not trend_keywords:
-        cat = article.get("category", {})
-        cat_name = cat.get("name", "") if isinstance(cat, dict) else ""
-        cat_to_term = {
-            "Phishing": "Phishing", "Malware": "Malware", "Ransomware": "Ransomware",
-            "Vulnerability": "Security Vulnerability", "Data Breach": "Data Breach",
-            "AI & Machine Learning": "AI Security", "Mobile Security": "Mobile Security"
-        }
-        trend_keywords.append(cat_to_term.get(cat_name, "Cybersecurity"))
-    
-    # ====== STEP 4b: Get UNIFIED Trends (Score + Graph in one call) ======
-    print("   📊 Fetching unified trends data...")
-    trends = get_unified_trends(trend_keywords, period_months=6)
-    
-    # Extract trend_score for AI analysis
-    trend_score = trends.get("trend_score", 0)
-    ai_analysis["scores"]["trend_score"] = trend_score
-    
-    # Store the unified trends object (contains everything: score, graph, sources, virality)
-    article["trends"] = trends
-    
-    # ====== STEP 6: Extract Tech Stack ======
-    print("   🔧 Extracting tech stack...")
-    tech_stack = extract_tech_stack(article["full_text"], keywords)
-    article["tech_stack"] = tech_stack
-    
-    # ====== STEP 7: Fetch Market Data (if primary company identified) ======
-    primary_company = ai_analysis["metadata"].get("primary_company")
-    market_data = None
-    if primary_company:
-        print(f"   💹 Fetching market data for {primary_company}...")
-        market_data = fetch_market_data(primary_company)
-    article["market_data"] = market_data
-    
-    # ====== STEP 5: Generate Geo Impact (uses AI regions + trends data) ======
-    print("   🌍 Generating geo impact...")
-    geo_impact = generate_geo_impact(ai_analysis, article["full_text"], article["title"], trends)
-    article["geo_impact"] = geo_impact
-    
-    # ====== STEP 9: Generate Actions (Jira, Slack) ======
-    print("   📋 Generating actions...")
-    actions = generate_actions(ai_analysis, article["title"], keywords)
-    article["actions"] = actions
     
     # ====== STEP 10: Build Enrichment Object ======
     enrichment = {
@@ -812,6 +988,7 @@ def analyze_article(article_id: str, force: bool = False) -> Dict[str, Any]:
             ai_summary_json = ?,
             image_url = ?,
             media_type = ?,
+            scraped_at = ?,
             analyzed_at = ?,
             -- AI analysis fields --
             ai_analysis_json = ?,
@@ -842,6 +1019,7 @@ def analyze_article(article_id: str, force: bool = False) -> Dict[str, Any]:
         json.dumps(summary),
         article["image_url"],
         article["media_type"],
+        article.get("scraped_at"),
         datetime.now().isoformat(),
         # AI analysis fields
         json.dumps(ai_analysis),
@@ -863,21 +1041,80 @@ def analyze_article(article_id: str, force: bool = False) -> Dict[str, Any]:
         article_id
     ))
     
+    article["timings"] = {
+        "content_seconds": round(content_seconds, 3),
+        "stages": stage_timings,
+        # Sum of the step durations vs. the graph's wall clock: the gain from running steps concurrently
+        "stages_seconds": round(sum(t["seconds"] for t in stage_timings.values()), 3),
+        "graph_seconds": round(graph_seconds, 3),
+        "total_seconds": round(time.perf_counter() - started, 3)
+    }
+    record_analysis_timings(c, article_id, article["timings"])
+    
     conn.commit()
     conn.close()
     
-    print(f"   ✅ Analysis complete!")
+    print(f"   ✅ Analysis complete in {article['timings']['total_seconds']}s (content step {article['timings']['content_seconds']}s, "
+          f"steps {article['timings']['stages_seconds']}s in {article['timings']['graph_seconds']}s)")
     print(f"      📊 Scores: Conf={confidence_score}, Rel={relevance_score}, Sent={sentiment_score}, Trend={trend_score}")
     print(f"      🏷️ Category: {ai_category} | Actionable: {actionable}")
     
-    # Rate limit protection
-    time.sleep(random.uniform(3, 5))
-    
     return article
 
 
 # --- HELPER FUNCTIONS FOR ANALYSIS ---
 
+def build_trend_keywords(article: Dict[str, Any], ai_analysis: Dict, keywords: List[Dict]) -> List[str]:
+    """Google Trends search terms: AI trend keywords, a known term from the title, then RAKE keywords."""
+    ai_keywords = ai_analysis["metadata"]["keywords"]
+    
+    # Use AI-extracted trend keywords (preferred) or build from other sources
+    trend_keywords = ai_analysis["metadata"].get("trend_keywords", [])
+    
+    # If no AI trend keywords, fall back to regular keywords
+    if not trend_keywords:
+        if ai_keywords:
+            trend_keywords = ai_keywords[:3]
+    
+    # Add well-known trending terms from title
+    known_trending_terms = {
+        'phishing', 'ransomware', 'malware', 'hacking', 'cybersecurity', 'data breach',
+        'vulnerability', 'exploit', 'zero-day', 'microsoft', 'google', 'apple', 'android',
+        'ios', 'chrome', 'windows', 'linux', 'bitcoin', 'cryptocurrency', 'ai', 'chatgpt',
+        'openai', 'hacker', 'privacy', 'encryption', 'vpn', 'firewall', 'antivirus',
+        'password', 'authentication', 'security', 'cyber attack', 'threat', 'botnet',
+        'crowdstrike', 'cloudflare', 'aws', 'azure', 'nvidia', 'meta', 'facebook'
+    }
+    
+    title_lower = article["title"].lower()
+    for term in known_trending_terms:
+        if term in title_lower and term.title() not in trend_keywords:
+            trend_keywords.insert(0, term.title() if len(term) > 3 else term.upper())
+            break
+    
+    # Add RAKE keywords as fallback
+    for kw in keywords:
+        if len(trend_keywords) >= 5:
+            break
+        kw_text = kw["keyword"]
+        if len(kw_text.split()) <= 2 and len(kw_text) >= 3:
+            if kw_text not in trend_keywords:
+                trend_keywords.append(kw_text)
+    
+    # Fallback: category-based term
+    if not trend_keywords:
+        cat = article.get("category", {})
+        cat_name = cat.get("name", "") if isinstance(cat, dict) else ""
+        cat_to_term = {
+            "Phishing": "Phishing", "Malware": "Malware", "Ransomware": "Ransomware",
+            "Vulnerability": "Security Vulnerability", "Data Breach": "Data Breach",
+            "AI & Machine Learning": "AI Security", "Mobile Security": "Mobile Security"
+        }
+        trend_keywords.append(cat_to_term.get(cat_name, "Cybersecurity"))
+    
+    return trend_keywords
+
+
 def extract_tech_stack(text: str, keywords: List[Dict]) -> List[str]:
     """Extract tech stack mentions."""
     tech_stack = []
@@ -930,12 +1167,16 @@ def fetch_market_data(company_key: str) -> Dict[str, Any]:
     
     # Check if yfinance is available (imported in main, but we need to check here or import it)
     try:
-        import yfinance as yf
+        if MARKET_DATA_CLIENT == "stub":
+            from standins import stub_yfinance as yf
+        else:
+            import yfinance as yf
         YFINANCE_AVAILABLE = True
     except ImportError:
         YFINANCE_AVAILABLE = False
     
-    if not YFINANCE_AVAILABLE:
+    breaker = get_circuit_breaker("market_data")
+    if not YFINANCE_AVAILABLE or not breaker.allow():
         # Return static data without live price
         return {
             "ticker": ticker_symbol,
@@ -953,6 +1194,7 @@ def fetch_market_data(company_key: str) -> Dict[str, Any]:
         
         last_price = fast_info.get('lastPrice', 0)
         prev_close = fast_info.get('previousClose', 0)
+        breaker.record_success()
         
         change_percent = 0
         if prev_close > 0:
@@ -986,6 +1228,7 @@ def fetch_market_data(company_key: str) -> Dict[str, Any]:
         return result
         
     except Exception as e:
+        breaker.record_failure()
         print(f"   ⚠️ Market data error: {e}")
         return None
 
@@ -1051,24 +1294,53 @@ def generate_actions(ai_analysis: Dict, title: str, keywords: List[Dict]) -> Lis
     return actions
 
 
-def analyze_all_articles(limit: int = 50) -> Dict[str, Any]:
-    """Analyze multiple articles in background."""
+def analyze_all_articles(limit: int = 50, run_id: str = None, article_ids: List[str] = None,
+                         on_analyzed: Callable[[str, bool], None] = None) -> Dict[str, Any]:
+    """
+    Analyze multiple articles in background (LLM calls are recorded under run_id):
+    unanalyzed ones, or exactly article_ids if given. on_analyzed(article_id, failed)
+    is called after every attempt.
+    """
+    run_id = run_id or f"analyze-all:{datetime.now().strftime('%Y%m%d-%H%M%S')}"
     conn = get_db_connection()
     c = conn.cursor()
     
-    # Find unanalyzed articles
-    c.execute("SELECT id FROM articles WHERE analyzed_at IS NULL OR analyzed_at = '' LIMIT ?", (limit,))
+    # Canonical articles go first so their near-duplicates can reuse the result
+    if article_ids is not None:
+        c.execute(f'''
+            SELECT id FROM articles WHERE id IN ({",".join("?" * len(article_ids))})
+            ORDER BY duplicate_of IS NOT NULL LIMIT ?
+        ''', (*article_ids, limit))
+    else:
+        # Those waiting for a scrape retry have no content to analyze yet; URL copies are never analyzed
+        c.execute('''
+            SELECT id FROM articles WHERE (analyzed_at IS NULL OR analyzed_at = '') AND url_alias_of IS NULL
+            AND id NOT IN (SELECT article_id FROM scrape_retries)
+            ORDER BY duplicate_of IS NOT NULL LIMIT ?
+        ''', (limit,))
     rows = c.fetchall()
     conn.close()
     
-    results = {"analyzed": 0, "errors": 0}
+    results = {"analyzed": 0, "errors": 0, "run_id": run_id}
+    lock = threading.Lock()
     
-    for row in rows:
+    def analyze_one(article_id):
         try:
-            analyze_article(row["id"])
-            results["analyzed"] += 1
+            with llm_call_context(run_id=run_id):
+                analyze_article(article_id)
+            outcome = "analyzed"
         except Exception as e:
-            print(f"Error analyzing {row['id']}: {e}")
-            results["errors"] += 1
+            print(f"Error analyzing {article_id}: {e}")
+            outcome = "errors"
+        with lock:
+            results[outcome] += 1
+        if on_analyzed:
+            on_analyzed(article_id, outcome == "errors")
+    
+    # The executor starts tasks in submission order and rows come canonical-first, so a
+    # duplicate starts after its canonical article's analysis and waits to reuse it
+    with ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS) as executor:
+        for row in rows:
+            executor.submit(analyze_one, row["id"])
             
     return results
@@ -0,0 +1,243 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+
+from config import ARCHIVE_DB
+from database import get_db_connection
+from near_dupes import fingerprint_article
+
+# Optional zstd compression (falls back to zlib)
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+
+def compress(data: bytes) -> Tuple[str, bytes]:
+    """Compress raw HTML, returning (codec, payload)."""
+    if ZSTD_AVAILABLE:
+        return "zstd", zstandard.ZstdCompressor(level=10).compress(data)
+    return "zlib", zlib.compress(data, 9)
+
+
+def decompress(codec: str, payload: bytes) -> bytes:
+    if codec == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("zstandard is required to read zstd archive entries")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    return zlib.decompress(payload)
+
+
+class HtmlArchive:
+    """
+    Content-addressed archive of raw fetched HTML.
+    Bodies are stored once per SHA-256 digest; every fetch is logged by URL and time.
+    """
+
+    def __init__(self, db_file: str = ARCHIVE_DB):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS archive_blobs (
+                hash TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                data BLOB NOT NULL,
+                raw_size INTEGER,
+                stored_size INTEGER
+            )
+        ''')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS archive_fetches (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL,
+                fetched_at TEXT NOT NULL,
+                hash TEXT NOT NULL
+            )
+        ''')
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_archive_fetches_url ON archive_fetches(url, fetched_at)")
+        self.conn.commit()
+
+    def store(self, url: str, body: bytes) -> str:
+        """Archive a fetched body and return its content hash."""
+        digest = hashlib.sha256(body).hexdigest()
+        with self.lock:
+            exists = self.conn.execute("SELECT 1 FROM archive_blobs WHERE hash = ?", (digest,)).fetchone()
+            if not exists:
+                codec, payload = compress(body)
+                self.conn.execute(
+                    "INSERT INTO archive_blobs (hash, codec, data, raw_size, stored_size) VALUES (?, ?, ?, ?, ?)",
+                    (digest, codec, payload, len(body), len(payload))
+                )
+            self.conn.execute(
+                "INSERT INTO archive_fetches (url, fetched_at, hash) VALUES (?, ?, ?)",
+                (url, datetime.now().isoformat(), digest)
+            )
+            self.conn.commit()
+        return digest
+
+    def load(self, digest: str) -> Optional[bytes]:
+        with self.lock:
+            row = self.conn.execute("SELECT codec, data FROM archive_blobs WHERE hash = ?", (digest,)).fetchone()
+        return decompress(row[0], row[1]) if row else None
+
+    def latest_hashes(self, urls: List[str]) -> Dict[str, str]:
+        """Map each URL to the hash of its most recent archived fetch."""
+        latest = {}
+        with self.lock:
+            for i in range(0, len(urls), 500):
+                chunk = urls[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.conn.execute(f'''
+                    SELECT url, hash FROM archive_fetches
+                    WHERE url IN ({placeholders})
+                    ORDER BY fetched_at ASC, id ASC
+                ''', chunk).fetchall()
+                for url, digest in rows:
+                    latest[url] = digest
+        return latest
+
+    def latest_pages(self, limit: int = None) -> List[Tuple[str, bytes]]:
+        """(url, body) of the most recent archived fetch of every URL."""
+        query = '''
+            SELECT f.url, b.codec, b.data FROM archive_fetches f
+            JOIN archive_blobs b ON b.hash = f.hash
+            WHERE f.id = (SELECT MAX(id) FROM archive_fetches WHERE url = f.url)
+            ORDER BY f.id
+        '''
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        with self.lock:
+            rows = self.conn.execute(query).fetchall()
+        return [(url, decompress(codec, data)) for url, codec, data in rows]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            blobs, raw, stored = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(stored_size), 0) FROM archive_blobs"
+            ).fetchone()
+            fetches = self.conn.execute("SELECT COUNT(*) FROM archive_fetches").fetchone()[0]
+            urls = self.conn.execute("SELECT COUNT(DISTINCT url) FROM archive_fetches").fetchone()[0]
+        return {
+            "blobs": blobs,
+            "fetches": fetches,
+            "urls": urls,
+            "raw_bytes": raw,
+            "stored_bytes": stored,
+            "compression_ratio": round(raw / stored, 2) if stored else 0,
+            "codec": "zstd" if ZSTD_AVAILABLE else "zlib"
+        }
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_html_archive() -> HtmlArchive:
+    """Lazy initialization of the process-wide HTML archive."""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = HtmlArchive()
+    return _archive
+
+
+def archive_page(url: str, body: bytes) -> Optional[str]:
+    """Archive a fetched page; archiving problems never break scraping."""
+    try:
+        return get_html_archive().store(url, body)
+    except Exception as e:
+        print(f"   ⚠️ Archive error for {url}: {e}")
+        return None
+
+
+# --- REPARSE MODE ---
+_worker_archive = None
+
+
+def _init_reparse_worker():
+    """Give each worker process its own archive connection."""
+    global _worker_archive
+    _worker_archive = HtmlArchive()
+
+
+def _reparse_one(job: Tuple[str, str, str]) -> Tuple[str, Optional[Dict[str, Any]]]:
+    from scraper import parse_source_article
+
+    article_id, digest, url = job
+    try:
+        body = _worker_archive.load(digest)
+        if body is None:
+            return article_id, None
+        return article_id, parse_source_article(url, body)
+    except Exception as e:
+        print(f"   ⚠️ Reparse error for {article_id}: {e}")
+        return article_id, None
+
+
+def reparse_archive(workers: int = None, limit: int = None) -> Dict[str, Any]:
+    """
+    Re-run extraction over archived HTML in parallel and update the articles rows.
+    No network access: only articles with an archived fetch are touched.
+    """
+    start = time.time()
+    workers = workers or os.cpu_count() or 1
+
+    conn = get_db_connection()
+    c = conn.cursor()
+    query = "SELECT id, url, image_url FROM articles"
+    if limit:
+        query += f" LIMIT {int(limit)}"
+    c.execute(query)
+    rows = [dict(row) for row in c.fetchall()]
+
+    latest = get_html_archive().latest_hashes([row["url"] for row in rows])
+    jobs = [(row["id"], latest[row["url"]], row["url"]) for row in rows if row["url"] in latest]
+    existing_images = {row["id"]: row["image_url"] for row in rows}
+
+    print(f"\n♻️ Reparsing {len(jobs)} archived articles with {workers} workers...")
+
+    updated = 0
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_reparse_worker) as executor:
+        for article_id, details in executor.map(_reparse_one, jobs, chunksize=16):
+            if details is None or not (details["full_text"] or "").strip():
+                # Never replace stored text with an empty extraction (a broken or outdated parser)
+                failed += 1
+                continue
+
+            img = details["image_url"] or existing_images.get(article_id)
+            media = details["media_type"] if details["image_url"] else ("image" if img else "none")
+            c.execute('''
+                UPDATE articles SET
+                    full_text = ?, author = ?, category = ?, tags_json = ?,
+                    sources_json = ?, image_url = ?, media_type = ?
+                WHERE id = ?
+            ''', (details["full_text"], details["author"],
+                  json.dumps(details["category"]) if details["category"] else None,
+                  json.dumps(details["tags"]), json.dumps(details["sources"]),
+                  img, media, article_id))
+            # The text changed, so its fingerprint and near-duplicate link may have too
+            fingerprint_article(c, article_id, details["full_text"])
+            updated += 1
+
+    conn.commit()
+    conn.close()
+
+    elapsed = round(time.time() - start, 2)
+    print(f"   ✅ Reparsed {updated} articles in {elapsed}s ({failed} failed, {len(rows) - len(jobs)} not archived)")
+
+    return {
+        "reparsed": updated,
+        "failed": failed,
+        "not_archived": len(rows) - len(jobs),
+        "workers": workers,
+        "seconds": elapsed
+    }
@@ -0,0 +1,238 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from config import DB_FILE, BACKFILL_CHECKPOINT_SECONDS
+from database import get_db_connection
+
+# interactive: analyzed in the ingest pipeline; batch: through the OpenAI Batch API once
+# ingestion is done; none: only stored
+ANALYSIS_MODES = ("interactive", "batch", "none")
+COUNTER_NAMES = ["discovered", "queued", "skipped", "out_of_range", "added", "deferred", "analyzed",
+                 "analysis_errors", "pages"]
+
+# Jobs running in this process, by id (their live counters are fresher than the table)
+_active_jobs: Dict[str, "BackfillJob"] = {}
+_active_lock = threading.Lock()
+
+
+class BackfillJob:
+    """
+    A backfill run persisted in the backfill_jobs table. Counters and the
+    pagination frontier are checkpointed; every persisted article stays in
+    backfill_job_pending until its analysis finishes, so a restart can
+    resume discovery where it stopped and re-queue unfinished analysis.
+    """
+
+    def __init__(self, row: Dict[str, Any]):
+        self.id = row["id"]
+        self.status = row["status"]
+        self.mode = row["mode"]
+        self.analysis = row["analysis"] or "interactive"
+        self.target_count = row["target_count"]
+        self.since = row["since"]
+        self.until = row["until"]
+        self.frontier_url = row["frontier_url"]
+        self.frontier_page = row["frontier_page"] or 0
+        self.counters = {name: 0 for name in COUNTER_NAMES}
+        self.counters.update(json.loads(row["counters_json"] or "{}"))
+        self.active_seconds = row["active_seconds"] or 0.0
+        self.runs = row["runs"] or 0
+        self.error = row["error"]
+        self.created_at = row["created_at"]
+        self.finished_at = row["finished_at"]
+        self.run_started = None
+        self.last_checkpoint = 0.0
+        self.lock = threading.Lock()
+        self.conn = None  # Opened by start(): loaded jobs that only report progress need none
+        self.conn_lock = threading.Lock()
+
+    # --- lifecycle ---
+    def start(self):
+        """Mark the job running in this process."""
+        # Shared by the persist and analyze workers (guarded by conn_lock)
+        self.conn = sqlite3.connect(DB_FILE, check_same_thread=False)
+        with self.lock:
+            self.status = "running"
+            self.runs += 1
+            self.run_started = time.monotonic()
+        with _active_lock:
+            _active_jobs[self.id] = self
+        self.checkpoint(force=True)
+
+    def finish(self, status: str = "completed", error: str = None):
+        with self.lock:
+            self.status = status
+            self.error = error
+            self.finished_at = datetime.now().isoformat()
+            self.active_seconds = self._elapsed()
+            self.run_started = None
+        self.checkpoint(force=True)
+        with _active_lock:
+            _active_jobs.pop(self.id, None)
+        with self.conn_lock:
+            self.conn.close()
+            self.conn = None
+
+    # --- progress ---
+    def increment(self, name: str, amount: int = 1):
+        with self.lock:
+            self.counters[name] += amount
+        self.checkpoint()
+
+    def remaining(self) -> int:
+        """Articles still to add before the target is reached."""
+        with self.lock:
+            return max(0, self.target_count - self.counters["added"])
+
+    def set_mode(self, mode: str):
+        with self.lock:
+            self.mode = mode
+        self.checkpoint(force=True)
+
+    def set_frontier(self, url: Optional[str], page: int):
+        """Next listing page to resume from (only saved once everything before it is persisted)."""
+        with self.lock:
+            self.frontier_url = url
+            self.frontier_page = page
+        self.checkpoint(force=True)
+
+    def add_pending(self, article_id: str):
+        """Record a persisted article whose analysis has not finished yet (durable immediately)."""
+        with self.conn_lock:
+            self.conn.execute("INSERT OR IGNORE INTO backfill_job_pending (job_id, article_id) VALUES (?, ?)",
+                              (self.id, article_id))
+            self.conn.commit()
+
+    def finish_pending(self, article_id: str, failed: bool = False):
+        with self.conn_lock:
+            self.conn.execute("DELETE FROM backfill_job_pending WHERE job_id = ? AND article_id = ?",
+                              (self.id, article_id))
+            self.conn.commit()
+        self.increment("analysis_errors" if failed else "analyzed")
+
+    def pending_article_ids(self) -> List[str]:
+        with self.conn_lock:
+            rows = self.conn.execute("SELECT article_id FROM backfill_job_pending WHERE job_id = ?",
+                                     (self.id,)).fetchall()
+        return [row[0] for row in rows]
+
+    # --- persistence ---
+    def _elapsed(self) -> float:
+        """Active seconds over all runs, including the current one."""
+        return self.active_seconds + (time.monotonic() - self.run_started if self.run_started else 0.0)
+
+    def checkpoint(self, force: bool = False):
+        """Save counters and frontier (at most every BACKFILL_CHECKPOINT_SECONDS unless forced)."""
+        now = time.monotonic()
+        with self.lock:
+            if not force and now - self.last_checkpoint < BACKFILL_CHECKPOINT_SECONDS:
+                return
+            self.last_checkpoint = now
+            values = (self.status, self.mode, self.frontier_url, self.frontier_page, json.dumps(self.counters),
+                      round(self._elapsed(), 2), self.runs, self.error, datetime.now().isoformat(),
+                      self.finished_at, self.id)
+        with self.conn_lock:
+            self.conn.execute('''
+                UPDATE backfill_jobs SET status = ?, mode = ?, frontier_url = ?, frontier_page = ?, counters_json = ?,
+                    active_seconds = ?, runs = ?, error = ?, updated_at = ?, finished_at = ?
+                WHERE id = ?
+            ''', values)
+            self.conn.commit()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Progress and throughput (articles per minute of active time, across restarts)."""
+        with self.lock:
+            counters = dict(self.counters)
+            elapsed = self._elapsed()
+            snapshot = {
+                "id": self.id,
+                "status": self.status,
+                "mode": self.mode,
+                "analysis": self.analysis,
+                "target_count": self.target_count,
+                "since": self.since,
+                "until": self.until,
+                "frontier_page": self.frontier_page,
+                "runs": self.runs,
+                "error": self.error,
+                "created_at": self.created_at,
+                "finished_at": self.finished_at
+            }
+        snapshot.update(counters)
+        snapshot["progress"] = round(min(1.0, counters["added"] / self.target_count), 3) if self.target_count else 1.0
+        snapshot["active_seconds"] = round(elapsed, 1)
+        minutes = elapsed / 60
+        snapshot["added_per_min"] = round(counters["added"] / minutes, 1) if minutes else 0
+        snapshot["analyzed_per_min"] = round(counters["analyzed"] / minutes, 1) if minutes else 0
+        remaining = max(0, self.target_count - counters["added"])
+        snapshot["eta_seconds"] = (round(remaining / snapshot["added_per_min"] * 60)
+                                   if snapshot["added_per_min"] and self.status == "running" else None)
+        return snapshot
+
+
+def create_backfill_job(target_count: int, mode: str, since: str = None, until: str = None,
+                        analysis: str = "interactive") -> BackfillJob:
+    """Insert a new queued job (analysis: one of ANALYSIS_MODES, kept for resumes) and return it."""
+    job_id = str(uuid.uuid4())
+    now = datetime.now().isoformat()
+    conn = get_db_connection()
+    conn.execute('''
+        INSERT INTO backfill_jobs (id, status, mode, analysis, target_count, since, until, counters_json,
+            created_at, updated_at)
+        VALUES (?, 'queued', ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (job_id, mode, analysis, target_count, since, until, json.dumps({name: 0 for name in COUNTER_NAMES}),
+          now, now))
+    conn.commit()
+    conn.close()
+    return load_backfill_job(job_id)
+
+
+def load_backfill_job(job_id: str) -> Optional[BackfillJob]:
+    with _active_lock:
+        if job_id in _active_jobs:
+            return _active_jobs[job_id]
+    conn = get_db_connection()
+    row = conn.execute("SELECT * FROM backfill_jobs WHERE id = ?", (job_id,)).fetchone()
+    conn.close()
+    return BackfillJob(dict(row)) if row else None
+
+
+def unfinished_backfill_job_ids() -> List[str]:
+    """Jobs that were queued or running when the process last stopped."""
+    conn = get_db_connection()
+    rows = conn.execute(
+        "SELECT id FROM backfill_jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+    ).fetchall()
+    conn.close()
+    with _active_lock:
+        return [row[0] for row in rows if row[0] not in _active_jobs]
+
+
+def resume_backfill_jobs() -> List[str]:
+    """Restart every unfinished job in a background thread with its own analysis mode (called at startup)."""
+    from scraper import run_backfill
+
+    job_ids = unfinished_backfill_job_ids()
+    for job_id in job_ids:
+        print(f"♻️ Resuming backfill job {job_id}")
+        threading.Thread(target=run_backfill, kwargs={"job_id": job_id},
+                         name=f"backfill-{job_id[:8]}", daemon=True).start()
+    return job_ids
+
+
+def get_backfill_job_stats(job_id: str = None, limit: int = 10) -> Dict[str, Any]:
+    """Progress and throughput of one job, or of the most recent ones."""
+    if job_id:
+        job = load_backfill_job(job_id)
+        return job.snapshot() if job else None
+
+    conn = get_db_connection()
+    rows = conn.execute("SELECT id FROM backfill_jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+    conn.close()
+    jobs = [load_backfill_job(row[0]) for row in rows]
+    return {"jobs": [job.snapshot() for job in jobs if job]}
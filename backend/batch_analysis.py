@@ -0,0 +1,238 @@
+import json
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Tuple, Callable
+
+from config import OPENAI_MODEL, BATCH_MAX_REQUESTS, BATCH_POLL_SECONDS, BATCH_COMPLETION_WINDOW
+from database import get_db_connection
+from llm_cache import get_llm_cache
+from llm_client import get_llm_client, completion_cost
+from llm_usage import record_llm_call
+
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def prepare_batch_requests(limit: int, article_ids: List[str] = None) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+    """
+    Batch API request lines for the GPT step of up to `limit` unanalyzed canonical articles
+    (only those among article_ids if given), built exactly as analyze_article would (same
+    messages, same response cache key). Articles without a fresh stored scrape or with a
+    cached response are left out. Returns (requests, {custom_id: cache key}).
+    """
+    from analysis import (
+        stored_article_details, extract_keywords, build_analysis_messages, analysis_cache_key, ANALYSIS_PARAMS
+    )
+
+    scope, params = "", []
+    if article_ids is not None:
+        scope = f"AND id IN ({','.join('?' * len(article_ids))})"
+        params = list(article_ids)
+    conn = get_db_connection()
+    rows = conn.execute(f'''
+        SELECT * FROM articles WHERE (analyzed_at IS NULL OR analyzed_at = '')
+        AND duplicate_of IS NULL AND url_alias_of IS NULL AND id NOT IN (SELECT article_id FROM scrape_retries) {scope}
+        LIMIT ?
+    ''', (*params, limit)).fetchall()
+    conn.close()
+
+    cache = get_llm_cache()
+    requests, keys = [], {}
+    for row in rows:
+        article = dict(row)
+        if stored_article_details(article) is None:
+            continue  # analyze_article scrapes it first; left to the per-article path
+        keywords = extract_keywords(article["full_text"], top_n=8)
+        messages = build_analysis_messages(article["full_text"], article["title"], keywords)
+        key = analysis_cache_key(messages)
+        if cache.lookup(key)[1] is not None:
+            continue
+        requests.append({
+            "custom_id": article["id"],
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {"model": OPENAI_MODEL, "messages": messages, **ANALYSIS_PARAMS}
+        })
+        keys[article["id"]] = key
+    return requests, keys
+
+
+def submit_batch(requests: List[Dict[str, Any]], keys: Dict[str, str]) -> str:
+    """Upload the JSONL input, create the batch and record it in analysis_batches."""
+    llm = get_llm_client()
+    body = "\n".join(json.dumps(request) for request in requests).encode("utf-8")
+    input_file = llm.run(llm.client.files.create(file=("analysis_batch.jsonl", body), purpose="batch"))
+    batch = llm.run(llm.client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window=BATCH_COMPLETION_WINDOW
+    ))
+    conn = get_db_connection()
+    conn.execute('''
+        INSERT INTO analysis_batches (id, status, input_file_id, request_count, keys_json, submitted_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (batch.id, batch.status, input_file.id, len(requests), json.dumps(keys), datetime.now().isoformat()))
+    conn.commit()
+    conn.close()
+    print(f"   📦 Submitted batch {batch.id} ({len(requests)} requests, {len(body) / 1024:.0f} KB)")
+    return batch.id
+
+
+def wait_for_batch(batch_id: str, poll_seconds: float = BATCH_POLL_SECONDS):
+    """Poll until the batch reaches a terminal status; its progress is saved on every poll."""
+    llm = get_llm_client()
+    while True:
+        batch = llm.run(llm.client.batches.retrieve(batch_id))
+        counts = batch.request_counts
+        conn = get_db_connection()
+        conn.execute('''
+            UPDATE analysis_batches SET status = ?, output_file_id = ?, error_file_id = ?, completed = ?, failed = ?,
+            completed_at = ? WHERE id = ?
+        ''', (batch.status, batch.output_file_id, batch.error_file_id, counts.completed if counts else 0,
+              counts.failed if counts else 0,
+              datetime.fromtimestamp(batch.completed_at).isoformat() if batch.completed_at else None, batch_id))
+        conn.commit()
+        conn.close()
+        if batch.status in TERMINAL_STATUSES:
+            return batch
+        print(f"   ⏳ Batch {batch_id}: {batch.status} "
+              f"({counts.completed if counts else 0}/{counts.total if counts else '?'} done)")
+        time.sleep(poll_seconds)
+
+
+def apply_batch(batch_id: str, run_id: str = None) -> Dict[str, Any]:
+    """
+    Store every successful response of a finished batch in the LLM response cache under
+    its article's key, so analyze_article's GPT step is a cache hit. Failed requests are
+    left to the per-article path. Each response is recorded in llm_calls under run_id.
+    """
+    conn = get_db_connection()
+    row = conn.execute("SELECT * FROM analysis_batches WHERE id = ?", (batch_id,)).fetchone()
+    conn.close()
+    keys = json.loads(row["keys_json"] or "{}")
+    llm = get_llm_client()
+    cache = get_llm_cache()
+
+    applied, failed, prompt_tokens, completion_tokens = 0, 0, 0, 0
+    lines = []
+    if row["output_file_id"]:
+        lines = llm.run(llm.client.files.content(row["output_file_id"])).content.decode("utf-8").splitlines()
+    for line in lines:
+        if not line.strip():
+            continue
+        result = json.loads(line)
+        response = result.get("response") or {}
+        key = keys.get(result.get("custom_id"))
+        if key is None or response.get("status_code") != 200:
+            failed += 1
+            continue
+        body = response["body"]
+        try:
+            analysis = json.loads(body["choices"][0]["message"]["content"])
+        except (KeyError, IndexError, ValueError):
+            failed += 1
+            continue
+        usage = body.get("usage") or {}
+        prompt_tokens += usage.get("prompt_tokens", 0)
+        completion_tokens += usage.get("completion_tokens", 0)
+        record_llm_call("analysis", body.get("model") or OPENAI_MODEL, usage.get("prompt_tokens", 0),
+                        usage.get("completion_tokens", 0), batch=True,
+                        article_id=result["custom_id"], run_id=run_id or f"batch:{batch_id}")
+        cache.store(key, {"result": analysis, "usage": usage, "latency": 0.0, "batch_id": batch_id})
+        applied += 1
+    failed += max(0, row["request_count"] - applied - failed)
+
+    cost = completion_cost(OPENAI_MODEL, prompt_tokens, completion_tokens, batch=True)
+    conn = get_db_connection()
+    conn.execute('''
+        UPDATE analysis_batches SET prompt_tokens = ?, completion_tokens = ?, cost_usd = ?, applied_at = ?
+        WHERE id = ?
+    ''', (prompt_tokens, completion_tokens, cost, datetime.now().isoformat(), batch_id))
+    conn.commit()
+    conn.close()
+    return {
+        "batch_id": batch_id,
+        "applied": applied,
+        "failed": failed,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "cost_usd": round(cost, 4),
+        "interactive_cost_usd": round(completion_cost(OPENAI_MODEL, prompt_tokens, completion_tokens), 4)
+    }
+
+
+def run_batch_analysis(limit: int = 1000, analyze: bool = True, poll_seconds: float = BATCH_POLL_SECONDS,
+                       article_ids: List[str] = None, on_analyzed: Callable[[str, bool], None] = None,
+                       run_id: str = None) -> Dict[str, Any]:
+    """
+    Analyze up to `limit` pending articles (only article_ids if given) with the GPT step
+    done through the Batch API: finish any batch left over from an earlier run, submit
+    the pending articles' requests, wait, cache the responses, then run
+    analyze_all_articles (trends, market data and the row update per article, with every
+    batched GPT call answered from the cache; on_analyzed is passed through).
+    """
+    from analysis import analyze_all_articles
+
+    started = time.perf_counter()
+    run_id = run_id or f"batch-run:{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    conn = get_db_connection()
+    leftover = [row["id"] for row in conn.execute(
+        "SELECT id FROM analysis_batches WHERE applied_at IS NULL AND status NOT IN ('failed', 'cancelled')"
+    ).fetchall()]
+    conn.close()
+    if leftover:
+        print(f"   ♻️ Resuming {len(leftover)} unfinished batch(es)")
+
+    def finish(batch_ids: List[str]) -> List[Dict[str, Any]]:
+        applied = []
+        for batch_id in batch_ids:
+            batch = wait_for_batch(batch_id, poll_seconds)
+            print(f"   📦 Batch {batch_id} {batch.status}")
+            applied.append(apply_batch(batch_id, run_id))
+        return applied
+
+    # Leftover responses are cached first so their articles are not requested again
+    batches = finish(leftover)
+    requests, keys = prepare_batch_requests(limit, article_ids)
+    batch_ids = []
+    for i in range(0, len(requests), BATCH_MAX_REQUESTS):
+        chunk = requests[i:i + BATCH_MAX_REQUESTS]
+        batch_ids.append(submit_batch(chunk, {r["custom_id"]: keys[r["custom_id"]] for r in chunk}))
+    batches += finish(batch_ids)
+    batch_seconds = time.perf_counter() - started
+
+    analysis = (analyze_all_articles(limit, run_id=run_id, article_ids=article_ids, on_analyzed=on_analyzed)
+                if analyze else None)
+    report = {
+        "run_id": run_id,
+        "requests": len(requests),
+        "batches": batches,
+        "applied": sum(b["applied"] for b in batches),
+        "failed": sum(b["failed"] for b in batches),
+        "cost_usd": round(sum(b["cost_usd"] for b in batches), 4),
+        "interactive_cost_usd": round(sum(b["interactive_cost_usd"] for b in batches), 4),
+        "batch_seconds": round(batch_seconds, 2),
+        "analysis": analysis,
+        "wall_seconds": round(time.perf_counter() - started, 2)
+    }
+    print(f"✅ Batch analysis: {report['applied']} responses applied ({report['failed']} failed), "
+          f"${report['cost_usd']} (interactive: ${report['interactive_cost_usd']}) in {report['wall_seconds']}s")
+    return report
+
+
+def get_batch_stats(limit: int = 20) -> Dict[str, Any]:
+    """Recent batches with their status, progress, tokens and cost."""
+    conn = get_db_connection()
+    rows = conn.execute('''
+        SELECT id, status, request_count, completed, failed, prompt_tokens, completion_tokens, cost_usd,
+        submitted_at, completed_at, applied_at FROM analysis_batches ORDER BY submitted_at DESC LIMIT ?
+    ''', (limit,)).fetchall()
+    totals = conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(request_count), 0), COALESCE(SUM(cost_usd), 0) FROM analysis_batches"
+    ).fetchone()
+    conn.close()
+    return {
+        "batches": [dict(row) for row in rows],
+        "total_batches": totals[0],
+        "total_requests": totals[1],
+        "total_cost_usd": round(totals[2], 4)
+    }
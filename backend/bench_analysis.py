@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-article analysis latency with and without the STEP 1 refetch.
+
+Articles are served by a local fixture server and ingested first, as the scraper
+does. Each is then analyzed twice: "refetch" (force=True, the old behaviour of
+downloading and parsing again) and "reuse" (the stored scrape is fresh).
+GPT, Trends and market data are replaced with fixed-latency fakes so only the
+content step differs between the two runs.
+
+Usage:
+    python bench_analysis.py [--articles 20] [--latency 0.3] [--external 0.5]
+"""
+import statistics
+import time
+
+from benchtools import bench_parser, enter_temp_dir
+
+from fixtures import start_fixture_server
+
+
+def main():
+    parser = bench_parser(__doc__)
+    parser.add_argument("--articles", type=int, default=20, help="Articles to analyze")
+    parser.add_argument("--latency", type=float, default=0.3, help="Fixture server latency per page (seconds)")
+    parser.add_argument("--external", type=float, default=0.5, help="Fake GPT + trends latency per article (seconds)")
+    args = parser.parse_args()
+
+    enter_temp_dir("bench_analysis")
+
+    import analysis
+    from database import init_db, get_db_connection
+    from scraper import scrape_article_details, insert_article
+
+    def fake_ai_analysis(text, title, existing_keywords=None):
+        time.sleep(args.external / 2)
+        return {
+            "content": {"title": title, "short_description": "", "long_description": "", "category": "Security"},
+            "scores": {"confidence_score": 50, "relevance_score": 50, "sentiment_score": 0, "trend_score": 0},
+            "metadata": {"keywords": [], "trend_keywords": ["Ransomware"], "primary_company": None,
+                         "affected_regions": [], "actionable": False}
+        }
+
+    def fake_trends(keywords, period_months=6):
+        time.sleep(args.external / 2)
+        return {"trend_score": 0}
+
+    analysis.generate_ai_analysis = fake_ai_analysis
+    analysis.get_unified_trends = fake_trends
+    analysis.generate_geo_impact = lambda *a: {}
+
+    server = start_fixture_server(args.latency)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    init_db()
+    conn = get_db_connection()
+    ids = []
+    for i in range(args.articles):
+        entry = {"url": f"{base}/article/{i}", "title": f"Ransomware article {i}", "published": "Nov 28, 2025"}
+        ids.append(insert_article(conn.cursor(), entry, scrape_article_details(entry["url"]), True))
+    conn.commit()
+
+    results = {}
+    for mode in ("refetch", "reuse"):
+        conn.execute("UPDATE articles SET analyzed_at = NULL")
+        conn.commit()
+        totals = []
+        content = []
+        for article_id in ids:
+            article = analysis.analyze_article(article_id, force=(mode == "refetch"))
+            totals.append(article["timings"]["total_seconds"])
+            content.append(article["timings"]["content_seconds"])
+        results[mode] = (statistics.mean(totals), statistics.mean(content))
+    conn.close()
+    server.shutdown()
+
+    print(f"\n📊 Per-article analysis latency ({args.articles} articles, {args.latency}s page latency, "
+          f"{args.external}s fake external calls)")
+    print(f"{'mode':>8} {'total ms':>10} {'content ms':>11}")
+    for mode, (total, content_step) in results.items():
+        print(f"{mode:>8} {total * 1000:>10.1f} {content_step * 1000:>11.1f}")
+    saved = results["refetch"][0] - results["reuse"][0]
+    print(f"\nReusing the stored scrape saves {saved * 1000:.0f} ms per article "
+          f"({saved / results['refetch'][0] * 100:.0f}%) and one page download")
+
+
+if __name__ == "__main__":
+    main()
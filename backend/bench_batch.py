@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Compare batch analysis (OpenAI Batch API) with the per-article path: wall clock and
+cost for analyzing the same ingested articles.
+
+Articles are ingested from the stand-in site without analysis, analyzed per article
+(interactive completions paced by the configured token budget), then marked pending
+again and analyzed in batch mode against the stand-in Batch API, which completes a
+batch --batch-seconds after submission. The prompt version differs between the runs
+so the second one starts with a cold response cache.
+
+Usage:
+    python bench_batch.py [--articles 100] [--openai-latency 2.0] [--batch-seconds 10] [--tpm 30000]
+"""
+import os
+import time
+
+from benchtools import bench_parser, enter_temp_dir, lift_rate_limits
+
+from standins import start_standins, standin_environment
+
+
+def main():
+    parser = bench_parser(__doc__)
+    parser.add_argument("--articles", type=int, default=100, help="Articles to analyze")
+    parser.add_argument("--openai-latency", type=float, default=2.0, help="Stand-in completion latency (seconds)")
+    parser.add_argument("--batch-seconds", type=float, default=10.0, help="Stand-in batch processing time")
+    parser.add_argument("--tpm", type=int, default=None, help="LLM_TOKENS_PER_MINUTE (default: config)")
+    args = parser.parse_args()
+
+    enter_temp_dir("bench_batch")
+    servers = start_standins(args.articles + 20, latency=0.0, openai_latency=args.openai_latency)
+    os.environ.update(standin_environment(servers))
+    os.environ["STANDIN_BATCH_SECONDS"] = str(args.batch_seconds)
+    if args.tpm:
+        os.environ["LLM_TOKENS_PER_MINUTE"] = str(args.tpm)
+
+    lift_rate_limits("thehackernews", "reddit", "hackernews", "google_trends")
+    import config
+    import analysis
+    from batch_analysis import run_batch_analysis
+    from database import init_db, get_db_connection
+    from llm_client import get_llm_client, completion_cost
+    from scraper import run_backfill
+
+    init_db()
+    run_backfill(target_count=args.articles, mode="pages", analysis="none")
+    conn = get_db_connection()
+    pending = conn.execute("SELECT COUNT(*) FROM articles WHERE analyzed_at IS NULL").fetchone()[0]
+    conn.close()
+
+    # --- per-article path ---
+    llm = get_llm_client()
+    start = time.perf_counter()
+    interactive = analysis.analyze_all_articles(pending)
+    interactive_seconds = time.perf_counter() - start
+    stats = llm.get_stats()
+    interactive_cost = completion_cost(config.OPENAI_MODEL, stats["prompt_tokens"], stats["completion_tokens"])
+
+    # --- batch path, same articles, cold response cache ---
+    conn = get_db_connection()
+    conn.execute("UPDATE articles SET analyzed_at = NULL")
+    conn.commit()
+    conn.close()
+    analysis.ANALYSIS_PROMPT_VERSION = "bench-batch"
+    report = run_batch_analysis(pending, poll_seconds=1.0)
+
+    for server in servers.values():
+        server.stop()
+    print(f"\n📦 {pending} articles, {args.openai_latency}s completions, "
+          f"{config.LLM_TOKENS_PER_MINUTE if not args.tpm else args.tpm} TPM, {args.batch_seconds}s batch turnaround")
+    print(f"{'path':>12} {'analyzed':>9} {'wall s':>8} {'GPT s':>8} {'cost $':>9}")
+    print(f"{'per-article':>12} {interactive['analyzed']:>9} {interactive_seconds:>8.1f} {'':>8} {interactive_cost:>9.4f}")
+    print(f"{'batch':>12} {report['analysis']['analyzed']:>9} {report['wall_seconds']:>8.1f} "
+          f"{report['batch_seconds']:>8.1f} {report['cost_usd']:>9.4f}")
+    print(f"\n   Batch responses applied: {report['applied']} ({report['failed']} failed); "
+          f"same tokens interactively: ${report['interactive_cost_usd']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark detect_category over the stored corpus and check it against the old
+per-keyword str.count implementation (the results must be identical).
+
+Uses title + full_text of every stored article. With an empty database,
+generated articles built from the keyword tables are used instead.
+
+Usage:
+    python bench_category.py [--limit N] [--repeat 3]
+"""
+import random
+import sys
+import time
+
+from benchtools import bench_parser
+
+from config import CATEGORIES, DEFAULT_CATEGORY
+from database import get_db_connection
+from scraper import detect_category, AHOCORASICK_AVAILABLE
+
+
+def detect_category_legacy(title: str, text: str):
+    """The implementation detect_category replaced: one str.count per keyword."""
+    combined = (title + " " + text[:2000]).lower()
+
+    scores = {}
+    for cat_id, cat_info in CATEGORIES.items():
+        score = 0
+        for keyword in cat_info["keywords"]:
+            count = combined.count(keyword.lower())
+            if keyword.lower() in title.lower():
+                count += 3
+            score += count
+        if score > 0:
+            scores[cat_id] = score
+
+    if scores:
+        best_cat = max(scores, key=scores.get)
+        return {"id": best_cat, "name": CATEGORIES[best_cat]["name"]}
+
+    return DEFAULT_CATEGORY
+
+
+def load_corpus(limit: int = None):
+    """(title, text) pairs from the articles table, or generated ones if it is empty."""
+    try:
+        conn = get_db_connection()
+        rows = conn.execute(
+            "SELECT title, full_text FROM articles WHERE full_text IS NOT NULL LIMIT ?", (limit or -1,)
+        ).fetchall()
+        conn.close()
+    except Exception:
+        rows = []
+    if rows:
+        return [(row["title"] or "", row["full_text"]) for row in rows], "database"
+
+    rng = random.Random(42)
+    keywords = [k for cat in CATEGORIES.values() for k in cat["keywords"]]
+    filler = "the attackers said in a report that the company later confirmed an incident".split()
+
+    def sentence(n):
+        words = [rng.choice(keywords) if rng.random() < 0.15 else rng.choice(filler) for _ in range(n)]
+        # Glue some words together and vary case so substring matches and overlaps occur
+        return "".join(w + ("" if rng.random() < 0.1 else " ") for w in words).title() if rng.random() < 0.3 \
+            else " ".join(words)
+
+    corpus = [(sentence(rng.randint(3, 12)), " ".join(sentence(rng.randint(5, 30)) for _ in range(30)))
+              for _ in range(limit or 2000)]
+    corpus += [("", ""), ("Ransomware", ""), ("", "ransomransomware aaa")]
+    return corpus, "generated"
+
+
+def main():
+    parser = bench_parser(__doc__)
+    parser.add_argument("--limit", type=int, default=None, help="Max articles")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes per implementation (best is kept)")
+    args = parser.parse_args()
+
+    corpus, source = load_corpus(args.limit)
+
+    mismatches = [(title, text) for title, text in corpus
+                  if detect_category(title, text) != detect_category_legacy(title, text)
+                  or detect_category(title, "") != detect_category_legacy(title, "")]
+    if mismatches:
+        for title, _ in mismatches[:10]:
+            print(f"  ❌ {title[:60]!r}")
+        print(f"\n❌ {len(mismatches)} of {len(corpus)} articles categorized differently")
+        sys.exit(1)
+
+    def best_time(fn):
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            for title, text in corpus:
+                fn(title, text)
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    legacy = best_time(detect_category_legacy)
+    compiled = best_time(detect_category)
+    print(f"\n📊 detect_category over {len(corpus)} articles ({source}), identical results")
+    print(f"   str.count per keyword: {legacy * 1000:8.1f} ms ({legacy / len(corpus) * 1e6:6.1f} µs/article)")
+    matcher = "Aho-Corasick" if AHOCORASICK_AVAILABLE else "str.count fallback, pyahocorasick not installed"
+    print(f"   compiled matcher ({matcher}):")
+    print(f"                          {compiled * 1000:8.1f} ms ({compiled / len(corpus) * 1e6:6.1f} µs/article)")
+    print(f"   speedup: {legacy / compiled:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark listing-page de-duplication cost against corpus size.
+
+Compares the legacy per-entry `SELECT ... WHERE url = ?` (unindexed) with the
+seen-URL index (Bloom filter + one batched query on the unique canonical_url index).
+
+Usage:
+    python bench_dedupe.py [--sizes 1000,100000,1000000] [--pages 50] [--legacy-pages 3]
+"""
+import time
+import uuid
+
+from benchtools import bench_parser, enter_temp_dir
+
+PAGE_SIZE = 12  # Entries per thehackernews.com listing page
+
+
+def article_url(n: int) -> str:
+    return f"https://thehackernews.com/{2000 + n % 26}/{n % 12 + 1:02d}/article-{n}.html"
+
+
+def populate(conn, size: int):
+    from utils import canonicalize_url
+
+    conn.execute("DELETE FROM articles")
+    batch = []
+    for n in range(size):
+        url = article_url(n)
+        batch.append((str(uuid.uuid4()), f"Article {n}", url, canonicalize_url(url)))
+        if len(batch) == 10000:
+            conn.executemany("INSERT INTO articles (id, title, url, canonical_url) VALUES (?, ?, ?, ?)", batch)
+            batch = []
+    conn.executemany("INSERT INTO articles (id, title, url, canonical_url) VALUES (?, ?, ?, ?)", batch)
+    conn.commit()
+
+
+def candidate_pages(size: int, pages: int):
+    """Listing pages as seen in steady state: mostly new URLs, one already stored."""
+    return [
+        [article_url(size + p * PAGE_SIZE + i) for i in range(PAGE_SIZE - 1)] + [article_url(p % size)]
+        for p in range(pages)
+    ]
+
+
+def legacy_check(c, urls):
+    known = set()
+    for url in urls:
+        c.execute("SELECT id FROM articles WHERE url = ?", (url,))
+        if c.fetchone():
+            known.add(url)
+    return known
+
+
+def main():
+    parser = bench_parser(__doc__)
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="Comma-separated stored article counts")
+    parser.add_argument("--pages", type=int, default=50, help="Listing pages checked with the index")
+    parser.add_argument("--legacy-pages", type=int, default=3, help="Listing pages checked the legacy way")
+    args = parser.parse_args()
+
+    enter_temp_dir("bench_dedupe")
+
+    from database import init_db, get_db_connection
+    from seen_urls import SeenUrlIndex
+
+    init_db()
+    conn = get_db_connection()
+    c = conn.cursor()
+
+    print(f"\n📊 De-duplication cost per listing page ({PAGE_SIZE} entries)")
+    print(f"{'stored':>10} {'legacy ms':>11} {'index ms':>10} {'speedup':>9} {'preload s':>10} {'bloom MB':>9} {'FP':>5}")
+
+    for size in [int(x) for x in args.sizes.split(",")]:
+        populate(conn, size)
+
+        start = time.perf_counter()
+        index = SeenUrlIndex()
+        preload = time.perf_counter() - start
+
+        legacy_pages = candidate_pages(size, args.legacy_pages)
+        start = time.perf_counter()
+        legacy_results = [legacy_check(c, urls) for urls in legacy_pages]
+        legacy_ms = (time.perf_counter() - start) / len(legacy_pages) * 1000
+
+        index_pages = candidate_pages(size, args.pages)
+        start = time.perf_counter()
+        index_results = [index.find_known(c, urls) for urls in index_pages]
+        index_ms = (time.perf_counter() - start) / len(index_pages) * 1000
+
+        assert index_results[:len(legacy_results)] == legacy_results
+        stats = index.get_stats()
+        print(f"{size:>10} {legacy_ms:>11.3f} {index_ms:>10.3f} {legacy_ms / index_ms:>8.0f}x "
+              f"{preload:>10.2f} {stats['bloom_bytes'] / 1024 / 1024:>9.2f} {stats['false_positives']:>5}")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
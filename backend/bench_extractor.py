@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the article extractors (bs4 vs lxml) over the stored HTML corpus.
+
+Each engine runs in a fresh process so peak memory numbers don't bleed into each other.
+Reports per-page parse time and peak memory: Python heap via tracemalloc (per page),
+plus process RSS growth, which also covers libxml2's C allocations.
+
+Usage:
+    python bench_extractor.py [--limit N] [--repeat 3] [--engines bs4,lxml]
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from benchtools import bench_parser
+
+
+def load_corpus(limit: int = None):
+    """Archived pages, or generated fixture pages when nothing has been archived yet."""
+    from archive import get_html_archive
+
+    pages = get_html_archive().latest_pages(limit)
+    if pages:
+        return pages, "archive"
+
+    from fixtures import article_page
+    pages = [(f"fixture/{n}", article_page(n, n % 60 + 1)) for n in range(limit or 200)]
+    return pages, "fixtures"
+
+
+def run_engine(engine: str, limit: int, repeat: int) -> dict:
+    """Benchmark one engine in this process and return its measurements."""
+    from scraper import parse_article_details
+
+    pages, source = load_corpus(limit)
+    bodies = [body for _, body in pages]
+    parse_article_details(bodies[0], engine=engine)  # warm up imports and caches
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    times = []
+    for _ in range(repeat):
+        for body in bodies:
+            start = time.perf_counter()
+            parse_article_details(body, engine=engine)
+            times.append(time.perf_counter() - start)
+
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    heap_peaks = []
+    tracemalloc.start()
+    for body in bodies:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        parse_article_details(body, engine=engine)
+        heap_peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    times.sort()
+    return {
+        "engine": engine,
+        "source": source,
+        "pages": len(bodies),
+        "avg_kb": round(sum(len(b) for b in bodies) / len(bodies) / 1024, 1),
+        "mean_ms": statistics.mean(times) * 1000,
+        "p50_ms": times[len(times) // 2] * 1000,
+        "p95_ms": times[int(len(times) * 0.95) - 1] * 1000,
+        "heap_peak_kb": max(heap_peaks) / 1024,
+        "heap_mean_kb": statistics.mean(heap_peaks) / 1024,
+        "rss_growth_kb": rss_after - rss_before
+    }
+
+
+def main():
+    parser = bench_parser(__doc__)
+    parser.add_argument("--limit", type=int, default=None, help="Max pages from the corpus")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing passes over the corpus")
+    parser.add_argument("--engines", default="bs4,lxml", help="Comma-separated engines to compare")
+    parser.add_argument("--engine", help=argparse.SUPPRESS)  # child process mode
+    args = parser.parse_args()
+
+    if args.engine:
+        print(json.dumps(run_engine(args.engine, args.limit, args.repeat)))
+        return
+
+    results = []
+    for engine in args.engines.split(","):
+        cmd = [sys.executable, os.path.abspath(__file__), "--engine", engine, "--repeat", str(args.repeat)]
+        if args.limit:
+            cmd += ["--limit", str(args.limit)]
+        output = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    first = results[0]
+    print(f"📊 Extractor benchmark: {first['pages']} pages ({first['source']}, avg {first['avg_kb']} KB), "
+          f"{args.repeat} passes")
+    print(f"{'engine':>8} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'heap peak KB':>13} {'heap avg KB':>12} {'RSS +KB':>9}")
+    for r in results:
+        print(f"{r['engine']:>8} {r['mean_ms']:>9.2f} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} "
+              f"{r['heap_peak_kb']:>13.0f} {r['heap_mean_kb']:>12.0f} {r['rss_growth_kb']:>9}")
+
+    if len(results) > 1:
+        base = results[0]
+        for r in results[1:]:
+            print(f"\n{r['engine']} vs {base['engine']}: {base['mean_ms'] / r['mean_ms']:.1f}x faster, "
+                  f"{base['heap_peak_kb'] / max(r['heap_peak_kb'], 1):.1f}x less peak heap")
+
+
+if __name__ == "__main__":
+    main()
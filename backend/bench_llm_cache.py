@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark the LLM response cache: generate_ai_analysis latency for a cold cache,
+a re-analysis of unchanged articles, and after a prompt version bump.
+
+The completions come from the stand-in OpenAI server (standins.py) with a fixed
+latency.
+
+Usage:
+    python bench_llm_cache.py [--articles 30] [--openai-latency 1.0]
+"""
+import os
+import statistics
+import time
+
+from benchtools import bench_parser, enter_temp_dir, lift_rate_limits
+
+
+def main():
+    parser = bench_parser(__doc__)
+    parser.add_argument("--articles", type=int, default=30, help="Articles to analyze")
+    parser.add_argument("--openai-latency", type=float, default=1.0, help="Stand-in completion latency (seconds)")
+    args = parser.parse_args()
+
+    from standins import StandinCorpus, start_standins, standin_environment
+    servers = start_standins(args.articles, openai_latency=args.openai_latency)
+    os.environ.update(standin_environment(servers))
+    enter_temp_dir("bench_llm_cache")
+
+    lift_rate_limits("openai")
+    import analysis
+    from database import init_db
+    from llm_cache import get_llm_cache
+
+    init_db()
+
+    corpus = StandinCorpus(args.articles)
+    articles = [(a["title"], "\n\n".join(a["paragraphs"])) for a in corpus.articles]
+
+    def run(label):
+        latencies = []
+        for title, text in articles:
+            start = time.perf_counter()
+            analysis.generate_ai_analysis(text, title, [{"keyword": "ransomware"}])
+            latencies.append(time.perf_counter() - start)
+        return label, statistics.mean(latencies) * 1000, statistics.median(latencies) * 1000
+
+    rows = [run("cold"), run("re-analysis")]
+    analysis.ANALYSIS_PROMPT_VERSION = "bench-bumped"
+    rows.append(run("prompt bump"))
+
+    print(f"\n🤖 generate_ai_analysis, {args.articles} articles, {args.openai_latency}s stand-in completions")
+    print(f"{'run':>12} {'mean ms':>10} {'p50 ms':>10}")
+    for label, mean, median in rows:
+        print(f"{label:>12} {mean:>10.1f} {median:>10.1f}")
+    stats = get_llm_cache().get_stats()
+    print(f"\n   Hit ratio {stats['hit_ratio']:.1%}, {stats['entries']} entries, "
+          f"{stats['tokens_saved']} tokens and {stats['seconds_saved']}s saved")
+
+
+if __name__ == "__main__":
+    main()
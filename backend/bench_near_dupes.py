@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark the near-duplicate (SimHash) index: lookup latency against index size,
+fingerprinting cost per article, and distances for edited copies vs unrelated text.
+
+Index sizes are filled with random fingerprints; lookups are a mix of misses and
+near hits (up to NEAR_DUPLICATE_MAX_DISTANCE flipped bits).
+
+Usage:
+    python bench_near_dupes.py [--sizes 10000,100000,1000000] [--lookups 20000]
+"""
+import random
+import resource
+import statistics
+import time
+
+from benchtools import bench_parser, enter_temp_dir
+
+VOCABULARY = ("ransomware vulnerability exploit patch attacker credential cloud phishing malware botnet "
+              "researchers campaign zero-day breach firmware router espionage loader payload backdoor "
+              "administrators agencies customers vendor update advisory critical remote code execution").split()
+
+
+def article_text(rng: random.Random, words: int = 600) -> str:
+    return " ".join(rng.choice(VOCABULARY) + str(rng.randrange(50)) for _ in range(words))
+
+
+def edited_copy(rng: random.Random, text: str, edits: int) -> str:
+    """Republished version: a few words changed plus a different footer."""
+    words = text.split()
+    for _ in range(edits):
+        words[rng.randrange(len(words))] = rng.choice(VOCABULARY)
+    return " ".join(words) + " Found this article interesting? Follow us on social media."
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def main():
+    parser = bench_parser(__doc__)
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma-separated index sizes")
+    parser.add_argument("--lookups", type=int, default=20000, help="Lookups per size")
+    args = parser.parse_args()
+
+    enter_temp_dir("bench_near_dupes")
+    from database import init_db
+    from config import NEAR_DUPLICATE_MAX_DISTANCE
+    from near_dupes import NearDuplicateIndex, simhash
+
+    init_db()
+    rng = random.Random(42)
+
+    # --- fingerprint cost and quality ---
+    texts = [article_text(rng) for _ in range(50)]
+    start = time.perf_counter()
+    fingerprints = [simhash(text) for text in texts]
+    per_article_ms = (time.perf_counter() - start) / len(texts) * 1000
+    edited = [(simhash(edited_copy(rng, t, 5)) ^ fp).bit_count() for t, fp in zip(texts, fingerprints)]
+    unrelated = [(fingerprints[i] ^ fingerprints[i + 1]).bit_count() for i in range(len(fingerprints) - 1)]
+    print(f"🪞 SimHash: {per_article_ms:.2f} ms per 600-word article")
+    print(f"   Edited copies: median {statistics.median(edited)} bits apart (max {max(edited)})")
+    print(f"   Unrelated articles: median {statistics.median(unrelated)} bits apart (min {min(unrelated)})")
+    print(f"   Duplicate threshold: {NEAR_DUPLICATE_MAX_DISTANCE} bits")
+
+    # --- index lookups ---
+    print(f"\n{'indexed':>10} {'add us':>8} {'p50 us':>8} {'p99 us':>8} {'hit rate':>9} {'cmp/lookup':>11} {'RSS MB':>8}")
+    for size in [int(x) for x in args.sizes.split(",")]:
+        index = NearDuplicateIndex()
+        stored = [rng.getrandbits(64) for _ in range(size)]
+        start = time.perf_counter()
+        for n, fp in enumerate(stored):
+            index.add(f"article-{n}", fp)
+        build = time.perf_counter() - start
+
+        queries = []
+        for i in range(args.lookups):
+            if i % 2:
+                fp = rng.choice(stored)
+                for bit in rng.sample(range(64), rng.randint(1, NEAR_DUPLICATE_MAX_DISTANCE)):
+                    fp ^= 1 << bit
+                queries.append(fp)
+            else:
+                queries.append(rng.getrandbits(64))
+
+        latencies = []
+        hits = 0
+        for fp in queries:
+            start = time.perf_counter()
+            hits += index.find(fp) is not None
+            latencies.append(time.perf_counter() - start)
+
+        stats = index.get_stats()
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"{size:>10} {build / size * 1e6:>8.1f} {percentile(latencies, 0.5) * 1e6:>8.1f} "
+              f"{percentile(latencies, 0.99) * 1e6:>8.1f} {hits / len(queries):>9.1%} "
+              f"{stats['avg_comparisons']:>11} {rss:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
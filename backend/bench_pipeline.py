@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end benchmark: run_backfill (discover, fetch, parse, persist,
+analyze) and export_enriched_json against the standins.py services.
+
+Every external call goes to a local stand-in, so runs need no network and
+no API keys and are repeatable. Latency and error injection apply to all
+stand-ins. With --cassette-mode record the site/Reddit/HN traffic is saved;
+replay serves it from the cassette directory instead of the servers.
+Rate limits are lifted unless --governed is given, so the numbers show the
+pipeline's own throughput.
+
+--fetch-workers with several comma-separated values sweeps the fetch stage:
+each level runs in a fresh process and temp dir, with the stage's workers and
+the per-host limit both set to the level, and articles/sec is compared.
+
+Usage:
+    python bench_pipeline.py [--articles 100] [--mode sitemap|pages] [--latency 0.05]
+                             [--error-rate 0] [--duplicate-rate 0] [--cassette-mode off|record|replay]
+                             [--cassette-dir DIR] [--analysis interactive|batch|none]
+                             [--fetch-workers 1,4,16] [--governed] [--json]
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from benchtools import bench_parser, enter_temp_dir, lift_rate_limits
+
+from standins import start_standins, standin_environment
+
+
+def main():
+    parser = bench_parser(__doc__)
+    parser.add_argument("--articles", type=int, default=100, help="Articles to backfill")
+    parser.add_argument("--mode", default="sitemap", choices=["sitemap", "pages"], help="Backfill discovery mode")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean stand-in latency per request (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stand-in requests failing with 503")
+    parser.add_argument("--duplicate-rate", type=float, default=0.0,
+                        help="Fraction of stand-in articles that near-duplicate another")
+    parser.add_argument("--openai-latency", type=float, default=None,
+                        help="Stand-in completion latency (seconds, default: --latency)")
+    parser.add_argument("--analysis-workers", type=int, default=None, help="ANALYSIS_WORKERS (default: config)")
+    parser.add_argument("--analysis", default="interactive", choices=["interactive", "batch", "none"],
+                        help="Analysis mode of the backfill job")
+    parser.add_argument("--fetch-workers", default=None,
+                        help="Fetch stage workers and per-host limit; comma-separated to sweep (default: config)")
+    parser.add_argument("--cassette-mode", default="off", choices=["off", "record", "replay"])
+    parser.add_argument("--cassette-dir", default=None, help="Cassette directory (default: inside the temp dir)")
+    parser.add_argument("--governed", action="store_true", help="Keep the production rate limits")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    if args.fetch_workers and "," in args.fetch_workers:
+        sweep_fetch_workers(args)
+        return
+
+    cassette_dir = os.path.abspath(args.cassette_dir) if args.cassette_dir else None
+    enter_temp_dir("bench_pipeline")
+
+    servers = start_standins(args.articles + 50, args.latency, args.error_rate,
+                             openai_latency=args.openai_latency, duplicate_rate=args.duplicate_rate)
+    os.environ.update(standin_environment(servers))
+    if args.analysis_workers:
+        os.environ["ANALYSIS_WORKERS"] = str(args.analysis_workers)
+    if args.fetch_workers:
+        os.environ["FETCH_CONCURRENCY"] = os.environ["FETCH_PER_HOST_CONCURRENCY"] = args.fetch_workers
+    os.environ["HTTP_CASSETTE_MODE"] = args.cassette_mode
+    os.environ["HTTP_CASSETTE_DIR"] = cassette_dir or os.path.abspath("cassettes")
+
+    # Backend modules read the environment at import time
+    if not args.governed:
+        os.environ["LLM_TOKENS_PER_MINUTE"] = "100000000"
+        lift_rate_limits()
+
+    import http_client
+    from cassette import get_cassette
+    from database import init_db
+    from llm_client import get_llm_client
+    from llm_usage import get_llm_usage_stats
+    from analysis import get_analysis_timing_stats
+    from main import export_enriched_json
+    from near_dupes import get_near_duplicate_index
+    from scraper import run_backfill
+
+    init_db()
+    start = time.perf_counter()
+    result = run_backfill(target_count=args.articles, mode=args.mode, analysis=args.analysis)
+    backfill_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    export_enriched_json()
+    export_seconds = time.perf_counter() - start
+
+    job = result["job"]
+    stages = result["pipeline"]["stages"]
+    cassette = get_cassette()
+    report = {
+        "articles_added": job["added"],
+        "articles_analyzed": job["analyzed"],
+        "analysis_errors": job["analysis_errors"],
+        "backfill_seconds": round(backfill_seconds, 2),
+        "articles_per_min": round(job["added"] / backfill_seconds * 60, 1) if backfill_seconds else 0,
+        "fetch_workers": stages["fetch"]["workers"],
+        "stages": {name: {key: stage[key] for key in ("processed", "errors", "p50_ms", "p95_ms")}
+                   for name, stage in stages.items()},
+        "export_ms": round(export_seconds * 1000, 1),
+        "near_duplicates": get_near_duplicate_index().get_stats(),
+        "http": http_client.get_http_client_stats(),
+        "llm_client": get_llm_client().get_stats(),
+        "llm_usage": get_llm_usage_stats(limit=1),
+        "analysis_stages": get_analysis_timing_stats(),
+        "standins": {name: server.get_stats() for name, server in servers.items()},
+        "cassette": cassette.get_stats() if cassette else None,
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }
+    for server in servers.values():
+        server.stop()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"\n📊 Pipeline benchmark: {args.articles} articles, mode={args.mode}, latency={args.latency}s, "
+          f"error rate={args.error_rate}, cassette={args.cassette_mode}, analysis={args.analysis}, "
+          f"{report['fetch_workers']} fetch workers, "
+          f"{'governed' if args.governed else 'ungoverned'}")
+    print(f"   Added {report['articles_added']}, analyzed {report['articles_analyzed']} "
+          f"({report['analysis_errors']} errors) in {report['backfill_seconds']}s "
+          f"= {report['articles_per_min']} articles/min")
+    print(f"\n{'stage':>10} {'items':>7} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9}")
+    for name, stage in report["stages"].items():
+        print(f"{name:>10} {stage['processed']:>7} {stage['errors']:>7} {stage['p50_ms']:>9} {stage['p95_ms']:>9}")
+    print(f"\n   Final export_enriched_json: {report['export_ms']} ms")
+    dupes = report["near_duplicates"]
+    print(f"   Near-duplicates: {dupes['duplicates']} of {dupes['lookups']} fingerprinted "
+          f"(avg lookup {dupes['avg_lookup_us']} us)")
+    print(f"\n{'host':>24} {'requests':>9} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9}")
+    for host, stats in report["http"].items():
+        print(f"{host:>24} {stats['requests']:>9} {stats['errors']:>7} {stats['p50_ms']:>9} {stats['p95_ms']:>9}")
+    llm = report["llm_client"]
+    print(f"\n🤖 LLM client: {llm['requests']} completions, peak {llm['peak_in_flight']} in flight "
+          f"(max {llm['max_concurrency']}), {llm['prompt_tokens'] + llm['completion_tokens']} tokens, "
+          f"budget wait {llm['budget_wait_seconds']}s")
+    usage = report["llm_usage"]
+    print(f"   Recorded calls: {usage['calls']} ({usage['cached']} cached), ${usage['cost_usd']}, "
+          f"{usage['avg_tokens_per_article']} tokens and ${usage['avg_cost_per_article_usd']} per article, "
+          f"avg latency {usage['avg_latency']}s")
+    steps = report["analysis_stages"]
+    print(f"\n🧩 Analysis steps: {steps['avg_stages_seconds']}s of step time in {steps['avg_graph_seconds']}s "
+          f"per article ({steps['concurrency_speedup']}x)")
+    print(f"{'step':>12} {'p50 s':>8} {'p95 s':>8}")
+    for name, stage in steps["stages"].items():
+        print(f"{name:>12} {stage['p50_seconds']:>8} {stage['p95_seconds']:>8}")
+    print(f"\n{'stand-in':>24} {'requests':>9} {'injected':>9}")
+    for name, stats in report["standins"].items():
+        print(f"{name:>24} {stats['requests']:>9} {stats['injected_errors']:>9}")
+    if report["cassette"]:
+        print(f"\n📼 Cassette: {report['cassette']}")
+    print(f"\n🧠 Peak RSS: {report['peak_rss_mb']} MB")
+
+
+def sweep_fetch_workers(args):
+    """Run one child benchmark per fetch concurrency level and compare their throughput."""
+    results = []
+    for level in args.fetch_workers.split(","):
+        cmd = [sys.executable, os.path.abspath(__file__), "--json", "--fetch-workers", level.strip(),
+               "--articles", str(args.articles), "--mode", args.mode, "--latency", str(args.latency),
+               "--error-rate", str(args.error_rate), "--duplicate-rate", str(args.duplicate_rate),
+               "--analysis", args.analysis]
+        if args.openai_latency is not None:
+            cmd += ["--openai-latency", str(args.openai_latency)]
+        if args.analysis_workers:
+            cmd += ["--analysis-workers", str(args.analysis_workers)]
+        if args.governed:
+            cmd.append("--governed")
+        output = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+        # The report is the JSON object after the "Working in" line and backend logging
+        report = json.loads(output[output.rindex("\n{") + 1:])
+        results.append(report)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"\n📊 Fetch concurrency sweep: {args.articles} articles, mode={args.mode}, latency={args.latency}s, "
+          f"analysis={args.analysis}, {'governed' if args.governed else 'ungoverned'}")
+    print(f"{'workers':>8} {'added':>6} {'seconds':>8} {'articles/s':>11} {'fetch p50 ms':>13} {'fetch p95 ms':>13}")
+    for report in results:
+        fetch = report["stages"]["fetch"]
+        per_second = round(report["articles_added"] / report["backfill_seconds"], 1) if report["backfill_seconds"] else 0
+        print(f"{report['fetch_workers']:>8} {report['articles_added']:>6} {report['backfill_seconds']:>8} "
+              f"{per_second:>11} {fetch['p50_ms']:>13} {fetch['p95_ms']:>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Google Trends broker: pytrends round trips per analyzed article when
+concurrent analyses share keywords, against the previous per-article sequence
+(build_payload, interest_over_time, related_queries, build_payload, interest_by_region).
+
+Uses the stand-in TrendReq (TRENDS_CLIENT=stub) with a fixed latency per call; article
+keyword lists are drawn from a skewed vocabulary, like real coverage.
+
+Usage:
+    python bench_trends.py [--articles 200] [--workers 5] [--latency 0.1]
+"""
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchtools import bench_parser, enter_temp_dir, lift_rate_limits
+
+VOCABULARY = ("Ransomware Microsoft Phishing Google Vulnerability Malware Apple Linux Cisco Fortinet "
+              "Zero-Day Botnet Android Chrome Windows AWS Azure Kubernetes Docker GitHub npm PyPI "
+              "Ivanti VMware Citrix Okta Lazarus APT29 LockBit BlackCat Cloudflare OpenAI Supply-Chain "
+              "Backdoor Spyware Exploit Firmware Router Credential Stealer Wiper SQLi XSS RCE VPN SSH "
+              "Telegram WhatsApp iOS macOS Oracle SAP Salesforce Atlassian Jenkins GitLab Zoom Slack").split()
+
+
+def keyword_lists(rng: random.Random, articles: int):
+    weights = [1 / (rank + 1) for rank in range(len(VOCABULARY))]  # Zipf-like popularity
+    lists = []
+    for _ in range(articles):
+        keywords = []
+        while len(keywords) < rng.randint(3, 5):
+            kw = rng.choices(VOCABULARY, weights)[0]
+            if kw not in keywords:
+                keywords.append(kw)
+        lists.append(keywords)
+    return lists
+
+
+def main():
+    parser = bench_parser(__doc__)
+    parser.add_argument("--articles", type=int, default=200, help="Analyses to run")
+    parser.add_argument("--workers", type=int, default=5, help="Concurrent analyses (run_backfill uses 5)")
+    parser.add_argument("--latency", type=float, default=0.1, help="Seconds per stand-in pytrends call")
+    args = parser.parse_args()
+
+    os.environ["TRENDS_CLIENT"] = "stub"
+    os.environ["STANDIN_LATENCY"] = str(args.latency)
+    enter_temp_dir("bench_trends")
+    lift_rate_limits("google_trends")
+    import analysis
+    from config import get_pytrends
+    from trends_broker import get_trends_broker
+
+    lists = keyword_lists(random.Random(7), args.articles)
+
+    def analyze(keywords):
+        result = analysis._empty_trends_result(keywords, 6)
+        return analysis._fetch_unified_google_trends(keywords, result, 6)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        scores = list(pool.map(analyze, lists))
+    elapsed = time.perf_counter() - start
+
+    stats = get_trends_broker().get_stats()
+    calls = get_pytrends().calls
+    previous_calls = args.articles * 5
+    print(f"📈 {args.articles} analyses, {args.workers} workers, {args.latency * 1000:.0f} ms per pytrends call")
+    print(f"   Broker: {calls} pytrends calls ({calls / args.articles:.2f} per article), "
+          f"{stats['payloads']} payloads, {stats['keywords_per_payload']} keywords per payload")
+    print(f"   Keyword requests: {stats['keyword_requests']}, shared {stats['shared_rate']:.1%} "
+          f"({stats['memo_hits']} recent, {stats['coalesced']} in flight)")
+    print(f"   Previous path: {previous_calls} pytrends calls (5 per article) "
+          f"-> {previous_calls / max(1, calls):.1f}x fewer calls")
+    print(f"   Wall clock: {elapsed:.2f}s, all scores non-zero: {all(scores)}")
+
+
+if __name__ == "__main__":
+    main()
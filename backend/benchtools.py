@@ -0,0 +1,32 @@
+"""
+Setup shared by the bench_*.py scripts. Import it before any backend module:
+config requires an OpenAI key at import time, and benchmarks only talk to stand-ins.
+"""
+import argparse
+import os
+import tempfile
+
+os.environ.setdefault("OPENAI_API_KEY", "bench-placeholder")
+
+
+def bench_parser(doc: str) -> argparse.ArgumentParser:
+    """Argument parser whose help is the script's docstring (usage included)."""
+    return argparse.ArgumentParser(description=doc, formatter_class=argparse.RawDescriptionHelpFormatter)
+
+
+def enter_temp_dir(name: str) -> str:
+    """Work in a fresh temporary directory (the databases are relative paths), so real data is never touched."""
+    workdir = tempfile.mkdtemp(prefix=f"{name}_")
+    os.chdir(workdir)
+    print(f"📁 Working in {workdir}")
+    return workdir
+
+
+def lift_rate_limits(*names: str):
+    """
+    Raise the named RATE_LIMITS buckets (every bucket if none is named) so runs show
+    the code's own throughput. Call before the rate governor is first used.
+    """
+    import config
+    for name in names or list(config.RATE_LIMITS):
+        config.RATE_LIMITS[name].update(rate=1000.0, burst=1000, max_rate=1000.0)
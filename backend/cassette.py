@@ -0,0 +1,101 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Any, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from config import HTTP_CASSETTE_MODE, HTTP_CASSETTE_DIR
+
+# Response headers worth keeping (hop-by-hop and transfer headers would be wrong on replay)
+KEPT_HEADERS = {"content-type", "etag", "last-modified", "retry-after", "location", "cache-control"}
+
+
+class Cassette:
+    """
+    Recorded HTTP interactions, one JSON file per request key (method, URL, body).
+    "record" stores every response that passes through http_client; "replay"
+    answers from the files and raises ConnectionError for unrecorded requests.
+    """
+
+    def __init__(self, directory: str = HTTP_CASSETTE_DIR, mode: str = HTTP_CASSETTE_MODE):
+        self.directory = directory
+        self.mode = mode
+        self.lock = threading.Lock()
+        self.stats = {"recorded": 0, "replayed": 0, "misses": 0}
+        if mode == "record":
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(method: str, url: str, body: Any = None) -> str:
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body, sort_keys=True)
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        digest = hashlib.sha1(f"{method.upper()} {url}\n".encode("utf-8") + (body or b""))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def play(self, method: str, url: str, body: Any = None) -> requests.Response:
+        """Recorded response for a request (raises ConnectionError if it was never recorded)."""
+        path = self._path(self.key(method, url, body))
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            with self.lock:
+                self.stats["misses"] += 1
+            raise requests.ConnectionError(f"No cassette entry for {method.upper()} {url}")
+
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = base64.b64decode(entry["body"])
+        response.url = url
+        response.request = requests.Request(method.upper(), url).prepare()
+        with self.lock:
+            self.stats["replayed"] += 1
+        return response
+
+    def record(self, method: str, url: str, body: Any, response: requests.Response):
+        entry = {
+            "method": method.upper(),
+            "url": url,
+            "status": response.status_code,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() in KEPT_HEADERS},
+            "body": base64.b64encode(response.content).decode("ascii")
+        }
+        path = self._path(self.key(method, url, body))
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)  # Atomic: concurrent recorders never leave a partial file
+        with self.lock:
+            self.stats["recorded"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = dict(self.stats)
+        stats["mode"] = self.mode
+        stats["directory"] = self.directory
+        return stats
+
+
+_cassette = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Lazy initialization of the process-wide cassette (None when HTTP_CASSETTE_MODE is "off")."""
+    global _cassette
+    if HTTP_CASSETTE_MODE == "off":
+        return None
+    with _cassette_lock:
+        if _cassette is None:
+            _cassette = Cassette()
+    return _cassette
@@ -0,0 +1,112 @@
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any
+
+from config import CIRCUIT_BREAKERS, CIRCUIT_BREAKER_DEFAULT, CIRCUIT_BREAKER_MAX_COOLDOWN
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a source whose breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Closed: calls go through and consecutive failures are counted. At failure_threshold
+    the breaker opens and calls are refused for the cooldown. Then it is half-open: one
+    probe call is let through; success closes it, failure reopens it with a doubled cooldown.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, cooldown: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started = 0.0
+        self.changed_at = time.time()
+        self.lock = threading.Lock()
+        self.stats = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            print(f"🔌 Circuit '{self.name}' {self.state} -> {state}")
+            self.state = state
+            self.changed_at = time.time()
+
+    def allow(self) -> bool:
+        """Whether a call may be made now (a True in half-open state is the probe)."""
+        with self.lock:
+            now = time.monotonic()
+            if self.state == OPEN and now - self.opened_at >= self.cooldown:
+                self._set_state(HALF_OPEN)
+                self.probe_started = 0.0
+            if self.state == HALF_OPEN:
+                # A probe that never reported back frees its slot after a cooldown
+                if self.probe_started and now - self.probe_started < self.cooldown:
+                    self.stats["rejected"] += 1
+                    return False
+                self.probe_started = now
+            elif self.state == OPEN:
+                self.stats["rejected"] += 1
+                return False
+            self.stats["calls"] += 1
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            if self.state != CLOSED:
+                self.cooldown = self.base_cooldown
+                self._set_state(CLOSED)
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.stats["failures"] += 1
+            if self.state == HALF_OPEN:
+                self.cooldown = min(CIRCUIT_BREAKER_MAX_COOLDOWN, self.cooldown * 2)
+            elif self.state == OPEN or self.failures < self.failure_threshold:
+                return
+            self.opened_at = time.monotonic()
+            self.stats["opened"] += 1
+            self._set_state(OPEN)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            retry_in = self.cooldown - (time.monotonic() - self.opened_at) if self.state == OPEN else 0
+            return {
+                "state": self.state,
+                "since": datetime.fromtimestamp(self.changed_at).isoformat(),
+                "consecutive_failures": self.failures,
+                "failure_threshold": self.failure_threshold,
+                "cooldown_seconds": self.cooldown,
+                "retry_in_seconds": round(max(0.0, retry_in), 1),
+                **self.stats
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """The process-wide breaker of an external source (settings from CIRCUIT_BREAKERS)."""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, **CIRCUIT_BREAKERS.get(name, CIRCUIT_BREAKER_DEFAULT))
+        return _breakers[name]
+
+
+def get_circuit_breaker_stats() -> Dict[str, Any]:
+    for name in CIRCUIT_BREAKERS:
+        get_circuit_breaker(name)
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {name: breaker.snapshot() for name, breaker in breakers.items()}
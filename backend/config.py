@@ -1,3 +1,4 @@
+import json
 import os
 from apscheduler.schedulers.background import BackgroundScheduler
 from pytrends.request import TrendReq
@@ -6,6 +7,9 @@ from pytrends.request import TrendReq
 BASE_URL = "https://thehackernews.com"
 DB_FILE = "hackernews.db"
 OUTPUT_JSON = "articles_enriched.json"
+HTTP_CACHE_DB = "http_cache.db"
+HTTP_CACHE_MAX_BYTES = 200 * 1024 * 1024  # LRU-evict cached pages beyond 200 MB
+ARCHIVE_DB = "html_archive.db"  # Compressed raw HTML of every fetched page
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
@@ -13,17 +17,157 @@ HEADERS = {
     "Referer": "https://thehackernews.com/",
 }
 
-# Rate limiting settings
-REQUEST_DELAY_MIN = 1.0  # Minimum delay between requests in seconds
-REQUEST_DELAY_MAX = 2.5  # Maximum delay between requests in seconds
-PAGE_DELAY_MIN = 2.0     # Minimum delay between pagination requests
-PAGE_DELAY_MAX = 4.0     # Maximum delay between pagination requests
+# OpenAI rate-limit tier, shared by every analysis path through llm_client.py
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "30000"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))  # Completions in flight (and pooled connections)
+
+# Adaptive rate governor (rate_governor.py): one token bucket per destination.
+# rate/min_rate/max_rate in requests per second; target_latency in seconds
+RATE_LIMITS = {
+    "thehackernews": {"rate": 0.5, "burst": 2, "min_rate": 0.1, "max_rate": 4.0, "target_latency": 3.0},
+    "openai": {"rate": LLM_REQUESTS_PER_MINUTE / 120, "burst": LLM_MAX_CONCURRENCY, "min_rate": 0.1,
+               "max_rate": LLM_REQUESTS_PER_MINUTE / 60, "target_latency": 60.0},
+    "google_trends": {"rate": 0.3, "burst": 1, "min_rate": 0.05, "max_rate": 1.0, "target_latency": 5.0},
+    "reddit": {"rate": 0.5, "burst": 2, "min_rate": 0.05, "max_rate": 1.0, "target_latency": 3.0},
+    "hackernews": {"rate": 1.0, "burst": 4, "min_rate": 0.1, "max_rate": 10.0, "target_latency": 3.0},
+    "resend": {"rate": 1.0, "burst": 2, "min_rate": 0.1, "max_rate": 2.0, "target_latency": 5.0},
+}
+# Hostnames (and their subdomains) governed by each bucket in the shared HTTP client
+RATE_LIMIT_HOSTS = {
+    "thehackernews.com": "thehackernews",
+    "reddit.com": "reddit",
+    "hn.algolia.com": "hackernews",
+    "api.resend.com": "resend",
+}
+RATE_ADDITIVE_INCREASE = 0.05  # req/s added per healthy response
+RATE_DECREASE_FACTOR = 0.5     # Rate multiplier on 429/503
+
+INCREMENTAL_MAX_PAGES = 20  # Safety limit for one incremental poll (watermark normally hit on page 1)
+
+# Extra news sources (sources.py), polled concurrently with The Hacker News through their feeds, e.g.
+# [{"name": "bleepingcomputer", "feed_url": "https://www.bleepingcomputer.com/feed/", "rate_limit": {"rate": 0.3}}]
+NEWS_SOURCES = json.loads(os.getenv("NEWS_SOURCES", "[]"))
+# Rate governor bucket of a source without its own settings
+SOURCE_DEFAULT_RATE_LIMIT = {"rate": 0.5, "burst": 2, "min_rate": 0.1, "max_rate": 2.0, "target_latency": 3.0}
+
+# Backfill discovery: "sitemap" (sitemap index + feeds, bulk diff) or "pages" (walk homepage pagination)
+BACKFILL_MODE = os.getenv("BACKFILL_MODE", "sitemap")
+BACKFILL_SITEMAP_URL = f"{BASE_URL}/sitemap.xml"
+BACKFILL_FEED_URLS = [
+    "https://feeds.feedburner.com/TheHackersNews",
+    f"{BASE_URL}/feeds/posts/default?max-results=150",
+]
+BACKFILL_CHECKPOINT_SECONDS = 5  # Progress counters of a running backfill job are saved at least this often
+
+# Failed article fetches wait in scrape_retries (scrape_retries.py) and are retried with exponential backoff
+SCRAPE_RETRY_BASE_SECONDS = 300      # Delay after the first failure, doubled per attempt
+SCRAPE_RETRY_MAX_SECONDS = 86400     # Backoff cap
+SCRAPE_RETRY_MAX_ATTEMPTS = 8        # Then the row is marked dead and never analyzed
+SCRAPE_RETRY_DRAIN_MINUTES = 10      # Scheduler interval of the drain job
+SCRAPE_RETRY_BATCH = 50              # Due retries handled per drain
+
+# Article extraction engine: "lxml" (single-pass) or "bs4" (legacy BeautifulSoup scans)
+EXTRACTOR_ENGINE = os.getenv("EXTRACTOR_ENGINE", "bs4")
+
+# Fetch stage of the ingest pipeline: worker threads share the pooled keep-alive HTTP client
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", "8"))                    # Max article fetches in flight overall
+FETCH_PER_HOST_CONCURRENCY = int(os.getenv("FETCH_PER_HOST_CONCURRENCY", "2"))  # Max article fetches in flight per host
+
+# Staged ingest pipeline (pipeline.py): fetch -> parse -> persist -> analyze -> export
+PIPELINE_QUEUE_SIZE = 32  # Bound of every inter-stage queue (backpressure)
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "8"))  # Concurrent analyze_article calls (pipeline and /analyze-all)
+PIPELINE_WORKERS = {"fetch": FETCH_CONCURRENCY, "parse": 2, "analyze": ANALYSIS_WORKERS}
+# analyze_article runs its enrichment steps as a dependency graph (stage_graph.py) on shared pools
+ANALYSIS_STAGE_WORKERS = ANALYSIS_WORKERS * 4  # Steps in flight across all articles being analyzed
+TREND_SIGNAL_WORKERS = ANALYSIS_WORKERS * 2    # Reddit/HN lookups running alongside Google Trends
+PIPELINE_EXPORT_EVERY = 10  # Re-export JSON after this many analyzed articles (and at the end)
+
+# Seen-URL index (Bloom filter in front of articles.canonical_url)
+SEEN_URL_BLOOM_FP_RATE = 0.01          # False-positive rate of the in-memory filter
+SEEN_URL_BLOOM_MIN_CAPACITY = 100_000  # Filter is sized for max(2x stored articles, this)
+
+# Near-duplicate detection (SimHash over full_text, near_dupes.py)
+NEAR_DUPLICATE_MAX_DISTANCE = 6  # Max differing bits of 64 to count as the same story
+NEAR_DUPLICATE_MIN_WORDS = 50    # Shorter texts are not fingerprinted
+NEAR_DUPLICATE_SHINGLE = 3       # Words per shingle
+NEAR_DUPLICATE_WAIT_SECONDS = 120  # A duplicate waits this long for its canonical article's running analysis
+
+# Shared outbound HTTP client (http_client.py)
+HTTP_POOL_CONNECTIONS = 20                      # Hosts with a cached connection pool
+HTTP_POOL_MAXSIZE = max(FETCH_CONCURRENCY, 10)  # Keep-alive connections per host
+HTTP_TIMEOUT = (5, 15)      # (connect, read) seconds unless a call site overrides it
+HTTP_MAX_RETRIES = 3        # Retries on connection errors, 429 and 5xx
+HTTP_BACKOFF_BASE = 1.0     # Retry n waits up to BASE * 2^n seconds (full jitter)
+HTTP_BACKOFF_MAX = 30.0     # Cap on any single wait, including Retry-After
+
+# Offline runs (standins.py, bench_pipeline.py): send a host's traffic to another base URL,
+# e.g. {"thehackernews.com": "http://127.0.0.1:8101"}
+HTTP_HOST_OVERRIDES = json.loads(os.getenv("HTTP_HOST_OVERRIDES", "{}"))
+# Cassettes (cassette.py): "record" saves every http_client response, "replay" serves them without network
+HTTP_CASSETTE_MODE = os.getenv("HTTP_CASSETTE_MODE", "off")
+HTTP_CASSETTE_DIR = os.getenv("HTTP_CASSETTE_DIR", "cassettes")
+# Unified trends results (ttl_cache.py), persisted across restarts and shared by all analysis threads
+TRENDS_CACHE_DB = "trends_cache.db"
+TRENDS_CACHE_TTL = 1800                # Fresh for 30 minutes
+TRENDS_CACHE_STALE_SECONDS = 6 * 3600  # Then served for up to 6 more hours while refreshed in the background
+TRENDS_CACHE_MAX_ENTRIES = 5000        # LRU-evicted beyond this
+
+# Google Trends broker (trends_broker.py): keywords from concurrent analyses share pytrends payloads
+TRENDS_BATCH_SIZE = 4              # Keywords per build_payload, plus the anchor (Google Trends maximum: 5)
+# Every packed payload includes this term and each keyword is rescaled against it, so a keyword's
+# series does not depend on which other articles' keywords it was packed with
+TRENDS_ANCHOR_KEYWORD = "cybersecurity"
+TRENDS_ANCHOR_MIN_MEAN = 5         # Below this the anchor is squashed by a far bigger keyword: re-query without it
+TRENDS_BATCH_WINDOW = 0.5          # Seconds a partial pack waits for more keywords
+TRENDS_KEYWORD_TTL = 1800          # Per-keyword results are reused for this long
+TRENDS_KEYWORD_MEMO_MAX = 2000     # Per-keyword results kept in memory (LRU)
+TRENDS_REQUEST_TIMEOUT = 600       # Max seconds an analysis waits for its keywords
+
+# Circuit breakers (circuit_breaker.py) around enrichment sources: after failure_threshold consecutive
+# failures a source is skipped for cooldown seconds, then a single probe call decides whether it recovered
+CIRCUIT_BREAKERS = {
+    "google_trends": {"failure_threshold": 3, "cooldown": 300},
+    "reddit": {"failure_threshold": 5, "cooldown": 120},
+    "hackernews": {"failure_threshold": 5, "cooldown": 120},
+    "market_data": {"failure_threshold": 5, "cooldown": 300},
+}
+CIRCUIT_BREAKER_DEFAULT = {"failure_threshold": 5, "cooldown": 120}
+CIRCUIT_BREAKER_MAX_COOLDOWN = 3600  # Cooldown doubles after each failed probe, up to this
+
+# Clients without an HTTP hook: "stub" swaps in the standins.py fakes
+TRENDS_CLIENT = os.getenv("TRENDS_CLIENT", "pytrends")
+MARKET_DATA_CLIENT = os.getenv("MARKET_DATA_CLIENT", "yfinance")
 
 # OpenAI Configuration - Use GPT-4o for best analysis
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     raise ValueError("OPENAI_API_KEY environment variable is required. Please set it in your .env file or environment.")
 OPENAI_MODEL = "gpt-4o"  # Using GPT-4o for comprehensive analysis
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None  # None = api.openai.com; set to point at a stand-in
+LLM_COMPLETION_TOKENS_ESTIMATE = 600  # Reserved from the token budget per call until the actual usage is known
+LLM_MAX_RETRIES = 2                  # OpenAI SDK retries (with its own backoff) on 429/5xx
+LLM_TIMEOUT = 120                    # Seconds per completion request
+# USD per million tokens, for cost reports; the Batch API bills at OPENAI_BATCH_DISCOUNT of these
+OPENAI_PRICES_PER_MILLION = {"gpt-4o": {"input": 2.50, "output": 10.00}}
+OPENAI_BATCH_DISCOUNT = 0.5
+# Batch analysis mode (batch_analysis.py): GPT step of many articles through the OpenAI Batch API
+BATCH_MAX_REQUESTS = 50000      # Requests per submitted batch (Batch API limit)
+BATCH_POLL_SECONDS = float(os.getenv("BATCH_POLL_SECONDS", "30"))
+BATCH_COMPLETION_WINDOW = "24h"
+ANALYSIS_PROMPT_VERSION = "analysis-v2"  # Bump when the analysis prompt or response handling changes (invalidates cached responses)
+# Token budget of the analysis prompt (prompt_budget.py): title, keywords and instructions always fit,
+# the article content gets the rest as its lead, conclusion and most informative passages
+ANALYSIS_PROMPT_MAX_TOKENS = int(os.getenv("ANALYSIS_PROMPT_MAX_TOKENS", "1500"))
+PROMPT_PASSAGE_TOKENS = 120  # Long paragraphs are cut into sentence runs of about this size
+
+# LLM response cache (llm_cache.py), keyed by a hash of model, prompt version, messages and parameters
+LLM_CACHE_DB = "llm_cache.db"
+LLM_CACHE_TTL = 30 * 86400       # Cached analyses are reused for 30 days
+LLM_CACHE_MAX_ENTRIES = 20000    # LRU-evicted beyond this
+
+# analyze_article reuses the stored scrape if it is younger than this (force=True always refetches)
+ANALYSIS_REFETCH_AFTER_HOURS = 24
 
 # ================= CATEGORIES (Original for legacy support) =================
 LEGACY_CATEGORIES = {
@@ -180,12 +324,14 @@ COUNTRY_DATA = {
 scheduler = BackgroundScheduler()
 pytrends = None
 favicon_cache = {}
-trends_cache = {}  # Cache for Google Trends data
-trends_last_request = 0  # Timestamp of last trends request
 
 def get_pytrends():
     """Lazy initialization of Google Trends client."""
     global pytrends
     if pytrends is None:
-        pytrends = TrendReq(hl='en-US', tz=360, timeout=(10, 25))
+        if TRENDS_CLIENT == "stub":
+            from standins import StubTrendReq
+            pytrends = StubTrendReq()
+        else:
+            pytrends = TrendReq(hl='en-US', tz=360, timeout=(10, 25))
     return pytrends
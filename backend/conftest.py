@@ -0,0 +1,24 @@
+"""
+pytest setup for the backend checks. config requires an API key at import time; the
+checks never call OpenAI, so a placeholder is enough.
+"""
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-placeholder")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Manual scripts that talk to the running app and the email service at import time
+collect_ignore = ["test_newsletter.py", "test_newsletter_resend.py", "test_with_default_email.py"]
+
+
+@pytest.fixture
+def tmp_db(tmp_path, monkeypatch):
+    """A fresh database in a temporary directory (DB_FILE is relative to the working directory)."""
+    from database import init_db
+
+    monkeypatch.chdir(tmp_path)
+    init_db()
+    return tmp_path
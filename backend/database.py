@@ -1,11 +1,45 @@
 import sqlite3
+from datetime import datetime
+from typing import Dict, Any
 from config import DB_FILE
+from utils import canonicalize_url
 
 def get_db_connection():
     conn = sqlite3.connect(DB_FILE)
     conn.row_factory = sqlite3.Row
     return conn
 
+def load_crawl_state(conn: sqlite3.Connection, source: str) -> Dict[str, Any]:
+    """Persisted watermark and frontier for a source (empty state if never crawled)."""
+    row = conn.execute("SELECT * FROM crawl_state WHERE source = ?", (source,)).fetchone()
+    if row:
+        return dict(row)
+    return {
+        "source": source,
+        "watermark_url": None,
+        "watermark_published": None,
+        "pending_watermark_url": None,
+        "pending_watermark_published": None,
+        "frontier_url": None,
+        "frontier_page": 0,
+        "updated_at": None
+    }
+
+
+def save_crawl_state(conn: sqlite3.Connection, state: Dict[str, Any]):
+    """Upsert crawl state and commit, so progress survives a restart."""
+    state["updated_at"] = datetime.now().isoformat()
+    conn.execute('''
+        INSERT OR REPLACE INTO crawl_state
+        (source, watermark_url, watermark_published, pending_watermark_url,
+         pending_watermark_published, frontier_url, frontier_page, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (state["source"], state["watermark_url"], state["watermark_published"],
+          state["pending_watermark_url"], state["pending_watermark_published"],
+          state["frontier_url"], state["frontier_page"], state["updated_at"]))
+    conn.commit()
+
+
 def init_db():
     """Initialize database with enhanced schema for AI analysis and enrichment."""
     conn = sqlite3.connect(DB_FILE)
@@ -16,7 +50,9 @@ def init_db():
             id TEXT PRIMARY KEY,
             title TEXT,
             url TEXT,
+            canonical_url TEXT,
             published TEXT,
+            scraped_at TEXT,
             image_url TEXT,
             media_type TEXT,
             full_text TEXT,
@@ -53,6 +89,8 @@ def init_db():
     
     # All columns including new ones for AI analysis and enrichment
     new_columns = [
+        ("canonical_url", "TEXT"),
+        ("scraped_at", "TEXT"),
         ("author", "TEXT"),
         ("category", "TEXT"),
         ("tags_json", "TEXT"),
@@ -77,7 +115,14 @@ def init_db():
         ("tech_stack_json", "TEXT"),
         ("market_data_json", "TEXT"),
         ("actions_json", "TEXT"),
-        ("enrichment_json", "TEXT")
+        ("enrichment_json", "TEXT"),
+        # News source adapter that ingested the row (sources.py)
+        ("source", "TEXT"),
+        # Near-duplicate detection (near_dupes.py)
+        ("simhash", "INTEGER"),
+        ("duplicate_of", "TEXT"),
+        # Exact copy of another row's URL, found when canonical URLs were first indexed
+        ("url_alias_of", "TEXT")
     ]
     
     # --- SUBSCRIBERS TABLE FOR NEWSLETTER ---
@@ -92,6 +137,124 @@ def init_db():
         )
     ''')
     
+    # --- CRAWL STATE FOR INCREMENTAL POLLING ---
+    # watermark_* = newest article seen by the last completed crawl
+    # pending_* / frontier_url = the crawl in progress, so an interrupted run resumes
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS crawl_state (
+            source TEXT PRIMARY KEY,
+            watermark_url TEXT,
+            watermark_published TEXT,
+            pending_watermark_url TEXT,
+            pending_watermark_published TEXT,
+            frontier_url TEXT,
+            frontier_page INTEGER DEFAULT 0,
+            updated_at TEXT
+        )
+    ''')
+    
+    # Persistent backfill jobs (backfill_jobs.py): frontier, counters and the pending analysis set
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS backfill_jobs (
+            id TEXT PRIMARY KEY,
+            status TEXT,
+            mode TEXT,
+            target_count INTEGER,
+            since TEXT,
+            until TEXT,
+            frontier_url TEXT,
+            frontier_page INTEGER DEFAULT 0,
+            counters_json TEXT,
+            active_seconds REAL DEFAULT 0,
+            runs INTEGER DEFAULT 0,
+            error TEXT,
+            created_at TEXT,
+            updated_at TEXT,
+            finished_at TEXT,
+            analysis TEXT DEFAULT 'interactive'
+        )
+    ''')
+    # Failed article fetches awaiting retry (scrape_retries.py); analysis waits for content
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS scrape_retries (
+            article_id TEXT PRIMARY KEY,
+            url TEXT,
+            status TEXT,
+            attempts INTEGER DEFAULT 0,
+            next_retry_at TEXT,
+            error_class TEXT,
+            last_error TEXT,
+            created_at TEXT,
+            updated_at TEXT
+        )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_scrape_retries_due ON scrape_retries(status, next_retry_at)")
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS backfill_job_pending (
+            job_id TEXT,
+            article_id TEXT,
+            PRIMARY KEY (job_id, article_id)
+        )
+    ''')
+    
+    # OpenAI Batch API runs of the analysis step (batch_analysis.py); keys_json maps custom_id -> response cache key
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS analysis_batches (
+            id TEXT PRIMARY KEY,
+            status TEXT,
+            input_file_id TEXT,
+            output_file_id TEXT,
+            error_file_id TEXT,
+            request_count INTEGER,
+            completed INTEGER DEFAULT 0,
+            failed INTEGER DEFAULT 0,
+            keys_json TEXT,
+            prompt_tokens INTEGER DEFAULT 0,
+            completion_tokens INTEGER DEFAULT 0,
+            cost_usd REAL DEFAULT 0,
+            submitted_at TEXT,
+            completed_at TEXT,
+            applied_at TEXT
+        )
+    ''')
+    
+    # One row per LLM call (llm_usage.py): tokens, latency and cost per article and per run
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS llm_calls (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT,
+            article_id TEXT,
+            purpose TEXT,
+            model TEXT,
+            prompt_tokens INTEGER DEFAULT 0,
+            completion_tokens INTEGER DEFAULT 0,
+            latency REAL,
+            cost_usd REAL DEFAULT 0,
+            cached INTEGER DEFAULT 0,
+            batch INTEGER DEFAULT 0,
+            error TEXT,
+            created_at TEXT
+        )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_llm_calls_run ON llm_calls(run_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_llm_calls_article ON llm_calls(article_id)")
+    
+    # Step timings of every analyze_article run; stages_json maps step -> {start, seconds}
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS analysis_timings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            article_id TEXT,
+            run_id TEXT,
+            analyzed_at TEXT,
+            content_seconds REAL,
+            stages_seconds REAL,
+            graph_seconds REAL,
+            total_seconds REAL,
+            stages_json TEXT
+        )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_analysis_timings_run ON analysis_timings(run_id)")
+    
     c.execute("PRAGMA table_info(articles)")
     existing = {row[1] for row in c.fetchall()}
     
@@ -103,6 +266,49 @@ def init_db():
             except Exception as e:
                 print(f"   ⚠️ Could not add column {col_name}: {e}")
     
+    if "url_alias_of" not in existing:
+        # URL copies were briefly linked through duplicate_of, the near-duplicate link; only they lack canonical_url
+        c.execute('''
+            UPDATE articles SET url_alias_of = duplicate_of, duplicate_of = NULL
+            WHERE canonical_url IS NULL AND duplicate_of IS NOT NULL
+        ''')
+    
+    # Jobs created before the analysis mode was stored were all analyzed interactively
+    c.execute("PRAGMA table_info(backfill_jobs)")
+    if "analysis" not in {row[1] for row in c.fetchall()}:
+        c.execute("ALTER TABLE backfill_jobs ADD COLUMN analysis TEXT DEFAULT 'interactive'")
+        print("   Added column: backfill_jobs.analysis")
+    
+    # --- SEEN-URL INDEX ---
+    # Fill canonical_url for older rows, then enforce uniqueness. The first row wins; later
+    # copies of the same URL keep canonical_url NULL and point at it through url_alias_of
+    # (duplicate_of is the near-duplicate text link), which also keeps them out of this
+    # query on the next startup.
+    c.execute('''
+        SELECT id, url FROM articles WHERE canonical_url IS NULL AND url IS NOT NULL AND url_alias_of IS NULL
+        ORDER BY rowid
+    ''')
+    pending = c.fetchall()
+    if pending:
+        c.execute("SELECT canonical_url, id FROM articles WHERE canonical_url IS NOT NULL")
+        taken = dict(c.fetchall())
+        linked = 0
+        for article_id, url in pending:
+            canonical = canonicalize_url(url)
+            if canonical in taken:
+                c.execute("UPDATE articles SET url_alias_of = ? WHERE id = ?", (taken[canonical], article_id))
+                linked += 1
+            else:
+                taken[canonical] = article_id
+                c.execute("UPDATE articles SET canonical_url = ? WHERE id = ?", (canonical, article_id))
+        print(f"   Indexed canonical URLs for {len(pending) - linked} articles ({linked} URL copies linked)")
+    c.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_articles_canonical_url ON articles(canonical_url)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_articles_duplicate_of ON articles(duplicate_of)")
+    
+    # Rows from before multi-source crawling all came from The Hacker News
+    c.execute("UPDATE articles SET source = 'thehackernews' WHERE source IS NULL AND url LIKE '%thehackernews.com/%'")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_articles_source ON articles(source)")
+    
     conn.commit()
     conn.close()
     print("✅ Database initialized with enhanced schema (v3.1)")
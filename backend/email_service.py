@@ -1,10 +1,12 @@
 import json
+import uuid
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 import os
 
 from database import get_db_connection
 from config import COUNTRY_DATA
+import http_client
 
 # Email configuration - Using Resend API
 RESEND_API_KEY = os.getenv("RESEND_API_KEY", "")
@@ -167,14 +169,15 @@ def send_email(to_email: str, subject: str, html_content: str) -> bool:
         return False
     
     try:
-        import requests
-        
-        response = requests.post(
+        # Idempotency key makes retries on 5xx safe (Resend won't send twice)
+        response = http_client.post(
             "https://api.resend.com/emails",
             headers={
                 "Authorization": f"Bearer {resend_api_key}",
-                "Content-Type": "application/json"
+                "Content-Type": "application/json",
+                "Idempotency-Key": str(uuid.uuid4())
             },
+            retry_unsafe=True,
             json={
                 "from": FROM_EMAIL or "Security Digest <onboarding@resend.dev>",
                 "to": [to_email],
@@ -0,0 +1,362 @@
+import json
+import re
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlparse
+
+from bs4.dammit import EncodingDetector
+from lxml import etree
+
+from config import BASE_URL
+from utils import get_favicon_url, get_domain_name
+
+# Text under these tags is never part of get_text() for ordinary elements
+NON_TEXT_TAGS = {"script", "style", "template", "rt", "rp"}
+
+# Elements stripped from the article body before text/source extraction
+BODY_DROP_TAGS = {"script", "style", "aside", "nav", "iframe", "ins", "noscript"}
+
+DATE_PATTERNS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+class _TreeTarget:
+    """
+    Parser target that builds an lxml tree the way BeautifulSoup's builder sees the events:
+    processing instructions are dropped, and a document cut short (e.g. by an encoding
+    error) keeps whatever was parsed instead of failing.
+    """
+
+    def __init__(self):
+        self.builder = etree.TreeBuilder()
+        self.open_tags = []
+        self.started = False
+        self.data = self.builder.data
+        self.comment = self.builder.comment
+
+    def start(self, tag, attrib):
+        self.started = True
+        self.open_tags.append(tag)
+        return self.builder.start(tag, attrib)
+
+    def end(self, tag):
+        self.open_tags.pop()
+        return self.builder.end(tag)
+
+    def pi(self, target, data=None):
+        pass
+
+    def close(self):
+        if not self.started:
+            return None
+        while self.open_tags:
+            self.builder.end(self.open_tags.pop())
+        return self.builder.close()
+
+
+def parse_html_tree(html: bytes) -> Optional[etree._Element]:
+    """
+    Parse bytes with lxml exactly the way BeautifulSoup(html, "lxml") does:
+    same encoding candidates, one feed() of the whole document, same SAX event path
+    (a TreeBuilder-backed target instead of BeautifulSoup's tree builder).
+    """
+    detector = EncodingDetector(html, known_definite_encodings=[None], user_encodings=[None], is_html=True)
+    last_error = None
+    for encoding in detector.encodings:
+        try:
+            parser = etree.HTMLParser(target=_TreeTarget(), strip_cdata=False, recover=True, encoding=encoding)
+            parser.feed(detector.markup)
+            return parser.close()
+        except (UnicodeDecodeError, LookupError, etree.ParserError) as e:
+            last_error = e
+    raise ValueError(f"Could not parse document: {last_error}")
+
+
+def _has_class(el: etree._Element, name: str) -> bool:
+    return name in (el.get("class") or "").split()
+
+
+def _collect_strings(el: etree._Element, out: List[str], links: list = None, in_text: bool = True):
+    """Append el's text nodes in document order (BeautifulSoup get_text semantics)."""
+    if in_text and el.text:
+        out.append(el.text)
+    for child in el:
+        tag = child.tag
+        if isinstance(tag, str):
+            if links is not None and tag == "a" and child.get("href") is not None:
+                links.append(child)
+            if in_text and tag not in NON_TEXT_TAGS:
+                _collect_strings(child, out, links)
+            elif links is not None:
+                # No text from here down, but links still count as sources
+                _collect_strings(child, out, links, in_text=False)
+        if in_text and child.tail:
+            out.append(child.tail)
+
+
+def _drop(el: etree._Element):
+    """
+    Remove el from the tree like Tag.decompose(). A comment placeholder keeps
+    its tail as a separate string, since bs4 never merges the neighbouring strings.
+    """
+    parent = el.getparent()
+    if parent is None:
+        return
+    placeholder = etree.Comment()
+    placeholder.tail = el.tail
+    parent.replace(el, placeholder)
+
+
+def _attached(el: etree._Element, root: etree._Element) -> bool:
+    """True if el is still part of the document rooted at root."""
+    for ancestor in el.iterancestors():
+        el = ancestor
+    return el is root
+
+
+def _inside_non_text(el: etree._Element) -> bool:
+    """True if el sits under a script/style/template/ruby-text container (its strings are not text)."""
+    if el.tag in NON_TEXT_TAGS:
+        return True
+    return any(ancestor.tag in NON_TEXT_TAGS for ancestor in el.iterancestors())
+
+
+def get_text(el: etree._Element, separator: str = "") -> str:
+    """Equivalent of Tag.get_text(separator, strip=True)."""
+    out = []
+    _collect_strings(el, out, in_text=not _inside_non_text(el))
+    return separator.join(s.strip() for s in out if s.strip())
+
+
+def extract_page_title(html: bytes) -> Optional[str]:
+    """Article headline from og:title, falling back to the <title> element."""
+    root = parse_html_tree(html)
+    if root is None:
+        return None
+    for meta in root.iter("meta"):
+        if meta.get("property") == "og:title" and (meta.get("content") or "").strip():
+            return meta.get("content").strip()
+    title = next(root.iter("title"), None)
+    return (get_text(title) or None) if title is not None else None
+
+
+def extract_page_published(html: bytes) -> Optional[str]:
+    """
+    Publication date ("%b %d, %Y", as on listing pages) from article:published_time,
+    falling back to the date span.author of The Hacker News template.
+    """
+    root = parse_html_tree(html)
+    if root is None:
+        return None
+    for meta in root.iter("meta"):
+        if meta.get("property") == "article:published_time":
+            try:
+                return datetime.fromisoformat((meta.get("content") or "").strip()[:10]).strftime("%b %d, %Y")
+            except ValueError:
+                pass
+    for span in root.iter("span"):
+        if "author" in (span.get("class") or "").split():
+            text = get_text(span)
+            if re.match(r'^[A-Za-z]{3}\s+\d{1,2},\s+\d{4}$', text):
+                return text
+    return None
+
+
+def extract_article_details(html: bytes, detect_category, site: str = BASE_URL) -> Dict[str, Any]:
+    """
+    Single-pass lxml extraction producing the same dict as scraper.parse_article_details.
+    One walk over the document collects every candidate element; only the article body is walked again.
+    Links into `site` only count as sources when they point at a dated article path.
+    """
+    site_host = urlparse(site).netloc
+    result = {
+        "full_text": "",
+        "author": None,
+        "category": None,
+        "tags": [],
+        "sources": [],
+        "reading_time": 0,
+        "image_url": None,
+        "media_type": "none"
+    }
+
+    root = parse_html_tree(html)
+    if root is None:
+        return result
+
+    og_image = None
+    twitter_img = None
+    meta_descs = []
+    video_iframe = None
+    title_tags = []
+    author_spans = []
+    author_link = None
+    ld_scripts = []
+    tags_span = None
+    div_articlebody_id = None
+    div_articlebody_class = None
+    div_post_body = None
+    article_tag = None
+
+    # --- Single traversal collecting all candidates ---
+    for el in root.iter():
+        tag = el.tag
+        if not isinstance(tag, str):
+            continue
+        if tag == "meta":
+            if og_image is None and el.get("property") == "og:image":
+                og_image = el
+            name = el.get("name")
+            if twitter_img is None and name == "twitter:image":
+                twitter_img = el
+            if name == "description":
+                meta_descs.append(el)
+        elif tag == "span":
+            if _has_class(el, "author"):
+                author_spans.append(el)
+            if tags_span is None and _has_class(el, "p-tags"):
+                tags_span = el
+        elif tag == "div":
+            if div_articlebody_id is None and el.get("id") == "articlebody":
+                div_articlebody_id = el
+            if div_articlebody_class is None and _has_class(el, "articlebody"):
+                div_articlebody_class = el
+            if div_post_body is None and _has_class(el, "post-body"):
+                div_post_body = el
+        elif tag == "a":
+            if author_link is None and "author" in (el.get("rel") or "").split():
+                author_link = el
+        elif tag == "script":
+            if el.get("type") == "application/ld+json":
+                ld_scripts.append(el)
+        elif tag == "iframe":
+            src = el.get("src")
+            if video_iframe is None and src and ("youtube" in src or "vimeo" in src):
+                video_iframe = el
+        elif tag == "title":
+            title_tags.append(el)
+        elif tag == "article":
+            if article_tag is None:
+                article_tag = el
+
+    # --- Extract Featured Image ---
+    if og_image is not None and og_image.get("content"):
+        img_url = og_image.get("content")
+        result["image_url"] = img_url
+        result["media_type"] = "gif" if ".gif" in img_url.lower() else "image"
+
+    if not result["image_url"]:
+        if twitter_img is not None and twitter_img.get("content"):
+            result["image_url"] = twitter_img.get("content")
+            result["media_type"] = "image"
+
+    if video_iframe is not None:
+        video_src = video_iframe.get("src", "")
+        if "youtube" in video_src:
+            video_id_match = re.search(r'(?:embed/|v=|vi=)([a-zA-Z0-9_-]{11})', video_src)
+            if video_id_match:
+                result["image_url"] = f"https://img.youtube.com/vi/{video_id_match.group(1)}/maxresdefault.jpg"
+                result["media_type"] = "video"
+
+    if not result["image_url"]:
+        article_body = div_articlebody_id if div_articlebody_id is not None else div_post_body
+        if article_body is not None:
+            first_img = next(article_body.iter("img"), None)
+            if first_img is not None:
+                img_url = first_img.get("data-src") or first_img.get("src")
+                if img_url and not img_url.endswith(('.svg', '.ico')):
+                    result["image_url"] = img_url
+                    result["media_type"] = "gif" if ".gif" in img_url.lower() else "image"
+
+    # --- Extract Author ---
+    for author_span in author_spans:
+        author_text = get_text(author_span)
+        if author_text and len(author_text) > 3:
+            is_date = any(month in author_text for month in DATE_PATTERNS)
+            if not is_date and not re.match(r'^[A-Za-z]{3}\s+\d{1,2},\s+\d{4}$', author_text):
+                result["author"] = author_text
+                break
+
+    if not result["author"]:
+        if author_link is not None:
+            result["author"] = get_text(author_link)
+
+    if not result["author"]:
+        for script_ld in ld_scripts:
+            try:
+                ld_data = json.loads(script_ld.text if len(script_ld) == 0 else None)
+                if isinstance(ld_data, dict):
+                    author_data = ld_data.get("author")
+                    if isinstance(author_data, dict):
+                        name = author_data.get("name", "").strip()
+                        if name and name != "The Hacker News":
+                            result["author"] = name
+                            break
+            except:
+                pass
+
+    # --- Extract Tags ---
+    if tags_span is not None:
+        tags_text = get_text(tags_span)
+        if tags_text:
+            result["tags"] = [tag.strip() for tag in tags_text.split("/") if tag.strip()]
+
+    # --- Extract Article Body (text and links in one walk) ---
+    body = next((el for el in (div_articlebody_id, div_articlebody_class, div_post_body, article_tag)
+                 if el is not None), None)
+
+    if body is not None:
+        # Stripping the body can take <title>/<meta> candidates with it, as in the bs4 version
+        for el in [el for el in body.iter(*BODY_DROP_TAGS) if el is not body]:
+            _drop(el)
+
+        strings = []
+        links = []
+        _collect_strings(body, strings, links, in_text=not _inside_non_text(body))
+        full_text = " ".join(s.strip() for s in strings if s.strip())
+        result["full_text"] = full_text
+        result["reading_time"] = max(1, round(len(full_text.split()) / 200))
+
+        seen_domains = set()
+        for link in links:
+            href = link.get('href', '')
+            text = get_text(link)
+
+            if not href or href.startswith('#') or href.startswith('javascript:'):
+                continue
+            if site_host in href and '/20' not in href:
+                continue
+
+            if href.startswith('/'):
+                href = f"{site}{href}"
+
+            domain = get_domain_name(href)
+            if domain in seen_domains:
+                continue
+            if any(ext in href.lower() for ext in ['.gif', '.jpg', '.png', '.svg', '.webp', '.mp4']):
+                continue
+
+            seen_domains.add(domain)
+            result["sources"].append({
+                "name": text[:80] if text else domain,
+                "url": href,
+                "domain": domain,
+                "favicon": get_favicon_url(href)
+            })
+
+        result["sources"] = result["sources"][:15]
+        title_tag = next((el for el in title_tags if _attached(el, root)), None)
+        title = get_text(title_tag) if title_tag is not None else ""
+        result["category"] = detect_category(title, full_text)
+
+    if not result["category"]:
+        title_tag = next((el for el in title_tags if _attached(el, root)), None)
+        if title_tag is not None:
+            result["category"] = detect_category(get_text(title_tag), "")
+
+    if not result["full_text"]:
+        meta_desc = next((el for el in meta_descs if _attached(el, root)), None)
+        if meta_desc is not None:
+            result["full_text"] = meta_desc.get("content", "")
+
+    return result
@@ -0,0 +1,65 @@
+"""
+Fixture article pages and a local HTTP server serving them, shared by the benchmarks
+and the extractor checks.
+"""
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+ARTICLE_HTML = """<html><head>
+<title>Fixture Article {n} - Ransomware Hits Cloud Provider</title>
+<meta property="og:image" content="https://example.com/img/{n}.jpg">
+<meta name="description" content="Fixture article {n}">
+</head><body>
+<span class="author">Nov 28, 2025</span><span class="author">Fixture Author</span>
+<span class="p-tags">Malware / Vulnerability</span>
+<div id="articlebody">
+{paragraphs}
+<a href="https://www.cisa.gov/advisory/{n}">CISA advisory</a>
+<a href="https://github.com/example/poc-{n}">proof of concept</a>
+</div></body></html>"""
+
+PARAGRAPH = "<p>Threat actors exploited a zero-day vulnerability in a cloud service to deploy ransomware and exfiltrate data from enterprise customers.</p>"
+# Filler vocabulary, so pages with different numbers do not fingerprint as near-duplicates
+WORDS = sorted(set("""
+    attackers breached cloud tenants through stolen tokens while defenders rotated credentials patched gateways
+    researchers traced command servers malware loaders phishing lures botnet infrastructure exposed databases
+    administrators urged vendors disclosed advisories exploited appliances firmware updates incident response
+    """.split()))
+
+
+def article_page(n, paragraphs: int = 40) -> bytes:
+    """Fixture page n: a topical lead paragraph and paragraphs - 1 paragraphs of filler seeded by n."""
+    rng = random.Random(str(n))
+    filler = "".join(
+        "<p>" + " ".join(rng.choice(WORDS) for _ in range(20)).capitalize() + ".</p>" for _ in range(paragraphs - 1)
+    )
+    return ARTICLE_HTML.format(n=n, paragraphs=PARAGRAPH + filler).encode("utf-8")
+
+
+def make_handler(latency: float):
+    """Request handler answering every path with a fixture article page after `latency` seconds."""
+    class FixtureHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            body = article_page(self.path.rsplit("/", 1)[-1])
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FixtureHandler
+
+
+def start_fixture_server(latency: float = 0.0) -> ThreadingHTTPServer:
+    """Fixture page server on a free local port (base URL: http://127.0.0.1:<server_address[1]>)."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
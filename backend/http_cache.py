@@ -0,0 +1,183 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional
+
+import requests
+
+import http_client
+from config import HTTP_CACHE_DB, HTTP_CACHE_MAX_BYTES, HEADERS
+
+
+class CachedResponse:
+    """Minimal response object returned by the cache layer."""
+
+    def __init__(self, url: str, status_code: int, content: bytes,
+                 not_modified: bool = False, parsed: Any = None):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.not_modified = not_modified
+        self.parsed = parsed
+
+
+class HttpCache:
+    """
+    Persistent HTTP cache with conditional GET (ETag / Last-Modified).
+    Stores body and last parsed result per URL, bounded by total body size with LRU eviction.
+    """
+
+    def __init__(self, db_file: str = HTTP_CACHE_DB, max_bytes: int = HTTP_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body BLOB,
+                size INTEGER,
+                parsed_version TEXT,
+                parsed_json TEXT,
+                parse_seconds REAL,
+                stored_at REAL,
+                last_access REAL
+            )
+        ''')
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_http_cache_access ON http_cache(last_access)")
+        self.conn.commit()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache").fetchone()[0]
+        self.stats = {
+            "hits": 0,            # 304 Not Modified, served from cache
+            "misses": 0,          # Full 200 download
+            "bytes_saved": 0,     # Body bytes not re-downloaded thanks to 304s
+            "parses_skipped": 0,  # Parsed results reused on 304
+            "parse_seconds_saved": 0.0,
+            "evictions": 0
+        }
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, body, parsed_version, parsed_json, parse_seconds FROM http_cache WHERE url = ?",
+                (url,)
+            ).fetchone()
+            if not row:
+                return None
+            self.conn.execute("UPDATE http_cache SET last_access = ? WHERE url = ?", (time.time(), url))
+            self.conn.commit()
+        return {
+            "etag": row[0],
+            "last_modified": row[1],
+            "body": row[2],
+            "parsed_version": row[3],
+            "parsed_json": row[4],
+            "parse_seconds": row[5] or 0.0
+        }
+
+    def store(self, url: str, etag: Optional[str], last_modified: Optional[str], body: bytes):
+        now = time.time()
+        with self.lock:
+            old = self.conn.execute("SELECT size FROM http_cache WHERE url = ?", (url,)).fetchone()
+            if old:
+                self.total_bytes -= old[0]
+            self.conn.execute('''
+                INSERT OR REPLACE INTO http_cache
+                (url, etag, last_modified, body, size, parsed_version, parsed_json, parse_seconds, stored_at, last_access)
+                VALUES (?, ?, ?, ?, ?, NULL, NULL, NULL, ?, ?)
+            ''', (url, etag, last_modified, body, len(body), now, now))
+            self.total_bytes += len(body)
+            self._evict()
+            self.conn.commit()
+
+    def store_parsed(self, url: str, version: str, parsed: Any, parse_seconds: float = 0.0):
+        """Remember the parsed result of the cached body so a 304 can skip parsing."""
+        with self.lock:
+            self.conn.execute(
+                "UPDATE http_cache SET parsed_version = ?, parsed_json = ?, parse_seconds = ? WHERE url = ?",
+                (version, json.dumps(parsed), parse_seconds, url)
+            )
+            self.conn.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until under the size bound (lock held)."""
+        while self.total_bytes > self.max_bytes:
+            row = self.conn.execute(
+                "SELECT url, size FROM http_cache ORDER BY last_access ASC LIMIT 1"
+            ).fetchone()
+            if not row:
+                break
+            self.conn.execute("DELETE FROM http_cache WHERE url = ?", (row[0],))
+            self.total_bytes -= row[1]
+            self.stats["evictions"] += 1
+
+    def fetch(self, url: str, session: requests.Session = None, parsed_version: str = None,
+              timeout: int = 15) -> CachedResponse:
+        """GET a URL, revalidating any cached copy with If-None-Match / If-Modified-Since."""
+        headers = dict(HEADERS)
+        cached = self.lookup(url)
+        if cached:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        response = http_client.get(url, session=session, headers=headers, timeout=timeout)
+
+        if response.status_code == 304 and cached:
+            with self.lock:
+                self.stats["hits"] += 1
+                self.stats["bytes_saved"] += len(cached["body"] or b"")
+            parsed = None
+            if parsed_version and cached["parsed_version"] == parsed_version and cached["parsed_json"]:
+                parsed = json.loads(cached["parsed_json"])
+                with self.lock:
+                    self.stats["parses_skipped"] += 1
+                    self.stats["parse_seconds_saved"] += cached["parse_seconds"]
+            return CachedResponse(url, 200, cached["body"], not_modified=True, parsed=parsed)
+
+        with self.lock:
+            self.stats["misses"] += 1
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status_code == 200 and (etag or last_modified):
+            self.store(url, etag, last_modified, response.content)
+
+        return CachedResponse(url, response.status_code, response.content)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = dict(self.stats)
+            stats["entries"] = self.conn.execute("SELECT COUNT(*) FROM http_cache").fetchone()[0]
+        total = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / total, 3) if total else 0
+        stats["parse_seconds_saved"] = round(stats["parse_seconds_saved"], 3)
+        stats["size_bytes"] = self.total_bytes
+        stats["max_bytes"] = self.max_bytes
+        return stats
+
+
+_http_cache = None
+_http_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> HttpCache:
+    """Lazy initialization of the process-wide HTTP cache."""
+    global _http_cache
+    with _http_cache_lock:
+        if _http_cache is None:
+            _http_cache = HttpCache()
+    return _http_cache
+
+
+def cached_get(url: str, session: requests.Session = None, parsed_version: str = None,
+               timeout: int = 15) -> CachedResponse:
+    """Conditional GET through the shared HTTP cache."""
+    return get_http_cache().fetch(url, session=session, parsed_version=parsed_version, timeout=timeout)
+
+
+def get_http_cache_stats() -> Dict[str, Any]:
+    return get_http_cache().get_stats()
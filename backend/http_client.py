@@ -0,0 +1,193 @@
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import (
+    HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_TIMEOUT,
+    HTTP_MAX_RETRIES, HTTP_BACKOFF_BASE, HTTP_BACKOFF_MAX, HTTP_HOST_OVERRIDES
+)
+from rate_governor import get_rate_governor, THROTTLE_STATUSES
+from cassette import get_cassette
+
+# Statuses worth retrying: throttling and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Latency samples kept per host for percentiles
+LATENCY_WINDOW = 500
+
+
+class HostStats:
+    """Per-host request counters (guarded by the client lock)."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0       # Exceptions, 429s and 5xx responses
+        self.retries = 0
+        self.throttled = 0    # 429 responses
+        self.total_seconds = 0.0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        p = lambda q: round(ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000, 1) if ordered else 0
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": round(self.errors / self.requests, 3) if self.requests else 0,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "avg_ms": round(self.total_seconds / self.requests * 1000, 1) if self.requests else 0,
+            "p50_ms": p(0.5),
+            "p95_ms": p(0.95)
+        }
+
+
+_session = None
+_lock = threading.Lock()
+_host_stats: Dict[str, HostStats] = {}
+
+
+def get_http_session() -> requests.Session:
+    """Lazy initialization of the shared keep-alive session (one connection pool per host)."""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+    return _session
+
+
+def _record(host: str, seconds: float, error: bool, throttled: bool = False, retry: bool = False):
+    with _lock:
+        stats = _host_stats.setdefault(host, HostStats())
+        stats.requests += 1
+        stats.total_seconds += seconds
+        stats.latencies.append(seconds)
+        stats.errors += error
+        stats.throttled += throttled
+        stats.retries += retry
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Exponential backoff with full jitter; a server's Retry-After takes precedence."""
+    if retry_after is not None:
+        return min(retry_after, HTTP_BACKOFF_MAX)
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * (2 ** attempt)))
+
+
+def route_url(url: str) -> str:
+    """Apply HTTP_HOST_OVERRIDES (stand-in servers): same path and query, other base URL."""
+    if not HTTP_HOST_OVERRIDES:
+        return url
+    parts = urlparse(url)
+    base = HTTP_HOST_OVERRIDES.get(parts.netloc)
+    if not base:
+        return url
+    return base.rstrip("/") + (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+
+def request(method: str, url: str, session: requests.Session = None, timeout=HTTP_TIMEOUT,
+            retries: int = HTTP_MAX_RETRIES, retry_unsafe: bool = False, **kwargs) -> requests.Response:
+    """
+    Send a request through the pooled session, retrying connection errors,
+    429 and 5xx responses. Non-idempotent methods are only retried on 429
+    (the server refused the request) unless retry_unsafe is set, e.g. when
+    an idempotency key makes resending safe. Hosts with a rate governor
+    bucket wait for a token before every attempt and feed back the outcome.
+    With a cassette in "replay" mode nothing goes to the network; in "record"
+    mode the final response is saved under the original URL.
+    """
+    cassette = get_cassette()
+    body = kwargs.get("json", kwargs.get("data"))
+    if cassette and cassette.mode == "replay":
+        response = cassette.play(method, url, body)
+        _record(urlparse(url).netloc, 0.0, error=response.status_code in RETRY_STATUSES,
+                throttled=response.status_code == 429)
+        return response
+
+    response = _send(method, url, session, timeout, retries, retry_unsafe, **kwargs)
+    if cassette and cassette.mode == "record":
+        cassette.record(method, url, body, response)
+    return response
+
+
+def _send(method: str, url: str, session: requests.Session, timeout, retries: int,
+          retry_unsafe: bool, **kwargs) -> requests.Response:
+    http = session or get_http_session()
+    host = urlparse(url).netloc
+    target = route_url(url)
+    bucket = get_rate_governor().bucket_for_host(host)
+    idempotent = retry_unsafe or method.upper() in ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+    for attempt in range(retries + 1):
+        if bucket:
+            bucket.acquire()
+        start = time.perf_counter()
+        try:
+            response = http.request(method, target, timeout=timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            _record(host, time.perf_counter() - start, error=True, retry=attempt > 0)
+            if attempt >= retries or not idempotent:
+                raise
+            time.sleep(backoff_delay(attempt))
+            continue
+
+        status = response.status_code
+        latency = time.perf_counter() - start
+        failed = status in RETRY_STATUSES
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            retry_after = min(retry_after, HTTP_BACKOFF_MAX)
+        _record(host, latency, error=failed, throttled=status == 429, retry=attempt > 0)
+        throttled = status in THROTTLE_STATUSES
+        if bucket:
+            bucket.record(latency, throttled=throttled, retry_after=retry_after, error=status >= 400)
+
+        if not failed or attempt >= retries or not (idempotent or status == 429):
+            return response
+
+        delay = backoff_delay(attempt, retry_after)
+        print(f"   🔁 {host} returned {status}, retrying in {delay:.1f}s ({attempt + 1}/{retries})")
+        response.close()
+        if not (bucket and throttled and retry_after is not None):
+            time.sleep(delay)  # Otherwise the bucket, paused on throttles, already enforces Retry-After
+
+    return response
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def get_http_client_stats() -> Dict[str, Any]:
+    """Per-host latency and error-rate counters."""
+    with _lock:
+        return {host: stats.snapshot() for host, stats in sorted(_host_stats.items())}
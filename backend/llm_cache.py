@@ -0,0 +1,56 @@
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, List, Tuple
+
+from config import LLM_CACHE_DB, LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES
+from ttl_cache import PersistentTTLCache
+
+
+def completion_key(model: str, prompt_version: str, messages: List[Dict[str, str]], **params) -> str:
+    """Content hash of everything that determines a completion: model, prompt version, messages, parameters."""
+    payload = json.dumps([model, prompt_version, messages, params], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache(PersistentTTLCache):
+    """
+    Completions keyed by completion_key(). Each entry keeps the parsed response with
+    the usage and latency of the original call, so hits report tokens and time saved.
+    """
+
+    def __init__(self, db_file: str = LLM_CACHE_DB, ttl: float = LLM_CACHE_TTL,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        super().__init__(db_file, "llm_responses", ttl, max_entries=max_entries)
+        self.stats.update({"tokens_saved": 0, "seconds_saved": 0.0})
+
+    def get_or_create(self, key: str, create: Callable[[], Dict[str, Any]]) -> Tuple[Dict[str, Any], bool]:
+        """
+        The cached completion for key, or create() -> {"result", "usage", "latency"} stored
+        under it. Returns (entry, hit). Failures raise and are not cached.
+        """
+        entry, state = self.get_or_compute(key, create)
+        hit = state != "computed"
+        if hit:
+            with self.lock:
+                self.stats["tokens_saved"] += (entry.get("usage") or {}).get("total_tokens", 0)
+                self.stats["seconds_saved"] += entry.get("latency", 0.0)
+        return entry, hit
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats["seconds_saved"] = round(stats["seconds_saved"], 2)
+        return stats
+
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Lazy initialization of the process-wide LLM response cache."""
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = LLMResponseCache()
+    return _llm_cache
@@ -0,0 +1,204 @@
+import asyncio
+import threading
+import time
+from typing import List, Dict, Any
+
+import httpx
+
+from config import (
+    OPENAI_API_KEY, OPENAI_BASE_URL, OPENAI_MODEL, LLM_MAX_CONCURRENCY, LLM_TOKENS_PER_MINUTE,
+    LLM_COMPLETION_TOKENS_ESTIMATE, LLM_MAX_RETRIES, LLM_TIMEOUT, OPENAI_PRICES_PER_MILLION, OPENAI_BATCH_DISCOUNT
+)
+from rate_governor import get_rate_governor
+from prompt_budget import count_tokens
+
+try:
+    from openai import AsyncOpenAI
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+
+def estimate_tokens(messages: List[Dict[str, str]]) -> int:
+    """Prompt size: tokens of each message plus the chat format's per-message overhead."""
+    return sum(count_tokens(m.get("content") or "") + 4 for m in messages) + 3
+
+
+def completion_cost(model: str, prompt_tokens: int, completion_tokens: int, batch: bool = False) -> float:
+    """USD cost of a completion (0 for models without a price entry)."""
+    prices = next((p for name, p in OPENAI_PRICES_PER_MILLION.items() if model.startswith(name)), None)
+    if not prices:
+        return 0.0
+    cost = (prompt_tokens * prices["input"] + completion_tokens * prices["output"]) / 1_000_000
+    return cost * OPENAI_BATCH_DISCOUNT if batch else cost
+
+
+class TokenBudget:
+    """
+    Tokens-per-minute bucket shared by all completions (lives on the client's loop).
+    Calls reserve their estimated tokens up front and settle the difference with the
+    actual usage afterwards, so a burst of long prompts waits instead of drawing 429s.
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = tokens_per_minute
+        self.rate = tokens_per_minute / 60.0
+        self.tokens = float(tokens_per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def reserve(self, tokens: int) -> float:
+        """Wait until tokens are available (a request larger than the budget waits for a full one)."""
+        tokens = min(tokens, self.capacity)
+        waited = 0.0
+        while True:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return waited
+            wait = (tokens - self.tokens) / self.rate
+            waited += wait
+            await asyncio.sleep(wait)
+
+    def settle(self, estimated: int, actual: int):
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + estimated - actual)
+
+
+class LLMClient:
+    """
+    One AsyncOpenAI client (one keep-alive connection pool) on a dedicated event loop
+    thread, shared by every analysis path. Synchronous callers block on complete();
+    at most LLM_MAX_CONCURRENCY completions are in flight and tokens are paced by
+    LLM_TOKENS_PER_MINUTE, requests by the "openai" rate governor bucket.
+    """
+
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY, tokens_per_minute: int = LLM_TOKENS_PER_MINUTE):
+        self.max_concurrency = max_concurrency
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True, name="llm-client")
+        self.thread.start()
+        self.lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "errors": 0,
+            "throttled": 0,
+            "in_flight": 0,
+            "peak_in_flight": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "budget_wait_seconds": 0.0,
+            "governor_wait_seconds": 0.0
+        }
+        self.run(self._setup(tokens_per_minute))
+
+    async def _setup(self, tokens_per_minute: int):
+        # Created on the loop so the pool and semaphore belong to it
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.budget = TokenBudget(tokens_per_minute)
+        self.client = AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            base_url=OPENAI_BASE_URL,
+            max_retries=LLM_MAX_RETRIES,
+            http_client=httpx.AsyncClient(
+                timeout=LLM_TIMEOUT,
+                limits=httpx.Limits(max_connections=self.max_concurrency,
+                                    max_keepalive_connections=self.max_concurrency)
+            )
+        )
+
+    def run(self, coroutine):
+        """Run a coroutine on the client's loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def complete(self, messages: List[Dict[str, str]], model: str = OPENAI_MODEL, purpose: str = "completion",
+                 **params) -> Dict[str, Any]:
+        """
+        Chat completion -> {"content", "usage", "latency", "model"} (blocking).
+        Every call, failed ones included, is recorded in llm_calls under `purpose`.
+        """
+        # Imported here to avoid a circular dependency (llm_usage prices calls with completion_cost)
+        from llm_usage import record_llm_call
+        start = time.perf_counter()
+        try:
+            result = self.run(self.acomplete(messages, model=model, **params))
+        except Exception as e:
+            record_llm_call(purpose, model, latency=time.perf_counter() - start, error=str(e)[:200])
+            raise
+        usage = result["usage"] or {}
+        record_llm_call(purpose, result["model"] or model, usage.get("prompt_tokens", 0),
+                        usage.get("completion_tokens", 0), result["latency"])
+        return result
+
+    async def acomplete(self, messages: List[Dict[str, str]], model: str = OPENAI_MODEL, **params) -> Dict[str, Any]:
+        estimated = estimate_tokens(messages) + params.get("max_tokens", LLM_COMPLETION_TOKENS_ESTIMATE)
+        budget_wait = await self.budget.reserve(estimated)
+        async with self.semaphore:
+            bucket = get_rate_governor().bucket("openai")
+            governor_wait = bucket.reserve()
+            if governor_wait > 0:
+                await asyncio.sleep(governor_wait)
+            with self.lock:
+                self.stats["requests"] += 1
+                self.stats["in_flight"] += 1
+                self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.stats["in_flight"])
+                self.stats["budget_wait_seconds"] += budget_wait
+                self.stats["governor_wait_seconds"] += governor_wait
+            start = time.perf_counter()
+            try:
+                response = await self.client.chat.completions.create(model=model, messages=messages, **params)
+            except Exception as e:
+                throttled = getattr(e, "status_code", None) == 429
+                if throttled:
+                    bucket.record(throttled=True)
+                with self.lock:
+                    self.stats["errors"] += 1
+                    self.stats["throttled"] += throttled
+                self.budget.settle(estimated, 0)
+                raise
+            finally:
+                with self.lock:
+                    self.stats["in_flight"] -= 1
+            latency = time.perf_counter() - start
+            bucket.record(latency=latency)
+
+        usage = response.usage.model_dump() if response.usage else None
+        actual = usage["total_tokens"] if usage else estimated
+        self.budget.settle(estimated, actual)
+        with self.lock:
+            if usage:
+                self.stats["prompt_tokens"] += usage["prompt_tokens"]
+                self.stats["completion_tokens"] += usage["completion_tokens"]
+        return {
+            "content": response.choices[0].message.content,
+            "usage": usage,
+            "latency": latency,
+            "model": response.model
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = dict(self.stats)
+        stats["budget_wait_seconds"] = round(stats["budget_wait_seconds"], 2)
+        stats["governor_wait_seconds"] = round(stats["governor_wait_seconds"], 2)
+        stats["max_concurrency"] = self.max_concurrency
+        stats["tokens_per_minute"] = self.budget.capacity
+        stats["budget_available"] = int(self.budget.tokens)
+        return stats
+
+
+_llm_client = None
+_llm_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClient:
+    """Lazy initialization of the process-wide LLM client."""
+    global _llm_client
+    with _llm_client_lock:
+        if _llm_client is None:
+            _llm_client = LLMClient()
+    return _llm_client
@@ -0,0 +1,105 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from database import get_db_connection
+from llm_client import completion_cost
+
+# article_id/run_id of the completions made in the current thread (see llm_call_context)
+_call_context: ContextVar[Dict[str, Any]] = ContextVar("llm_call_context", default={})
+
+
+@contextmanager
+def llm_call_context(**fields):
+    """Attribute the LLM calls made inside the block to an article and/or run in llm_calls."""
+    token = _call_context.set({**_call_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _call_context.reset(token)
+
+
+def current_call_context() -> Dict[str, Any]:
+    """article_id/run_id set by the enclosing llm_call_context blocks."""
+    return dict(_call_context.get())
+
+
+def record_llm_call(purpose: str, model: str, prompt_tokens: int = 0, completion_tokens: int = 0,
+                    latency: Optional[float] = None, cached: bool = False, batch: bool = False,
+                    error: str = None, **fields):
+    """
+    One row in llm_calls. Cache hits are recorded with no tokens (nothing was billed);
+    article_id/run_id default to the enclosing llm_call_context.
+    """
+    context = {**_call_context.get(), **fields}
+    cost = completion_cost(model, prompt_tokens, completion_tokens, batch=batch)
+    try:
+        conn = get_db_connection()
+        conn.execute('''
+            INSERT INTO llm_calls (run_id, article_id, purpose, model, prompt_tokens, completion_tokens,
+            latency, cost_usd, cached, batch, error, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (context.get("run_id"), context.get("article_id"), purpose, model, prompt_tokens, completion_tokens,
+              round(latency, 3) if latency is not None else None, cost, int(cached), int(batch), error,
+              datetime.now().isoformat()))
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        print(f"   ⚠️ Could not record LLM call: {e}")
+
+
+def get_llm_usage_stats(run_id: str = None, article_id: str = None, limit: int = 20) -> Dict[str, Any]:
+    """
+    Tokens, latency and cost of the recorded LLM calls: totals, per model, per run
+    (most recent first) and the average per analyzed article; filtered to one run
+    and/or article if given (an article filter also lists its recent calls).
+    """
+    where, params = [], []
+    if run_id:
+        where.append("run_id = ?")
+        params.append(run_id)
+    if article_id:
+        where.append("article_id = ?")
+        params.append(article_id)
+    clause = f"WHERE {' AND '.join(where)}" if where else ""
+    aggregates = '''
+        COUNT(*) AS calls, COALESCE(SUM(cached), 0) AS cached, COALESCE(SUM(batch), 0) AS batched,
+        COALESCE(SUM(error IS NOT NULL), 0) AS errors,
+        COALESCE(SUM(prompt_tokens), 0) AS prompt_tokens, COALESCE(SUM(completion_tokens), 0) AS completion_tokens,
+        ROUND(COALESCE(SUM(cost_usd), 0), 4) AS cost_usd, ROUND(AVG(CASE WHEN cached = 0 THEN latency END), 3) AS avg_latency
+    '''
+
+    conn = get_db_connection()
+    totals = dict(conn.execute(f"SELECT {aggregates} FROM llm_calls {clause}", params).fetchone())
+    by_model = [dict(row) for row in conn.execute(
+        f"SELECT model, {aggregates} FROM llm_calls {clause} GROUP BY model ORDER BY cost_usd DESC", params
+    ).fetchall()]
+    runs = [dict(row) for row in conn.execute(f'''
+        SELECT run_id, {aggregates}, COUNT(DISTINCT article_id) AS articles,
+        MIN(created_at) AS started_at, MAX(created_at) AS last_call_at
+        FROM llm_calls {clause} GROUP BY run_id ORDER BY last_call_at DESC LIMIT ?
+    ''', (*params, limit)).fetchall()]
+    per_article = conn.execute(f'''
+        SELECT COUNT(*), AVG(cost), AVG(tokens) FROM (
+            SELECT SUM(cost_usd) AS cost, SUM(prompt_tokens + completion_tokens) AS tokens
+            FROM llm_calls {clause} {'AND' if where else 'WHERE'} article_id IS NOT NULL GROUP BY article_id
+        )
+    ''', params).fetchone()
+    recent_calls = []
+    if article_id:
+        recent_calls = [dict(row) for row in conn.execute(
+            f"SELECT * FROM llm_calls {clause} ORDER BY created_at DESC LIMIT ?", (*params, limit)
+        ).fetchall()]
+    conn.close()
+
+    for run in runs:
+        run["cost_per_article_usd"] = round(run["cost_usd"] / run["articles"], 5) if run["articles"] else None
+    return {
+        **totals,
+        "articles": per_article[0],
+        "avg_cost_per_article_usd": round(per_article[1] or 0, 5),
+        "avg_tokens_per_article": round(per_article[2] or 0),
+        "by_model": by_model,
+        "runs": runs,
+        "recent_calls": recent_calls
+    }
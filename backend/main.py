@@ -1,6 +1,8 @@
 import sqlite3
 import json
 import os
+import tempfile
+import threading
 import time
 from fastapi import FastAPI, BackgroundTasks, HTTPException, Form
 from fastapi.middleware.cors import CORSMiddleware
@@ -9,15 +11,30 @@ from datetime import datetime
 from contextlib import asynccontextmanager
 from typing import Optional, Dict, Any
 
-from config import (
-    DB_FILE, OUTPUT_JSON, scheduler, 
-    REQUEST_DELAY_MIN, REQUEST_DELAY_MAX
-)
+from config import DB_FILE, OUTPUT_JSON, BACKFILL_MODE, SCRAPE_RETRY_DRAIN_MINUTES, scheduler
 import os
 NEWSLETTER_ADMIN_KEY = os.getenv("NEWSLETTER_ADMIN_KEY", "change_me")
 from database import init_db, get_db_connection
-from scraper import check_for_new_articles, run_backfill
-from analysis import analyze_article, analyze_all_articles, get_unified_trends
+from scraper import check_for_new_articles, run_backfill, parse_date_bound
+from analysis import (
+    analyze_article, analyze_all_articles, get_unified_trends, get_trends_cache_stats, get_analysis_timing_stats
+)
+from http_cache import get_http_cache_stats
+from archive import reparse_archive, get_html_archive
+from seen_urls import get_seen_url_index
+from sources import get_source_stats
+from trends_broker import get_trends_broker
+from circuit_breaker import get_circuit_breaker_stats
+from llm_cache import get_llm_cache
+from llm_client import get_llm_client
+from llm_usage import get_llm_usage_stats
+from batch_analysis import run_batch_analysis, get_batch_stats
+from near_dupes import get_near_duplicate_index, fingerprint_unindexed_articles
+from http_client import get_http_client_stats
+from rate_governor import get_rate_governor
+from pipeline import get_last_pipeline_stats
+from backfill_jobs import create_backfill_job, resume_backfill_jobs, get_backfill_job_stats
+from scrape_retries import drain_scrape_retries, get_scrape_retry_stats
 
 # --- FASTAPI APP SETUP ---
 @asynccontextmanager
@@ -25,9 +42,18 @@ async def lifespan(app: FastAPI):
     # Startup
     print("🚀 Starting News Scraper Backend...")
     init_db()
+    index = get_seen_url_index()  # Preload the seen-URL Bloom filter
+    print(f"🔎 Seen-URL index loaded ({index.bloom.count} URLs)")
+    fingerprinted = fingerprint_unindexed_articles()  # Articles stored before near-duplicate detection
+    print(f"🪞 Near-duplicate index loaded ({get_near_duplicate_index().get_stats()['indexed']} fingerprints, "
+          f"{fingerprinted} newly fingerprinted)")
+    
+    # Backfill jobs interrupted by the last shutdown continue where they stopped
+    resume_backfill_jobs()
     
     # Start scheduler
     scheduler.add_job(check_for_new_articles, 'interval', minutes=60)
+    scheduler.add_job(drain_scrape_retries, 'interval', minutes=SCRAPE_RETRY_DRAIN_MINUTES)
     scheduler.start()
     print("⏰ Scheduler started (checking every 60 mins)")
     
@@ -53,9 +79,12 @@ def analyze_single(article_id: str, background_tasks: BackgroundTasks, force: bo
     """Run analysis in background."""
     analyze_article(article_id, force)
 
-def analyze_all(background_tasks: BackgroundTasks, limit: int = 50):
+def analyze_all(background_tasks: BackgroundTasks, limit: int = 50, mode: str = "interactive"):
     """Run batch analysis in background."""
-    analyze_all_articles(limit)
+    if mode == "batch":
+        run_batch_analysis(limit)
+    else:
+        analyze_all_articles(limit)
 
 # --- API ROUTES ---
 
@@ -71,6 +100,7 @@ def get_articles(
     search: Optional[str] = None,
     actionable: Optional[bool] = None,
     min_confidence: Optional[int] = None,
+    source: Optional[str] = None,
     sort: str = "published",
     order: str = "desc"
 ):
@@ -81,6 +111,7 @@ def get_articles(
         limit: Number of articles to return (max 100)
         offset: Pagination offset
         category: Filter by category (e.g., "Security", "AI")
+        source: Filter by news source (e.g., "thehackernews", see /sources)
         search: Search in title/description
         actionable: Filter actionable articles
         min_confidence: Minimum confidence score (0-100)
@@ -112,6 +143,11 @@ def get_articles(
         query += " AND confidence_score >= ?"
         params.append(min_confidence)
     
+    # Source filter
+    if source:
+        query += " AND source = ?"
+        params.append(source)
+    
     # Search in title and descriptions
     if search:
         query += " AND (title LIKE ? OR short_description LIKE ? OR long_description LIKE ?)"
@@ -210,6 +246,7 @@ def get_articles(
             "id": article.get("id"),
             "title": article.get("title"),
             "url": article.get("url"),
+            "source": article.get("source"),
             "published": article.get("published"),
             "author": article.get("author"),
             "image_url": article.get("image_url"),
@@ -432,11 +469,13 @@ def get_article(article_id: str):
         "id": article.get("id"),
         "title": article.get("title"),
         "url": article.get("url"),
+        "source": article.get("source"),
         "published": article.get("published"),
         "author": article.get("author"),
         "image_url": article.get("image_url"),
         "media_type": article.get("media_type"),
         "is_new": bool(article.get("is_new")),
+        "duplicate_of": article.get("duplicate_of"),
         "content": {
             "short_description": article.get("short_description"),
             "long_description": article.get("long_description"),
@@ -481,9 +520,12 @@ def trigger_analysis(article_id: str, background_tasks: BackgroundTasks, force:
     return {"message": "Analysis started in background"}
 
 @app.post("/analyze-all")
-def trigger_batch_analysis(background_tasks: BackgroundTasks, limit: int = 50):
-    background_tasks.add_task(analyze_all, background_tasks, limit)
-    return {"message": f"Batch analysis started for {limit} articles"}
+def trigger_batch_analysis(background_tasks: BackgroundTasks, limit: int = 50, mode: str = "interactive"):
+    """Analyze pending articles; mode "batch" runs the GPT step through the OpenAI Batch API."""
+    if mode not in ("interactive", "batch"):
+        raise HTTPException(status_code=400, detail="mode must be 'interactive' or 'batch'")
+    background_tasks.add_task(analyze_all, background_tasks, limit, mode)
+    return {"message": f"Batch analysis started for {limit} articles", "mode": mode}
 
 @app.get("/trends")
 def get_trends(keywords: str):
@@ -491,6 +533,94 @@ def get_trends(keywords: str):
     kw_list = [k.strip() for k in keywords.split(",") if k.strip()]
     return get_unified_trends(kw_list)
 
+@app.get("/stats/http-cache")
+def get_http_cache_statistics():
+    """HTTP cache hit/miss counters and bandwidth/parse time saved."""
+    return get_http_cache_stats()
+
+@app.get("/stats/http-client")
+def get_http_client_statistics():
+    """Per-host outbound request counts, latency percentiles, error rates and retries."""
+    return get_http_client_stats()
+
+@app.get("/stats/rate-governor")
+def get_rate_governor_statistics():
+    """Current adaptive rate, waits and throttle events per destination bucket."""
+    return get_rate_governor().get_stats()
+
+@app.get("/stats/pipeline")
+def get_pipeline_statistics():
+    """Per-stage throughput, busy/blocked time and queue depth of the last ingest run."""
+    return get_last_pipeline_stats()
+
+@app.get("/stats/scrape-retries")
+def get_scrape_retry_statistics():
+    """Failed article fetches awaiting retry, by error class, and drain outcomes."""
+    return get_scrape_retry_stats()
+
+@app.get("/stats/backfill")
+def get_backfill_statistics(job_id: Optional[str] = None):
+    """Progress and throughput of a backfill job, or of the most recent jobs."""
+    stats = get_backfill_job_stats(job_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Backfill job not found")
+    return stats
+
+@app.get("/stats/seen-urls")
+def get_seen_url_statistics():
+    """Seen-URL index counters: Bloom filter negatives, DB confirmations, false positives."""
+    return get_seen_url_index().get_stats()
+
+@app.get("/sources")
+def get_sources():
+    """Registered news sources with their crawl watermark, article count and rate bucket."""
+    return get_source_stats()
+
+@app.get("/stats/near-duplicates")
+def get_near_duplicate_statistics():
+    """Near-duplicate index size, lookups, matches and average lookup time."""
+    return get_near_duplicate_index().get_stats()
+
+@app.get("/stats/trends-cache")
+def get_trends_cache_statistics():
+    """Trends cache hit ratio (fresh, stale and coalesced hits vs computed), entries and background refreshes."""
+    return get_trends_cache_stats()
+
+@app.get("/stats/trends-broker")
+def get_trends_broker_statistics():
+    """Google Trends keyword requests vs payloads sent: shared results, keywords per payload, API calls."""
+    return get_trends_broker().get_stats()
+
+@app.get("/stats/circuit-breakers")
+def get_circuit_breaker_statistics():
+    """State of each enrichment source's circuit breaker (closed, open, half_open) with failure and rejection counts."""
+    return get_circuit_breaker_stats()
+
+@app.get("/stats/llm-cache")
+def get_llm_cache_statistics():
+    """LLM response cache hit ratio, entries, and tokens and seconds saved by hits."""
+    return get_llm_cache().get_stats()
+
+@app.get("/stats/llm-client")
+def get_llm_client_statistics():
+    """Shared OpenAI client: requests, in-flight and peak concurrency, tokens used, budget and governor waits."""
+    return get_llm_client().get_stats()
+
+@app.get("/stats/analysis-batches")
+def get_analysis_batch_statistics():
+    """Recent OpenAI Batch API analysis runs: status, progress, tokens and cost."""
+    return get_batch_stats()
+
+@app.get("/stats/analysis-stages")
+def get_analysis_stage_statistics(run_id: Optional[str] = None, limit: int = 200):
+    """Per-step p50/p95 of recent analyze_article runs and the speedup from running steps concurrently."""
+    return get_analysis_timing_stats(run_id=run_id, limit=limit)
+
+@app.get("/stats/llm-calls")
+def get_llm_call_statistics(run_id: Optional[str] = None, article_id: Optional[str] = None, limit: int = 20):
+    """Recorded LLM calls: tokens, latency and cost in total, per model, per run and per article."""
+    return get_llm_usage_stats(run_id=run_id, article_id=article_id, limit=limit)
+
 @app.get("/categories")
 def get_categories():
     """Get list of available categories with article counts."""
@@ -517,10 +647,35 @@ def export_json():
     return FileResponse(filename, media_type="application/json", filename=filename)
 
 @app.post("/backfill")
-def trigger_backfill(background_tasks: BackgroundTasks, count: int = 100):
-    """Trigger backfill process."""
-    background_tasks.add_task(run_backfill, count)
-    return {"message": f"Backfill started for {count} articles"}
+def trigger_backfill(background_tasks: BackgroundTasks, count: int = 100, mode: Optional[str] = None,
+                     since: Optional[str] = None, until: Optional[str] = None, analysis: str = "interactive"):
+    """
+    Trigger backfill process (mode "sitemap" or "pages", optional since/until ISO dates).
+    analysis "batch" analyzes the new articles through the OpenAI Batch API once ingestion is done.
+    """
+    if mode not in (None, "sitemap", "pages"):
+        raise HTTPException(status_code=400, detail="mode must be 'sitemap' or 'pages'")
+    if analysis not in ("interactive", "batch"):
+        raise HTTPException(status_code=400, detail="analysis must be 'interactive' or 'batch'")
+    try:
+        parse_date_bound(since)
+        parse_date_bound(until)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="since/until must be ISO dates (YYYY-MM-DD)")
+    job = create_backfill_job(count, mode or BACKFILL_MODE, since, until, analysis)
+    background_tasks.add_task(run_backfill, job_id=job.id)
+    return {"message": f"Backfill started for {count} articles", "job_id": job.id, "analysis": analysis}
+
+@app.post("/reparse")
+def trigger_reparse(background_tasks: BackgroundTasks, workers: Optional[int] = None, limit: Optional[int] = None):
+    """Re-run extraction over the raw HTML archive (no refetching)."""
+    background_tasks.add_task(reparse_archive, workers, limit)
+    return {"message": "Reparse started in background"}
+
+@app.get("/stats/archive")
+def get_archive_statistics():
+    """Raw HTML archive size and compression ratio."""
+    return get_html_archive().get_stats()
 
 # --- NEWSLETTER SUBSCRIPTION ROUTES ---
 
@@ -655,8 +810,17 @@ def send_newsletter(admin_key: str, days_back: int = 1, background_tasks: Backgr
         return result
 
 # --- EXPORT FUNCTION (Kept here for API access) ---
+# Pipelines of every source, backfills and the API export concurrently; one export at a time
+_export_lock = threading.Lock()
+
+
 def export_enriched_json() -> str:
     """Export enriched articles to JSON with full AI analysis and enrichment data."""
+    with _export_lock:
+        return _write_enriched_json()
+
+
+def _write_enriched_json() -> str:
     conn = get_db_connection()
     c = conn.cursor()
     
@@ -738,11 +902,13 @@ def export_enriched_json() -> str:
             "id": article.get("id"),
             "title": article.get("title"),
             "url": article.get("url"),
+            "source": article.get("source"),
             "published": article.get("published"),
             "author": article.get("author"),
             "image_url": article.get("image_url"),
             "media_type": article.get("media_type"),
             "is_new": bool(article.get("is_new")),
+            "duplicate_of": article.get("duplicate_of"),  # Canonical article of a near-duplicate
             
             # Content object
             "content": {
@@ -807,8 +973,17 @@ def export_enriched_json() -> str:
         "articles": articles
     }
     
-    with open(OUTPUT_JSON, "w", encoding="utf-8") as f:
-        json.dump(export_data, f, indent=2, ensure_ascii=False)
+    # Write a temp file next to the export and swap it in, so readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(OUTPUT_JSON)}.",
+                                    dir=os.path.dirname(os.path.abspath(OUTPUT_JSON)))
+    try:
+        os.chmod(tmp_path, 0o644)  # mkstemp creates 0600; keep the export readable as before
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(export_data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, OUTPUT_JSON)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
         
     print(f"✅ Exported {len(articles)} enriched articles to {OUTPUT_JSON}")
     return OUTPUT_JSON
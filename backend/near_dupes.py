@@ -0,0 +1,280 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from collections import Counter
+from itertools import combinations
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from config import NEAR_DUPLICATE_MAX_DISTANCE, NEAR_DUPLICATE_MIN_WORDS, NEAR_DUPLICATE_SHINGLE
+from database import get_db_connection
+
+FINGERPRINT_BITS = 64
+# The fingerprint is split into BANDS bands used as bucket keys. Lookups probe every
+# band value within PROBE_RADIUS bits of the query's; since BANDS * (PROBE_RADIUS + 1)
+# exceeds the max distance, any fingerprint within it lands in a probed bucket.
+BANDS = 4
+BAND_BITS = FINGERPRINT_BITS // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+PROBE_RADIUS = NEAR_DUPLICATE_MAX_DISTANCE // BANDS
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_BIT_WEIGHTS = 1 << np.arange(FINGERPRINT_BITS - 1, -1, -1, dtype=np.uint64)
+_BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(values: np.ndarray) -> np.ndarray:
+    """Set bits of each uint64 (np.bitwise_count on numpy >= 2.0, a byte lookup table before)."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return _BYTE_POPCOUNT[values.view(np.uint8)].reshape(-1, 8).sum(axis=1, dtype=np.uint8)
+
+
+def simhash(text: str) -> Optional[int]:
+    """
+    64-bit SimHash over word shingles of the text (None if it is too short to
+    fingerprint). Near-identical texts get fingerprints a few bits apart.
+    """
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < NEAR_DUPLICATE_MIN_WORDS:
+        return None
+    n = NEAR_DUPLICATE_SHINGLE
+    shingles = Counter(" ".join(words[i:i + n]) for i in range(len(words) - n + 1))
+    digests = b"".join(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest() for s in shingles)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8)).reshape(-1, FINGERPRINT_BITS)
+    weights = np.fromiter(shingles.values(), dtype=np.int64, count=len(shingles))
+    # Per bit: shingle weight voting 1 minus weight voting 0
+    votes = weights @ (bits.astype(np.int64) * 2 - 1)
+    return int(((votes > 0).astype(np.uint64) * _BIT_WEIGHTS).sum())
+
+
+def to_signed(fingerprint: int) -> int:
+    """SQLite INTEGER is signed 64-bit."""
+    return fingerprint - (1 << 64) if fingerprint >= (1 << 63) else fingerprint
+
+
+def to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+# Fingerprints added since the last bucket rebuild are scanned linearly;
+# the buffer is folded into the buckets once it holds this many (or 1/32 of the index)
+MIN_TAIL_SIZE = 4096
+
+
+def _probe_masks() -> np.ndarray:
+    """XOR masks of every band value within PROBE_RADIUS bits (0 first)."""
+    return np.array([sum(1 << bit for bit in bits)
+                     for radius in range(PROBE_RADIUS + 1)
+                     for bits in combinations(range(BAND_BITS), radius)], dtype=np.int64)
+
+
+PROBE_MASKS = _probe_masks()
+
+
+class NearDuplicateIndex:
+    """
+    In-memory SimHash index over canonical articles (articles.simhash where
+    duplicate_of is NULL). For each band, slots are sorted by band value with an
+    offsets table (CSR layout), so a lookup gathers the few candidates sharing a
+    probed band value and compares them in one vectorized step. Recent additions
+    sit in a small tail buffer that is scanned in full until the next rebuild.
+    Removed fingerprints are tombstoned (never matched) and dropped at the next rebuild.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = {"lookups": 0, "duplicates": 0, "lookup_seconds": 0.0, "comparisons": 0, "rebuilds": 0,
+                      "removed": 0}
+        self.reload()
+
+    def reload(self):
+        """(Re)build the index from every stored canonical fingerprint."""
+        ids: List[str] = []
+        values = array("Q")
+        conn = get_db_connection()
+        try:
+            for article_id, value in conn.execute(
+                "SELECT id, simhash FROM articles WHERE simhash IS NOT NULL AND duplicate_of IS NULL"
+            ):
+                ids.append(article_id)
+                values.append(to_unsigned(value))
+        finally:
+            conn.close()
+        with self.lock:
+            self.ids = ids
+            self.fingerprints = np.frombuffer(values, dtype=np.uint64).copy()
+            self.tail = np.empty(MIN_TAIL_SIZE, dtype=np.uint64)
+            self.tail_count = 0
+            self.dead = set()
+            self._rebuild_buckets()
+
+    def _rebuild_buckets(self):
+        """Fold the tail into the main array, drop tombstones and re-sort every band (lock held)."""
+        if self.tail_count:
+            self.fingerprints = np.concatenate([self.fingerprints, self.tail[:self.tail_count]])
+            self.tail_count = 0
+        if self.dead:
+            keep = np.setdiff1d(np.arange(len(self.ids)), np.fromiter(self.dead, dtype=np.int64))
+            self.fingerprints = self.fingerprints[keep]
+            self.ids = [self.ids[i] for i in keep]
+            self.dead.clear()
+        # Slot of every live article, for remove()
+        self.positions = {article_id: i for i, article_id in enumerate(self.ids)}
+        self.offsets, self.slots = [], []
+        for band in range(BANDS):
+            keys = ((self.fingerprints >> np.uint64(band * BAND_BITS)) & np.uint64(BAND_MASK)).astype(np.int64)
+            self.slots.append(np.argsort(keys, kind="stable").astype(np.int32))
+            self.offsets.append(np.concatenate([[0], np.cumsum(np.bincount(keys, minlength=BAND_MASK + 1))]))
+        tail_size = max(MIN_TAIL_SIZE, len(self.fingerprints) // 32)
+        if len(self.tail) != tail_size:
+            self.tail = np.empty(tail_size, dtype=np.uint64)
+        self.stats["rebuilds"] += 1
+
+    def add(self, article_id: str, fingerprint: int):
+        with self.lock:
+            self._remove(article_id)
+            self.positions[article_id] = len(self.ids)
+            self.ids.append(article_id)
+            self.tail[self.tail_count] = fingerprint
+            self.tail_count += 1
+            if self.tail_count == len(self.tail):
+                self._rebuild_buckets()
+
+    def remove(self, article_id: str):
+        """Stop matching an article (its text changed, or it is no longer canonical)."""
+        with self.lock:
+            self._remove(article_id)
+
+    def _remove(self, article_id: str):
+        position = self.positions.pop(article_id, None)
+        if position is not None:
+            self.dead.add(position)
+            self.stats["removed"] += 1
+
+    def _skip_dead(self, distances: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        """Distances with tombstoned slots pushed out of range (lock held)."""
+        if self.dead:
+            distances = distances.copy()
+            distances[np.isin(positions, np.fromiter(self.dead, dtype=np.int64))] = FINGERPRINT_BITS + 1
+        return distances
+
+    def find(self, fingerprint: int, max_distance: int = NEAR_DUPLICATE_MAX_DISTANCE) -> Optional[Tuple[str, int]]:
+        """Closest indexed article within max_distance bits, as (article_id, distance), or None."""
+        start = time.perf_counter()
+        query = np.uint64(fingerprint)
+        with self.lock:
+            candidates = []
+            for band in range(BANDS):
+                key = (fingerprint >> (band * BAND_BITS)) & BAND_MASK
+                probes = PROBE_MASKS ^ key
+                offsets, slots = self.offsets[band], self.slots[band]
+                for lo, hi in zip(offsets[probes], offsets[probes + 1]):
+                    if hi > lo:
+                        candidates.append(slots[lo:hi])
+            best = None
+            compared = self.tail_count
+            if candidates:
+                slots = np.concatenate(candidates)
+                compared += len(slots)
+                distances = self._skip_dead(popcount(self.fingerprints[slots] ^ query), slots)
+                i = int(distances.argmin())
+                if distances[i] <= max_distance:
+                    best = (int(slots[i]), int(distances[i]))
+            if self.tail_count:
+                distances = self._skip_dead(popcount(self.tail[:self.tail_count] ^ query),
+                                            np.arange(self.tail_count) + len(self.fingerprints))
+                i = int(distances.argmin())
+                if distances[i] <= max_distance and (best is None or distances[i] < best[1]):
+                    best = (len(self.fingerprints) + i, int(distances[i]))
+            if best:
+                best = (self.ids[best[0]], best[1])
+            self.stats["lookups"] += 1
+            self.stats["duplicates"] += best is not None
+            self.stats["comparisons"] += compared
+            self.stats["lookup_seconds"] += time.perf_counter() - start
+        return best
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = dict(self.stats)
+            stats["indexed"] = len(self.positions)
+            stats["tail"] = self.tail_count
+        lookups = stats["lookups"]
+        stats["avg_lookup_us"] = round(stats.pop("lookup_seconds") / lookups * 1e6, 1) if lookups else 0
+        stats["avg_comparisons"] = round(stats["comparisons"] / lookups, 1) if lookups else 0
+        stats["bands"] = BANDS
+        stats["probe_radius"] = PROBE_RADIUS
+        stats["max_distance"] = NEAR_DUPLICATE_MAX_DISTANCE
+        return stats
+
+
+_near_duplicate_index = None
+_near_duplicate_index_lock = threading.Lock()
+
+
+def get_near_duplicate_index() -> NearDuplicateIndex:
+    """Lazy initialization of the process-wide near-duplicate index."""
+    global _near_duplicate_index
+    with _near_duplicate_index_lock:
+        if _near_duplicate_index is None:
+            _near_duplicate_index = NearDuplicateIndex()
+    return _near_duplicate_index
+
+
+def fingerprint_article(c: sqlite3.Cursor, article_id: str, full_text: str) -> Optional[str]:
+    """
+    Fingerprint a stored article's text and link it to the canonical article it
+    nearly duplicates. Returns the canonical article ID, or None if the article is
+    new content (it then becomes canonical itself). A rescraped or reparsed
+    article's previous fingerprint is replaced. Does not commit.
+    """
+    index = get_near_duplicate_index()
+    index.remove(article_id)
+    fingerprint = simhash(full_text or "")
+    if fingerprint is None:
+        return None
+    while True:
+        match = index.find(fingerprint)
+        if match is None:
+            break
+        row = c.execute("SELECT duplicate_of FROM articles WHERE id = ?", (match[0],)).fetchone()
+        if row is None or row[0] is None:  # None: stored by another connection, not committed yet
+            break
+        # Marked a near-duplicate itself since it was indexed: no longer a canonical candidate
+        index.remove(match[0])
+    canonical_id = match[0] if match else None
+    c.execute("UPDATE articles SET simhash = ?, duplicate_of = ? WHERE id = ?",
+              (to_signed(fingerprint), canonical_id, article_id))
+    if canonical_id:
+        print(f"   🪞 Near-duplicate of {canonical_id} ({match[1]} bits apart)")
+    else:
+        index.add(article_id, fingerprint)
+    return canonical_id
+
+
+def fingerprint_unindexed_articles(batch: int = 500) -> int:
+    """Fingerprint stored articles that predate the index, oldest first (so originals stay canonical)."""
+    conn = get_db_connection()
+    c = conn.cursor()
+    done = 0
+    last_rowid = 0
+    while True:
+        rows = conn.execute('''
+            SELECT rowid, id, full_text FROM articles
+            WHERE simhash IS NULL AND full_text IS NOT NULL AND url_alias_of IS NULL AND rowid > ?
+            ORDER BY rowid LIMIT ?
+        ''', (last_rowid, batch)).fetchall()
+        if not rows:
+            break
+        for rowid, article_id, full_text in rows:
+            fingerprint_article(c, article_id, full_text)
+            last_rowid = rowid
+        conn.commit()
+        done += len(rows)
+    conn.close()
+    return done
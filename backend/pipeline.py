@@ -0,0 +1,294 @@
+import queue
+import threading
+from collections import deque
+import time
+from datetime import datetime
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from config import PIPELINE_QUEUE_SIZE, PIPELINE_WORKERS, PIPELINE_EXPORT_EVERY, FETCH_PER_HOST_CONCURRENCY
+from extractor import extract_page_title, extract_page_published
+from utils import title_from_url
+from scrape_retries import classify_scrape_error, record_scrape_failure
+from sources import source_for_url
+
+# Tells a stage worker to exit
+_STOP = object()
+
+# Per-item latency samples kept per stage for percentiles
+LATENCY_WINDOW = 1000
+
+# Stats of the most recent pipeline run, for the status endpoint
+_last_run_stats: Dict[str, Any] = {}
+
+
+class Stage:
+    """
+    One pipeline stage: a bounded input queue drained by its own worker threads.
+    Results other than None are handed to the next stage, blocking while its queue is full.
+    """
+
+    def __init__(self, name: str, fn: Callable[[Any], Any], workers: int,
+                 maxsize: int = PIPELINE_QUEUE_SIZE, teardown: Callable[[], None] = None):
+        self.name = name
+        self.fn = fn
+        self.teardown = teardown  # Runs in each worker thread on shutdown
+        self.workers = max(1, workers)
+        self.queue = queue.Queue(maxsize)
+        self.next: Optional["Stage"] = None
+        self.threads: List[threading.Thread] = []
+        self.lock = threading.Lock()
+        self.stats = {"processed": 0, "errors": 0, "busy_seconds": 0.0, "blocked_seconds": 0.0}
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"pipeline-{self.name}-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                if self.teardown:
+                    self.teardown()
+                self.queue.task_done()
+                return
+
+            start = time.perf_counter()
+            result = None
+            try:
+                result = self.fn(item)
+                failed = False
+            except Exception as e:
+                print(f"   ⚠️ Pipeline stage '{self.name}' error: {e}")
+                failed = True
+            busy = time.perf_counter() - start
+
+            blocked = 0.0
+            if result is not None and self.next:
+                start = time.perf_counter()
+                self.next.queue.put(result)  # Backpressure: waits while the next stage is full
+                blocked = time.perf_counter() - start
+
+            with self.lock:
+                self.stats["processed"] += 1
+                self.stats["errors"] += failed
+                self.stats["busy_seconds"] += busy
+                self.stats["blocked_seconds"] += blocked
+                self.latencies.append(busy)
+            self.queue.task_done()
+
+    def stop(self):
+        for _ in self.threads:
+            self.queue.put(_STOP)
+        for thread in self.threads:
+            thread.join()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = dict(self.stats)
+            ordered = sorted(self.latencies)
+        p = lambda q: round(ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000, 1) if ordered else 0
+        stats["workers"] = self.workers
+        stats["queued"] = self.queue.qsize()
+        stats["busy_seconds"] = round(stats["busy_seconds"], 2)
+        stats["blocked_seconds"] = round(stats["blocked_seconds"], 2)
+        stats["p50_ms"] = p(0.5)
+        stats["p95_ms"] = p(0.95)
+        return stats
+
+
+class Pipeline:
+    """Stages chained by bounded queues. The caller is the discover stage and feeds put()."""
+
+    def __init__(self, name: str, stages: List[Stage], on_close: Callable[[], None] = None):
+        self.name = name
+        self.stages = stages
+        self.on_close = on_close
+        self.discovered = 0
+        self.started_at = time.time()
+        for stage, nxt in zip(stages, stages[1:]):
+            stage.next = nxt
+        for stage in stages:
+            stage.start()
+
+    def put(self, item: Any, stage_name: str = None):
+        """Feed one discovered item (blocks while the stage is full); stage_name skips earlier stages."""
+        if stage_name:
+            self.stage(stage_name).queue.put(item)
+            return
+        self.discovered += 1
+        self.stages[0].queue.put(item)
+
+    def wait_for(self, stage_name: str):
+        """Block until every item fed so far has passed through the named stage."""
+        for stage in self.stages:
+            stage.queue.join()
+            if stage.name == stage_name:
+                return
+
+    def stage(self, name: str) -> Stage:
+        return next(stage for stage in self.stages if stage.name == name)
+
+    def close(self) -> Dict[str, Any]:
+        """Drain every stage in order, run the close hook and return run statistics."""
+        for stage in self.stages:
+            stage.stop()
+        if self.on_close:
+            self.on_close()
+        stats = self.get_stats()
+        _last_run_stats.clear()
+        _last_run_stats.update(stats)
+        return stats
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "pipeline": self.name,
+            "started_at": self.started_at,
+            "seconds": round(time.time() - self.started_at, 2),
+            "discovered": self.discovered,
+            "stages": {stage.name: stage.snapshot() for stage in self.stages}
+        }
+
+
+def get_last_pipeline_stats() -> Dict[str, Any]:
+    return dict(_last_run_stats)
+
+
+# --- ARTICLE INGEST PIPELINE ---
+def build_article_pipeline(name: str, is_new: bool, analyze: bool = True,
+                           on_persisted: Callable[[Dict[str, Any], str, bool], None] = None,
+                           on_analyzed: Callable[[str, bool], None] = None, run_id: str = None,
+                           published_range: Tuple[Optional[datetime], Optional[datetime]] = None,
+                           on_out_of_range: Callable[[Dict[str, Any]], None] = None) -> Pipeline:
+    """
+    fetch -> parse -> persist -> analyze -> export, fed with listing entries.
+    Rows are committed one by one in persist, so they are visible before analysis runs.
+    Failed scrapes are stored, queued in scrape_retries and not analyzed until a retry succeeds.
+    With published_range (since, until), parse drops entries whose publication date is
+    known and outside it, calling on_out_of_range(entry).
+    on_persisted(entry, article_id, deferred) runs for every new row,
+    on_analyzed(article_id, failed) after every analysis attempt.
+    LLM calls of the analyze stage are recorded under run_id (default: name and start time).
+    """
+    from scraper import (
+        fetch_article_page, parse_fetched_article, unavailable_article_details,
+        check_article_content, insert_article, parse_listing_date
+    )
+    from analysis import analyze_article
+    from database import get_db_connection
+    from llm_usage import llm_call_context
+
+    run_id = run_id or f"{name}:{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+
+    host_limits: Dict[str, threading.Semaphore] = {}
+    host_limits_lock = threading.Lock()
+    persist_local = threading.local()
+    pending_export = {"count": 0}
+    export_lock = threading.Lock()
+
+    def fetch(entry):
+        host = urlparse(entry["url"]).netloc
+        with host_limits_lock:
+            if host not in host_limits:
+                source = source_for_url(entry["url"])
+                host_limits[host] = threading.Semaphore(source.fetch_concurrency if source else FETCH_PER_HOST_CONCURRENCY)
+            limit = host_limits[host]
+        with limit:
+            try:
+                return entry, fetch_article_page(entry["url"]), None
+            except Exception as e:
+                print(f"   ⚠️ Error scraping {entry['url']}: {e}")
+                return entry, None, classify_scrape_error(e)
+
+    def parse(item):
+        entry, response, error = item
+        details = unavailable_article_details()
+        if response:
+            try:
+                details = parse_fetched_article(entry["url"], response)
+                error = check_article_content(details)
+                if not entry.get("title"):
+                    # Sitemap entries carry no title; take the page headline
+                    entry["title"] = extract_page_title(response.content)
+                if not entry.get("published"):
+                    # Nor a publication date
+                    entry["published"] = extract_page_published(response.content)
+            except Exception as e:
+                print(f"   ⚠️ Error parsing {entry['url']}: {e}")
+                details = unavailable_article_details()
+                error = classify_scrape_error(e)
+        if published_range and not in_published_range(entry.get("published")):
+            if on_out_of_range:
+                on_out_of_range(entry)
+            return None
+        if not entry.get("title"):
+            entry["title"] = title_from_url(entry["url"])
+        entry["published"] = entry.get("published") or "Unknown"
+        return entry, details, error
+
+    def in_published_range(published):
+        """Undated entries are kept: the range cannot exclude them."""
+        date = parse_listing_date(published)
+        since, until = published_range
+        return date is None or ((since is None or date >= since) and (until is None or date <= until))
+
+    def persist(item):
+        entry, details, error = item
+        if not hasattr(persist_local, "conn"):
+            persist_local.conn = get_db_connection()
+        conn = persist_local.conn
+        new_id = insert_article(conn.cursor(), entry, details, is_new)
+        if new_id and error:
+            record_scrape_failure(conn, new_id, entry["url"], error)
+        conn.commit()
+        if not new_id:
+            return None
+        if on_persisted:
+            on_persisted(entry, new_id, error is not None)
+        return new_id if analyze and not error else None
+
+    def analyze_one(article_id):
+        try:
+            with llm_call_context(run_id=run_id):
+                analyze_article(article_id)
+        except Exception:
+            if on_analyzed:
+                on_analyzed(article_id, True)
+            raise
+        if on_analyzed:
+            on_analyzed(article_id, False)
+        return article_id
+
+    def export(article_id):
+        with export_lock:
+            pending_export["count"] += 1
+            if pending_export["count"] < PIPELINE_EXPORT_EVERY:
+                return None
+            pending_export["count"] = 0
+        run_export()
+        return None
+
+    def run_export():
+        from main import export_enriched_json
+        export_enriched_json()
+
+    def close_persist_connection():
+        if hasattr(persist_local, "conn"):
+            persist_local.conn.close()
+
+    def on_close():
+        if pending_export["count"]:
+            run_export()
+
+    stages = [
+        Stage("fetch", fetch, PIPELINE_WORKERS["fetch"]),
+        Stage("parse", parse, PIPELINE_WORKERS["parse"]),
+        # SQLite has a single writer: one persist worker, one connection
+        Stage("persist", persist, 1, teardown=close_persist_connection),
+        Stage("analyze", analyze_one, PIPELINE_WORKERS["analyze"]),
+        Stage("export", export, 1),
+    ]
+    return Pipeline(name, stages, on_close)
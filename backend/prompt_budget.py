@@ -0,0 +1,154 @@
+import re
+import threading
+from typing import List, Dict, Any
+
+from config import OPENAI_MODEL, PROMPT_PASSAGE_TOKENS
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# Sentence boundaries inside a paragraph (the extractors flatten the body into one line)
+SENTENCE_END = re.compile(r'(?<=[.!?])["\')\]]?\s+(?=["(\[]?[A-Z0-9])')
+
+# Sharing prompts, newsletter and social links: never worth prompt tokens
+BOILERPLATE = re.compile(
+    r"found this article interesting|follow us on|subscribe to (?:our|the) newsletter|sign up for"
+    r"|share this (?:article|story|post)|read more exclusive content|all rights reserved"
+    r"|click here|cookie (?:policy|settings)|advertisement|sponsored content",
+    re.IGNORECASE
+)
+
+# Concrete details (CVE ids, versions, amounts, percentages, years) mark informative passages
+SPECIFICS = re.compile(
+    r"\bCVE-\d{4}-\d{4,}\b|\b\d+(?:\.\d+){1,3}\b|[$€£]\s?\d[\d,.]*"
+    r"|\b\d[\d,.]*\s?(?:%|percent|million|billion|thousand)\b|\b(?:19|20)\d{2}\b",
+    re.IGNORECASE
+)
+
+TITLE_STOPWORDS = {"with", "from", "that", "this", "into", "over", "after", "their", "about", "your", "have", "were"}
+GAP_MARKER = " [...] "
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def get_encoding():
+    """
+    tiktoken encoding of OPENAI_MODEL, or None when tiktoken is not installed or its
+    BPE file cannot be loaded (it is downloaded on first use); counts then fall back
+    to the ~4 characters per token estimate.
+    """
+    global _encoding, _encoding_loaded
+    with _encoding_lock:
+        if not _encoding_loaded:
+            _encoding_loaded = True
+            if TIKTOKEN_AVAILABLE:
+                try:
+                    try:
+                        _encoding = tiktoken.encoding_for_model(OPENAI_MODEL)
+                    except KeyError:
+                        _encoding = tiktoken.get_encoding("o200k_base")
+                except Exception as e:
+                    print(f"   ⚠️ tiktoken encoding unavailable ({type(e).__name__}), estimating tokens from length")
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Tokens of text for OPENAI_MODEL (estimated without tiktoken)."""
+    if not text:
+        return 0
+    encoding = get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Leading max_tokens tokens of text."""
+    if max_tokens <= 0:
+        return ""
+    encoding = get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    return text[:max_tokens * 4]
+
+
+def split_passages(text: str, max_tokens: int = PROMPT_PASSAGE_TOKENS) -> List[str]:
+    """
+    Paragraphs of text without boilerplate sentences; paragraphs longer than
+    max_tokens (or a body flattened into one line) are cut into runs of sentences.
+    """
+    passages = []
+    for paragraph in re.split(r"\n\s*\n", text or ""):
+        current, current_tokens = [], 0
+        for sentence in SENTENCE_END.split(paragraph.strip()):
+            sentence = sentence.strip()
+            if not sentence or BOILERPLATE.search(sentence):
+                continue
+            tokens = count_tokens(sentence)
+            if current and current_tokens + tokens > max_tokens:
+                passages.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(sentence)
+            current_tokens += tokens
+        if current:
+            passages.append(" ".join(current))
+    return passages
+
+
+def score_passage(passage: str, index: int, terms: Dict[str, float]) -> float:
+    """Keyword/title term hits and concrete details per token, with a small bonus for early passages."""
+    lower = passage.lower()
+    hits = sum(weight * min(3, lower.count(term)) for term, weight in terms.items())
+    hits += 0.5 * len(SPECIFICS.findall(passage))
+    return hits / max(1, count_tokens(passage)) * 100 + 1.0 / (1 + index)
+
+
+def fit_article(title: str, keywords: List[Dict[str, Any]], text: str, max_tokens: int) -> str:
+    """
+    The article content that fits max_tokens: the whole text (minus boilerplate) when
+    it fits, otherwise the lead, the closing passage and the passages richest in
+    keywords, title terms and concrete details, in their original order with
+    GAP_MARKER where passages were left out.
+    """
+    passages = split_passages(text)
+    sizes = [count_tokens(p) for p in passages]
+    if sum(sizes) + len(passages) <= max_tokens:
+        return " ".join(passages)
+    if not passages:
+        return truncate_tokens(text or "", max_tokens)
+
+    terms = {kw["keyword"].lower(): 2.0 for kw in keywords or [] if kw.get("keyword")}
+    for word in re.findall(r"[A-Za-z][\w-]{3,}", title or ""):
+        if word.lower() not in TITLE_STOPWORDS:
+            terms.setdefault(word.lower(), 1.0)
+
+    gap_tokens = count_tokens(GAP_MARKER)
+    ranked = sorted(range(1, len(passages) - 1), key=lambda i: -score_passage(passages[i], i, terms))
+    chosen, used = set(), 0
+    # The lead and the conclusion first, then by informativeness
+    for i in [0, len(passages) - 1] + ranked:
+        if i in chosen:
+            continue
+        if used + sizes[i] + gap_tokens <= max_tokens:
+            chosen.add(i)
+            used += sizes[i] + gap_tokens
+    if not chosen:
+        return truncate_tokens(passages[0], max_tokens)
+
+    content, previous = "", None
+    for i in sorted(chosen):
+        if previous is not None:
+            content += " " if i == previous + 1 else GAP_MARKER
+        elif i > 0:
+            content += GAP_MARKER.lstrip()
+        content += passages[i]
+        previous = i
+    if previous < len(passages) - 1:
+        content += GAP_MARKER.rstrip()
+    return content
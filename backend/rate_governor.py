@@ -0,0 +1,136 @@
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+from config import RATE_LIMITS, RATE_LIMIT_HOSTS, RATE_ADDITIVE_INCREASE, RATE_DECREASE_FACTOR
+
+# Statuses that mean "slow down"
+THROTTLE_STATUSES = {429, 503}
+
+
+class TokenBucket:
+    """
+    Token bucket whose refill rate adapts AIMD-style: every healthy response adds
+    a little rate, a throttle signal (429/503) halves it, and slow responses
+    shave it. Other error responses hold it steady. A Retry-After pauses the
+    bucket outright.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int, min_rate: float,
+                 max_rate: float, target_latency: float):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.target_latency = target_latency
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+        self.stats = {"acquired": 0, "waited_seconds": 0.0, "throttled": 0, "slow": 0, "errors": 0}
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Take a token and return how long the caller must wait before using it."""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            wait = max(wait, self.paused_until - now)
+            self.stats["acquired"] += 1
+            self.stats["waited_seconds"] += wait
+        return wait
+
+    def acquire(self) -> float:
+        """Block until a request may be sent."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def record(self, latency: Optional[float] = None, throttled: bool = False,
+               retry_after: Optional[float] = None, error: bool = False):
+        """Feed back the outcome of a request to adapt the rate (error: a failed response that is not a throttle)."""
+        with self.lock:
+            if throttled:
+                self.rate = max(self.min_rate, self.rate * RATE_DECREASE_FACTOR)
+                self.tokens = min(self.tokens, 0.0)
+                self.stats["throttled"] += 1
+                if retry_after:
+                    self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+            elif latency is not None and latency > self.target_latency:
+                self.rate = max(self.min_rate, self.rate * 0.9)
+                self.stats["slow"] += 1
+            elif error:
+                self.stats["errors"] += 1
+            else:
+                self.rate = min(self.max_rate, self.rate + RATE_ADDITIVE_INCREASE)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "rate_per_sec": round(self.rate, 3),
+                "min_rate": self.min_rate,
+                "max_rate": self.max_rate,
+                "burst": self.burst,
+                "paused_for": round(max(0.0, self.paused_until - time.monotonic()), 1),
+                "acquired": self.stats["acquired"],
+                "waited_seconds": round(self.stats["waited_seconds"], 2),
+                "throttled": self.stats["throttled"],
+                "slow": self.stats["slow"],
+                "errors": self.stats["errors"]
+            }
+
+
+class RateGovernor:
+    """Named per-destination token buckets (see RATE_LIMITS in config)."""
+
+    def __init__(self):
+        self.buckets = {name: TokenBucket(name, **limits) for name, limits in RATE_LIMITS.items()}
+        self.hosts = dict(RATE_LIMIT_HOSTS)
+
+    def register(self, name: str, limits: Dict[str, float], hosts: List[str]):
+        """Add a bucket at runtime (a news source's politeness budget); existing buckets are kept."""
+        if name not in self.buckets:
+            self.buckets[name] = TokenBucket(name, **limits)
+        for host in hosts:
+            self.hosts.setdefault(host, name)
+
+    def bucket(self, name: str) -> TokenBucket:
+        return self.buckets[name]
+
+    def bucket_for_host(self, host: str) -> Optional[TokenBucket]:
+        """Bucket governing a hostname (subdomains included), or None if unmanaged."""
+        host = host.split(":")[0].lower()
+        for domain, name in list(self.hosts.items()):
+            if host == domain or host.endswith("." + domain):
+                return self.buckets[name]
+        return None
+
+    def acquire(self, name: str) -> float:
+        return self.buckets[name].acquire()
+
+    def record(self, name: str, latency: Optional[float] = None, throttled: bool = False,
+               retry_after: Optional[float] = None, error: bool = False):
+        self.buckets[name].record(latency, throttled, retry_after, error)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {name: bucket.snapshot() for name, bucket in list(self.buckets.items())}
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_rate_governor() -> RateGovernor:
+    """Lazy initialization of the process-wide rate governor."""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = RateGovernor()
+    return _governor
@@ -0,0 +1,14 @@
+import sys
+import os
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.getcwd(), "backend"))
+
+from backend.database import init_db
+from backend.archive import reparse_archive
+
+if __name__ == "__main__":
+    print("Initializing database...")
+    init_db()
+    print("Reparsing archived HTML...")
+    reparse_archive()
@@ -0,0 +1,162 @@
+import random
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import List, Dict, Any
+
+import requests
+
+from config import (
+    SCRAPE_RETRY_BASE_SECONDS, SCRAPE_RETRY_MAX_SECONDS,
+    SCRAPE_RETRY_MAX_ATTEMPTS, SCRAPE_RETRY_BATCH
+)
+from database import get_db_connection
+
+# Failures a refetch will not fix (a 404/410 page stays gone): dead-lettered at once.
+# 403 is usually anti-bot blocking and 408 a slow server, so both get their own retryable classes.
+NON_RETRYABLE_ERROR_CLASSES = {"http_4xx"}
+
+# Outcome counters of drain runs in this process
+_drain_stats = {"runs": 0, "attempted": 0, "recovered": 0, "failed": 0, "dead": 0}
+_drain_lock = threading.Lock()
+
+
+class ScrapeError(Exception):
+    """A failed article fetch or parse, with a coarse class for the retry queue."""
+
+    def __init__(self, error_class: str, message: str = ""):
+        super().__init__(message or error_class)
+        self.error_class = error_class
+
+
+def classify_scrape_error(e: Exception) -> ScrapeError:
+    """Map any fetch/parse exception to a ScrapeError (timeout, connection, blocked, http_4xx, parse, ...)."""
+    if isinstance(e, ScrapeError):
+        return e
+    if isinstance(e, requests.Timeout):
+        return ScrapeError("timeout", str(e))
+    if isinstance(e, requests.ConnectionError):
+        return ScrapeError("connection", str(e))
+    if isinstance(e, requests.RequestException):
+        return ScrapeError("request", str(e))
+    return ScrapeError("parse", f"{type(e).__name__}: {e}")
+
+
+def http_error_class(status: int) -> str:
+    if status == 429:
+        return "http_429"
+    if status == 403:
+        return "blocked"
+    if status == 408:
+        return "timeout"
+    return "http_5xx" if status >= 500 else "http_4xx"
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff after the given number of failed attempts, with ±20% jitter."""
+    delay = min(SCRAPE_RETRY_MAX_SECONDS, SCRAPE_RETRY_BASE_SECONDS * (2 ** (attempts - 1)))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def record_scrape_failure(conn: sqlite3.Connection, article_id: str, url: str, error: ScrapeError) -> Dict[str, Any]:
+    """
+    Add a failed fetch to the retry queue, or count another attempt. The row is
+    dead-lettered once SCRAPE_RETRY_MAX_ATTEMPTS is reached, or on the first
+    failure of a NON_RETRYABLE_ERROR_CLASSES class. Does not commit.
+    """
+    now = datetime.now()
+    row = conn.execute("SELECT attempts, created_at FROM scrape_retries WHERE article_id = ?", (article_id,)).fetchone()
+    attempts = (row[0] if row else 0) + 1
+    dead = attempts >= SCRAPE_RETRY_MAX_ATTEMPTS or error.error_class in NON_RETRYABLE_ERROR_CLASSES
+    status = "dead" if dead else "pending"
+    next_retry_at = (now + timedelta(seconds=retry_delay(attempts))).isoformat() if status == "pending" else None
+    conn.execute('''
+        INSERT OR REPLACE INTO scrape_retries
+        (article_id, url, status, attempts, next_retry_at, error_class, last_error, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (article_id, url, status, attempts, next_retry_at, error.error_class, str(error)[:500],
+          row[1] if row else now.isoformat(), now.isoformat()))
+    return {"status": status, "attempts": attempts, "next_retry_at": next_retry_at}
+
+
+def clear_scrape_retry(conn: sqlite3.Connection, article_id: str):
+    """Drop an article from the retry queue once its content is stored. Does not commit."""
+    conn.execute("DELETE FROM scrape_retries WHERE article_id = ?", (article_id,))
+
+
+def due_scrape_retries(conn: sqlite3.Connection, limit: int = SCRAPE_RETRY_BATCH) -> List[Dict[str, Any]]:
+    rows = conn.execute('''
+        SELECT article_id, url, attempts FROM scrape_retries
+        WHERE status = 'pending' AND next_retry_at <= ?
+        ORDER BY next_retry_at LIMIT ?
+    ''', (datetime.now().isoformat(), limit)).fetchall()
+    return [dict(row) for row in rows]
+
+
+def drain_scrape_retries(limit: int = SCRAPE_RETRY_BATCH) -> Dict[str, Any]:
+    """
+    Scheduler job: refetch due articles, store the content of those that now
+    succeed and run their deferred analysis; reschedule or dead-letter the rest.
+    """
+    from scraper import try_scrape_article_details, update_article_content
+    from analysis import analyze_article
+
+    conn = get_db_connection()
+    due = due_scrape_retries(conn, limit)
+    result = {"attempted": len(due), "recovered": 0, "failed": 0, "dead": 0}
+    if due:
+        print(f"\n🔁 Retrying {len(due)} failed article fetches...")
+
+    recovered = []
+    for item in due:
+        details, error = try_scrape_article_details(item["url"])
+        if error:
+            outcome = record_scrape_failure(conn, item["article_id"], item["url"], error)
+            result["dead" if outcome["status"] == "dead" else "failed"] += 1
+            if outcome["status"] == "dead":
+                print(f"   ☠️ Giving up on {item['url']} after {outcome['attempts']} attempt(s) ({error.error_class})")
+        else:
+            update_article_content(conn.cursor(), item["article_id"], details)
+            clear_scrape_retry(conn, item["article_id"])
+            recovered.append(item["article_id"])
+            result["recovered"] += 1
+        conn.commit()
+    conn.close()
+
+    # Analysis was deferred until content arrived
+    for article_id in recovered:
+        try:
+            analyze_article(article_id)
+        except Exception as e:
+            print(f"   ⚠️ Analysis of recovered article {article_id} failed: {e}")
+
+    with _drain_lock:
+        _drain_stats["runs"] += 1
+        for key in ("attempted", "recovered", "failed", "dead"):
+            _drain_stats[key] += result[key]
+    if due:
+        print(f"   ✅ Recovered {result['recovered']}, rescheduled {result['failed']}, dead {result['dead']}")
+    return result
+
+
+def get_scrape_retry_stats() -> Dict[str, Any]:
+    """Queue size by status and error class, retries due now, and drain outcomes."""
+    conn = get_db_connection()
+    by_status = dict(conn.execute("SELECT status, COUNT(*) FROM scrape_retries GROUP BY status").fetchall())
+    by_class = dict(conn.execute(
+        "SELECT error_class, COUNT(*) FROM scrape_retries WHERE status = 'pending' GROUP BY error_class"
+    ).fetchall())
+    due = conn.execute(
+        "SELECT COUNT(*) FROM scrape_retries WHERE status = 'pending' AND next_retry_at <= ?",
+        (datetime.now().isoformat(),)
+    ).fetchone()[0]
+    conn.close()
+    with _drain_lock:
+        drains = dict(_drain_stats)
+    return {
+        "pending": by_status.get("pending", 0),
+        "dead": by_status.get("dead", 0),
+        "due": due,
+        "pending_by_error_class": by_class,
+        "drains": drains
+    }
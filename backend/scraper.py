@@ -2,25 +2,49 @@ import requests
 import json
 import re
 import time
-import random
 import uuid
 import sqlite3
+import threading
 from bs4 import BeautifulSoup
-from datetime import datetime
-from typing import List, Dict, Any, Tuple
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Tuple, Optional
+from urllib.parse import urlparse
 
 from config import (
-    BASE_URL, HEADERS, REQUEST_DELAY_MIN, REQUEST_DELAY_MAX,
-    PAGE_DELAY_MIN, PAGE_DELAY_MAX, DEFAULT_CATEGORY, CATEGORIES, DB_FILE
+    BASE_URL, INCREMENTAL_MAX_PAGES, BACKFILL_MODE,
+    DEFAULT_CATEGORY, CATEGORIES, DB_FILE, EXTRACTOR_ENGINE
 )
-from database import get_db_connection
-from utils import get_favicon_url, get_domain_name
-from analysis import analyze_article
+from database import get_db_connection, load_crawl_state, save_crawl_state
+from utils import get_favicon_url, get_domain_name, canonicalize_url
+from near_dupes import fingerprint_article
+from sources import (
+    SourceAdapter, register_source, register_configured_sources, registered_sources, get_source, source_for_url,
+    is_article_url
+)
+from seen_urls import find_known_urls, get_seen_url_index
+from http_cache import cached_get, get_http_cache, CachedResponse
+from archive import archive_page
+from extractor import extract_article_details
+from scrape_retries import ScrapeError, classify_scrape_error, http_error_class
+
+# Optional: C Aho-Corasick automaton for category keyword matching
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Bump when extraction logic changes so cached parse results are not reused
+ARTICLE_PARSER_VERSION = "article-v1"
+HOMEPAGE_PARSER_VERSION = "homepage-v1"
+
+# Key for this site's row in crawl_state
+CRAWL_SOURCE = "thehackernews"
 
 # --- ENHANCED ARTICLE SCRAPING ---
-def scrape_article_details(url: str) -> Dict[str, Any]:
-    """Scrape full article content with images, author, etc."""
-    result = {
+def empty_article_details() -> Dict[str, Any]:
+    """Blank article details structure shared by all scraping paths."""
+    return {
         "full_text": "",
         "author": None,
         "category": None,
@@ -30,172 +54,282 @@ def scrape_article_details(url: str) -> Dict[str, Any]:
         "image_url": None,
         "media_type": "none"
     }
+
+
+def unavailable_article_details() -> Dict[str, Any]:
+    """Placeholder details stored when an article could not be fetched or parsed."""
+    result = empty_article_details()
+    result["full_text"] = "Content unavailable."
+    result["category"] = DEFAULT_CATEGORY
+    return result
+
+
+def article_parser_version(url: str) -> str:
+    source = source_for_url(url)
+    return source.article_parser_version if source else ARTICLE_PARSER_VERSION
+
+
+def fetch_article_page(url: str, session: requests.Session = None) -> CachedResponse:
+    """Download (or revalidate) an article page and archive fresh bodies. Raises ScrapeError on HTTP errors."""
+    response = cached_get(url, session=session, parsed_version=article_parser_version(url))
+    if response.status_code != 200:
+        raise ScrapeError(http_error_class(response.status_code), f"HTTP {response.status_code}")
+    if response.parsed is None:
+        archive_page(url, response.content)
+    return response
+
+
+def parse_fetched_article(url: str, response: CachedResponse) -> Dict[str, Any]:
+    """Parse a fetched article page with its source's parser, reusing the cached result on 304 Not Modified."""
+    if response.parsed is not None:
+        return response.parsed
     
+    start = time.perf_counter()
+    details = parse_source_article(url, response.content)
+    get_http_cache().store_parsed(url, article_parser_version(url), details, time.perf_counter() - start)
+    return details
+
+
+def parse_source_article(url: str, html: bytes) -> Dict[str, Any]:
+    """Parse article HTML with the parser of the source the URL belongs to (this site's by default)."""
+    source = source_for_url(url)
+    return source.parse_article(html) if source else parse_article_details(html)
+
+
+def check_article_content(details: Dict[str, Any]) -> Optional[ScrapeError]:
+    """A page that parsed but yielded no article text counts as a failed scrape."""
+    if not (details["full_text"] or "").strip():
+        return ScrapeError("empty_content", "No article text extracted")
+    return None
+
+
+def try_scrape_article_details(url: str, session: requests.Session = None) -> Tuple[Dict[str, Any], Optional[ScrapeError]]:
+    """Scrape an article, returning its details and the classified error if the scrape failed."""
     try:
-        response = requests.get(url, headers=HEADERS, timeout=15)
-        soup = BeautifulSoup(response.content, "lxml")
-        
-        # --- Extract Featured Image ---
-        og_image = soup.find("meta", property="og:image")
-        if og_image and og_image.get("content"):
-            img_url = og_image.get("content")
-            result["image_url"] = img_url
-            result["media_type"] = "gif" if ".gif" in img_url.lower() else "image"
-        
-        if not result["image_url"]:
-            twitter_img = soup.find("meta", {"name": "twitter:image"})
-            if twitter_img and twitter_img.get("content"):
-                result["image_url"] = twitter_img.get("content")
-                result["media_type"] = "image"
-        
-        # Check for video embeds
-        video_iframe = soup.find("iframe", src=lambda x: x and ("youtube" in x or "vimeo" in x))
-        if video_iframe:
-            video_src = video_iframe.get("src", "")
-            if "youtube" in video_src:
-                video_id_match = re.search(r'(?:embed/|v=|vi=)([a-zA-Z0-9_-]{11})', video_src)
-                if video_id_match:
-                    result["image_url"] = f"https://img.youtube.com/vi/{video_id_match.group(1)}/maxresdefault.jpg"
-                    result["media_type"] = "video"
-        
-        # Fallback to first article image
-        if not result["image_url"]:
-            article_body = soup.find("div", {"id": "articlebody"}) or soup.find("div", class_="post-body")
-            if article_body:
-                first_img = article_body.find("img")
-                if first_img:
-                    img_url = first_img.get("data-src") or first_img.get("src")
-                    if img_url and not img_url.endswith(('.svg', '.ico')):
-                        result["image_url"] = img_url
-                        result["media_type"] = "gif" if ".gif" in img_url.lower() else "image"
-        
-        # --- Extract Author (FIXED - using span.author) ---
-        # The Hacker News has multiple <span class="author"> - first is date, second is actual author
-        author_spans = soup.find_all("span", class_="author")
-        for author_span in author_spans:
-            author_text = author_span.get_text(strip=True)
-            if author_text and len(author_text) > 3:
-                # Skip if it looks like a date (contains month names or just digits/commas)
-                date_patterns = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 
-                                'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-                is_date = any(month in author_text for month in date_patterns)
-                # Also check if it's mostly numbers (like "Nov 28, 2025")
-                if not is_date and not re.match(r'^[A-Za-z]{3}\s+\d{1,2},\s+\d{4}$', author_text):
-                    result["author"] = author_text
-                    break
-                elif not is_date:
-                    # Still might be an author name
-                    continue
-        
-        # Fallback methods if span.author not found or was all dates
-        if not result["author"]:
-            # Try link with rel="author"
-            author_link = soup.find("a", rel="author")
-            if author_link:
-                result["author"] = author_link.get_text(strip=True)
-        
-        if not result["author"]:
-            # Try JSON-LD
-            for script_ld in soup.find_all("script", {"type": "application/ld+json"}):
-                try:
-                    ld_data = json.loads(script_ld.string)
-                    if isinstance(ld_data, dict):
-                        author_data = ld_data.get("author")
-                        if isinstance(author_data, dict):
-                            name = author_data.get("name", "").strip()
-                            if name and name != "The Hacker News":
-                                result["author"] = name
-                                break
-                except:
-                    pass
-        
-        # --- Extract Tags (using span.p-tags) ---
-        # The Hacker News uses: <span class="p-tags">Malware / Vulnerability</span>
-        tags_span = soup.find("span", class_="p-tags")
-        if tags_span:
-            tags_text = tags_span.get_text(strip=True)
-            # Split by " / " to get individual tags
-            if tags_text:
-                result["tags"] = [tag.strip() for tag in tags_text.split("/") if tag.strip()]
-        else:
-            result["tags"] = []
+        details = parse_fetched_article(url, fetch_article_page(url, session))
+    except Exception as e:
+        print(f"   ⚠️ Error scraping {url}: {e}")
+        return unavailable_article_details(), classify_scrape_error(e)
+    return details, check_article_content(details)
+
+
+def scrape_article_details(url: str, session: requests.Session = None) -> Dict[str, Any]:
+    """Scrape full article content with images, author, etc."""
+    return try_scrape_article_details(url, session)[0]
+
+
+def parse_article_details(html: bytes, engine: str = None, site: str = BASE_URL) -> Dict[str, Any]:
+    """Extract article fields using the configured engine ("lxml" single-pass or legacy "bs4")."""
+    if (engine or EXTRACTOR_ENGINE) == "lxml":
+        return extract_article_details(html, detect_category, site)
+    return parse_article_details_soup(html, site)
+
+
+def parse_article_details_soup(html: bytes, site: str = BASE_URL) -> Dict[str, Any]:
+    """Extract content, media, author, tags and sources from article HTML."""
+    site_host = urlparse(site).netloc
+    result = empty_article_details()
+    soup = BeautifulSoup(html, "lxml")
+    
+    # --- Extract Featured Image ---
+    og_image = soup.find("meta", property="og:image")
+    if og_image and og_image.get("content"):
+        img_url = og_image.get("content")
+        result["image_url"] = img_url
+        result["media_type"] = "gif" if ".gif" in img_url.lower() else "image"
+    
+    if not result["image_url"]:
+        twitter_img = soup.find("meta", {"name": "twitter:image"})
+        if twitter_img and twitter_img.get("content"):
+            result["image_url"] = twitter_img.get("content")
+            result["media_type"] = "image"
+    
+    # Check for video embeds
+    video_iframe = soup.find("iframe", src=lambda x: x and ("youtube" in x or "vimeo" in x))
+    if video_iframe:
+        video_src = video_iframe.get("src", "")
+        if "youtube" in video_src:
+            video_id_match = re.search(r'(?:embed/|v=|vi=)([a-zA-Z0-9_-]{11})', video_src)
+            if video_id_match:
+                result["image_url"] = f"https://img.youtube.com/vi/{video_id_match.group(1)}/maxresdefault.jpg"
+                result["media_type"] = "video"
+    
+    # Fallback to first article image
+    if not result["image_url"]:
+        article_body = soup.find("div", {"id": "articlebody"}) or soup.find("div", class_="post-body")
+        if article_body:
+            first_img = article_body.find("img")
+            if first_img:
+                img_url = first_img.get("data-src") or first_img.get("src")
+                if img_url and not img_url.endswith(('.svg', '.ico')):
+                    result["image_url"] = img_url
+                    result["media_type"] = "gif" if ".gif" in img_url.lower() else "image"
+    
+    # --- Extract Author (FIXED - using span.author) ---
+    # The Hacker News has multiple <span class="author"> - first is date, second is actual author
+    author_spans = soup.find_all("span", class_="author")
+    for author_span in author_spans:
+        author_text = author_span.get_text(strip=True)
+        if author_text and len(author_text) > 3:
+            # Skip if it looks like a date (contains month names or just digits/commas)
+            date_patterns = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 
+                            'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+            is_date = any(month in author_text for month in date_patterns)
+            # Also check if it's mostly numbers (like "Nov 28, 2025")
+            if not is_date and not re.match(r'^[A-Za-z]{3}\s+\d{1,2},\s+\d{4}$', author_text):
+                result["author"] = author_text
+                break
+            elif not is_date:
+                # Still might be an author name
+                continue
+    
+    # Fallback methods if span.author not found or was all dates
+    if not result["author"]:
+        # Try link with rel="author"
+        author_link = soup.find("a", rel="author")
+        if author_link:
+            result["author"] = author_link.get_text(strip=True)
+    
+    if not result["author"]:
+        # Try JSON-LD
+        for script_ld in soup.find_all("script", {"type": "application/ld+json"}):
+            try:
+                ld_data = json.loads(script_ld.string)
+                if isinstance(ld_data, dict):
+                    author_data = ld_data.get("author")
+                    if isinstance(author_data, dict):
+                        name = author_data.get("name", "").strip()
+                        if name and name != "The Hacker News":
+                            result["author"] = name
+                            break
+            except:
+                pass
+    
+    # --- Extract Tags (using span.p-tags) ---
+    # The Hacker News uses: <span class="p-tags">Malware / Vulnerability</span>
+    tags_span = soup.find("span", class_="p-tags")
+    if tags_span:
+        tags_text = tags_span.get_text(strip=True)
+        # Split by " / " to get individual tags
+        if tags_text:
+            result["tags"] = [tag.strip() for tag in tags_text.split("/") if tag.strip()]
+    else:
+        result["tags"] = []
+    
+    # --- Extract Article Body ---
+    body = soup.find("div", {"id": "articlebody"}) or soup.find("div", class_="articlebody") or soup.find("div", class_="post-body") or soup.find("article")
+    
+    if body:
+        for elem in body.find_all(['script', 'style', 'aside', 'nav', 'iframe', 'ins', 'noscript']):
+            elem.decompose()
         
-        # --- Extract Article Body ---
-        body = soup.find("div", {"id": "articlebody"}) or soup.find("div", class_="articlebody") or soup.find("div", class_="post-body") or soup.find("article")
+        full_text = body.get_text(separator=" ", strip=True)
+        result["full_text"] = full_text
+        result["reading_time"] = max(1, round(len(full_text.split()) / 200))
         
-        if body:
-            for elem in body.find_all(['script', 'style', 'aside', 'nav', 'iframe', 'ins', 'noscript']):
-                elem.decompose()
+        # Extract sources
+        seen_domains = set()
+        for link in body.find_all('a', href=True):
+            href = link.get('href', '')
+            text = link.get_text(strip=True)
             
-            full_text = body.get_text(separator=" ", strip=True)
-            result["full_text"] = full_text
-            result["reading_time"] = max(1, round(len(full_text.split()) / 200))
+            if not href or href.startswith('#') or href.startswith('javascript:'):
+                continue
+            if site_host in href and '/20' not in href:
+                continue
             
-            # Extract sources
-            seen_domains = set()
-            for link in body.find_all('a', href=True):
-                href = link.get('href', '')
-                text = link.get_text(strip=True)
-                
-                if not href or href.startswith('#') or href.startswith('javascript:'):
-                    continue
-                if 'thehackernews.com' in href and '/20' not in href:
-                    continue
-                
-                if href.startswith('/'):
-                    href = f"https://thehackernews.com{href}"
-                
-                domain = get_domain_name(href)
-                if domain in seen_domains:
-                    continue
-                if any(ext in href.lower() for ext in ['.gif', '.jpg', '.png', '.svg', '.webp', '.mp4']):
-                    continue
-                
-                seen_domains.add(domain)
-                result["sources"].append({
-                    "name": text[:80] if text else domain,
-                    "url": href,
-                    "domain": domain,
-                    "favicon": get_favicon_url(href)
-                })
+            if href.startswith('/'):
+                href = f"{site}{href}"
             
-            result["sources"] = result["sources"][:15]
+            domain = get_domain_name(href)
+            if domain in seen_domains:
+                continue
+            if any(ext in href.lower() for ext in ['.gif', '.jpg', '.png', '.svg', '.webp', '.mp4']):
+                continue
             
-            # Detect category
-            title_tag = soup.find("title")
-            title = title_tag.get_text(strip=True) if title_tag else ""
-            result["category"] = detect_category(title, full_text)
+            seen_domains.add(domain)
+            result["sources"].append({
+                "name": text[:80] if text else domain,
+                "url": href,
+                "domain": domain,
+                "favicon": get_favicon_url(href)
+            })
         
-        if not result["category"]:
-            title_tag = soup.find("title")
-            if title_tag:
-                result["category"] = detect_category(title_tag.get_text(strip=True), "")
+        result["sources"] = result["sources"][:15]
         
-        if not result["full_text"]:
-            meta_desc = soup.find("meta", {"name": "description"})
-            if meta_desc:
-                result["full_text"] = meta_desc.get("content", "")
-                
-    except Exception as e:
-        print(f"   ⚠️ Error scraping {url}: {e}")
-        result["full_text"] = "Content unavailable."
-        result["category"] = DEFAULT_CATEGORY
+        # Detect category
+        title_tag = soup.find("title")
+        title = title_tag.get_text(strip=True) if title_tag else ""
+        result["category"] = detect_category(title, full_text)
     
+    if not result["category"]:
+        title_tag = soup.find("title")
+        if title_tag:
+            result["category"] = detect_category(title_tag.get_text(strip=True), "")
+    
+    if not result["full_text"]:
+        meta_desc = soup.find("meta", {"name": "description"})
+        if meta_desc:
+            result["full_text"] = meta_desc.get("content", "")
+
     return result
 
 
+def _has_border(word: str) -> bool:
+    """True if a proper prefix equals a suffix, i.e. occurrences can overlap ("aa" in "aaa")."""
+    return any(word[:n] == word[-n:] for n in range(1, len(word)))
+
+
+def _compile_category_matcher():
+    """
+    Lowercased keyword tables compiled once at import, and an Aho-Corasick
+    automaton over every distinct keyword when pyahocorasick is installed.
+    """
+    category_keywords = [
+        (cat_id, tuple(k.lower() for k in cat_info["keywords"])) for cat_id, cat_info in CATEGORIES.items()
+    ]
+    keywords = sorted({k for _, cat_keywords in category_keywords for k in cat_keywords})
+    automaton = None
+    if AHOCORASICK_AVAILABLE:
+        automaton = ahocorasick.Automaton()
+        for keyword in keywords:
+            automaton.add_word(keyword, (keyword, len(keyword), _has_border(keyword)))
+        automaton.make_automaton()
+    return category_keywords, keywords, automaton
+
+
+_CATEGORY_KEYWORDS, _KEYWORDS, _KEYWORD_AUTOMATON = _compile_category_matcher()
+
+
+def count_keywords(text: str) -> Dict[str, int]:
+    """Non-overlapping occurrences of every category keyword in text, exactly as text.count(keyword)."""
+    if _KEYWORD_AUTOMATON is None:
+        return {k: n for k in _KEYWORDS if (n := text.count(k))}
+
+    counts: Dict[str, int] = {}
+    next_free: Dict[str, int] = {}
+    for end, (keyword, length, bordered) in _KEYWORD_AUTOMATON.iter(text):
+        if bordered:
+            # Only self-overlapping keywords need str.count's skip-past-the-match rule
+            if end - length + 1 < next_free.get(keyword, 0):
+                continue
+            next_free[keyword] = end + 1
+        counts[keyword] = counts.get(keyword, 0) + 1
+    return counts
+
+
 def detect_category(title: str, text: str) -> Dict[str, str]:
     """Detect article category from content."""
-    combined = (title + " " + text[:2000]).lower()
+    counts = count_keywords((title + " " + text[:2000]).lower())
+    in_title = count_keywords(title.lower())
     
     scores = {}
-    for cat_id, cat_info in CATEGORIES.items():
+    for cat_id, keywords in _CATEGORY_KEYWORDS:
         score = 0
-        for keyword in cat_info["keywords"]:
-            count = combined.count(keyword.lower())
-            if keyword.lower() in title.lower():
-                count += 3
-            score += count
+        for keyword in keywords:
+            score += counts.get(keyword, 0)
+            if keyword in in_title:
+                score += 3
         if score > 0:
             scores[cat_id] = score
     
@@ -207,122 +341,350 @@ def detect_category(title: str, text: str) -> Dict[str, str]:
 
 
 # --- WEB SCRAPING FUNCTIONS ---
-def scrape_homepage_articles(page_url: str = None) -> Tuple[List[Dict[str, Any]], str]:
-    """Scrape articles from a page (homepage or pagination page)."""
-    url = page_url or BASE_URL
-    articles = []
-    next_page_url = None
+def scrape_listing_page(source: SourceAdapter, page_url: str = None,
+                        session: requests.Session = None) -> Tuple[List[Dict[str, Any]], str]:
+    """Scrape article entries from one of a source's listing pages (its first page by default)."""
+    url = page_url or source.base_url
     
     try:
-        response = requests.get(url, headers=HEADERS, timeout=15)
-        soup = BeautifulSoup(response.content, "lxml")
+        response = cached_get(url, session=session, parsed_version=source.listing_parser_version)
+        if response.parsed is not None:
+            # 304 Not Modified - reuse the listing parsed last time
+            return response.parsed["articles"], response.parsed["next_page_url"]
         
-        # Find blog posts
-        posts = soup.find_all("div", class_="body-post")
+        if response.status_code == 200:
+            archive_page(url, response.content)
         
-        for post in posts:
-            try:
-                link_tag = post.find("a", class_="story-link")
-                if not link_tag:
-                    continue
-                    
-                article_url = link_tag.get("href")
-                title_tag = post.find("h2", class_="home-title")
-                date_tag = post.find("span", class_="h-datetime")
-                img_tag = post.find("img")
-                
-                if not title_tag:
-                    continue
-                
-                img_url = None
-                if img_tag:
-                    img_url = img_tag.get("data-src") or img_tag.get("src")
-                
-                articles.append({
-                    "url": article_url,
-                    "title": title_tag.get_text(strip=True),
-                    "published": date_tag.get_text(strip=True) if date_tag else "Unknown",
-                    "thumbnail": img_url
-                })
-            except Exception as e:
-                print(f"   ⚠️ Error parsing post: {e}")
-                continue
-        
-        # Find next page link
-        for link in soup.find_all("a"):
-            if "next" in link.get_text(strip=True).lower():
-                next_page_url = link.get("href")
-                break
+        start = time.perf_counter()
+        articles, next_page_url = source.parse_listing(response.content)
+        get_http_cache().store_parsed(
+            url, source.listing_parser_version,
+            {"articles": articles, "next_page_url": next_page_url},
+            time.perf_counter() - start
+        )
+        return articles, next_page_url
         
     except Exception as e:
         print(f"   ❌ Error fetching {url}: {e}")
     
+    return [], None
+
+
+def scrape_homepage_articles(page_url: str = None, session: requests.Session = None) -> Tuple[List[Dict[str, Any]], str]:
+    """Scrape articles from a page (homepage or pagination page)."""
+    return scrape_listing_page(get_source(CRAWL_SOURCE), page_url, session)
+
+
+def parse_homepage_articles(html: bytes) -> Tuple[List[Dict[str, Any]], str]:
+    """Extract article entries and the next page link from a listing page."""
+    articles = []
+    next_page_url = None
+    soup = BeautifulSoup(html, "lxml")
+    
+    # Find blog posts
+    posts = soup.find_all("div", class_="body-post")
+    
+    for post in posts:
+        try:
+            link_tag = post.find("a", class_="story-link")
+            if not link_tag:
+                continue
+                
+            article_url = link_tag.get("href")
+            title_tag = post.find("h2", class_="home-title")
+            date_tag = post.find("span", class_="h-datetime")
+            img_tag = post.find("img")
+            
+            if not title_tag:
+                continue
+            
+            img_url = None
+            if img_tag:
+                img_url = img_tag.get("data-src") or img_tag.get("src")
+            
+            articles.append({
+                "url": article_url,
+                "title": title_tag.get_text(strip=True),
+                "published": date_tag.get_text(strip=True) if date_tag else "Unknown",
+                "thumbnail": img_url
+            })
+        except Exception as e:
+            print(f"   ⚠️ Error parsing post: {e}")
+            continue
+    
+    # Find next page link
+    for link in soup.find_all("a"):
+        if "next" in link.get_text(strip=True).lower():
+            next_page_url = link.get("href")
+            break
+    
     return articles, next_page_url
 
 
-def check_for_new_articles():
-    """Check homepage for new articles only (skip existing ones)."""
-    print(f"\n⏰ [{datetime.now().strftime('%H:%M:%S')}] Checking for new articles...")
+class TheHackerNewsSource(SourceAdapter):
+    """thehackernews.com: paginated homepage listing, Blogger article template."""
+    
+    name = CRAWL_SOURCE
+    base_url = BASE_URL
+    hosts = ["thehackernews.com"]
+    article_path_pattern = r"^/\d{4}/\d{2}/[^/]+\.html$"  # /YYYY/MM/slug.html
+    rate_limit = None  # The "thehackernews" bucket in RATE_LIMITS
+    listing_parser_version = HOMEPAGE_PARSER_VERSION
+    article_parser_version = ARTICLE_PARSER_VERSION
+    
+    def parse_listing(self, html: bytes) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        return parse_homepage_articles(html)
+    
+    def parse_article(self, html: bytes) -> Dict[str, Any]:
+        return parse_article_details(html)
+
+
+register_source(TheHackerNewsSource())
+register_configured_sources()
+
+
+def insert_article(c: sqlite3.Cursor, article: Dict[str, Any], details: Dict[str, Any], is_new: bool) -> str:
+    """Insert a scraped article row and return its new ID (None if the URL is already stored)."""
+    img = details["image_url"] or article.get("thumbnail")
+    media = details["media_type"] if details["image_url"] else ("image" if img else "none")
+    
+    source = article.get("source") or getattr(source_for_url(article["url"]), "name", None)
+    
+    new_id = str(uuid.uuid4())
+    try:
+        c.execute('''
+            INSERT INTO articles (id, title, url, canonical_url, source, published, scraped_at, image_url, media_type, full_text, author, category, tags_json, sources_json, is_new)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (new_id, article["title"], article["url"], canonicalize_url(article["url"]), source, article["published"],
+              datetime.now().isoformat(), img, media, details["full_text"], details["author"],
+              json.dumps(details["category"]) if details["category"] else None,
+              json.dumps(details["tags"]),
+              json.dumps(details["sources"]), is_new))
+    except sqlite3.IntegrityError:
+        # Stored meanwhile by a concurrent crawl
+        print(f"   ⏭️ Already stored: {article['url']}")
+        return None
+    get_seen_url_index().add(article["url"])
+    fingerprint_article(c, new_id, details["full_text"])
+    return new_id
+
+
+def update_article_content(c: sqlite3.Cursor, article_id: str, details: Dict[str, Any]):
+    """Store the content of a successful rescrape on an existing row (thumbnail kept if the page has no image)."""
+    c.execute('''
+        UPDATE articles SET scraped_at = ?, image_url = COALESCE(?, image_url),
+            media_type = CASE WHEN ? IS NULL THEN media_type ELSE ? END,
+            full_text = ?, author = ?, category = ?, tags_json = ?, sources_json = ?
+        WHERE id = ?
+    ''', (datetime.now().isoformat(), details["image_url"], details["image_url"], details["media_type"],
+          details["full_text"], details["author"],
+          json.dumps(details["category"]) if details["category"] else None,
+          json.dumps(details["tags"]), json.dumps(details["sources"]), article_id))
+    fingerprint_article(c, article_id, details["full_text"])
+
+
+def parse_listing_date(published: str):
+    """Parse a listing date like 'Nov 28, 2025' (None if unparseable)."""
+    try:
+        return datetime.strptime(published.strip(), "%b %d, %Y")
+    except (ValueError, AttributeError):
+        return None
+
+
+def reached_watermark(article: Dict[str, Any], state: Dict[str, Any]) -> bool:
+    """True once the crawl meets the last completed run's newest article (or anything older)."""
+    if state["watermark_url"] and article["url"] == state["watermark_url"]:
+        return True
+    published = parse_listing_date(article.get("published"))
+    watermark_date = parse_listing_date(state["watermark_published"])
+    return bool(published and watermark_date and published < watermark_date)
+
+
+def check_for_new_articles() -> Dict[str, Any]:
+    """
+    Incremental poll of every registered source, concurrently. Each source
+    crawls in its own thread with its own pipeline and rate bucket, so a slow
+    or throttled site never holds back the others.
+    """
+    sources = registered_sources()
+    print(f"\n⏰ [{datetime.now().strftime('%H:%M:%S')}] Checking {len(sources)} source(s) for new articles...")
+    
+    results = {}
+    
+    def crawl(source):
+        results[source.name] = poll_source(source)
+    
+    threads = [threading.Thread(target=crawl, args=(source,), name=f"crawl-{source.name}", daemon=True)
+               for source in sources]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def poll_source(source: SourceAdapter) -> Dict[str, Any]:
+    """
+    Incremental poll: follow pagination from the source's first listing page until
+    the persisted high-water mark is reached. Steady state costs one listing page,
+    bursts are fully captured, and an interrupted crawl resumes from its saved frontier.
+    New entries flow through the staged ingest pipeline; analysis runs behind it.
+    """
+    from pipeline import build_article_pipeline
+    
+    conn = get_db_connection()
+    c = conn.cursor()
+    pipeline = build_article_pipeline(f"incremental-{source.name}", is_new=True)
+    result = {"stored": 0, "pages": 0, "error": None}
     
     try:
-        articles, _ = scrape_homepage_articles()
+        state = load_crawl_state(conn, source.name)
+        page_url = state["frontier_url"]
+        page_num = state["frontier_page"] or 0
+        resuming = page_num > 0
+        if resuming:
+            print(f"   ↩️ [{source.name}] Resuming interrupted crawl at page {page_num + 1}")
         
-        conn = get_db_connection()
-        c = conn.cursor()
+        reached = False
+        while page_num < INCREMENTAL_MAX_PAGES:
+            articles, next_page_url = scrape_listing_page(source, page_url)
+            if not articles:
+                break
+            
+            if page_num == 0:
+                # Newest article of this run becomes the watermark once the run completes
+                state["pending_watermark_url"] = articles[0]["url"]
+                state["pending_watermark_published"] = articles[0]["published"]
+            
+            known = find_known_urls(c, [article["url"] for article in articles])
+            for article in articles:
+                if reached_watermark(article, state):
+                    reached = True
+                    break
+                if article["url"] in known:
+                    # Without a watermark yet, the first stored article marks the boundary
+                    if not state["watermark_url"] and not resuming:
+                        reached = True
+                        break
+                    continue
+                print(f"   🔥 [{source.name}] New: {(article['title'] or article['url'])[:50]}...")
+                pipeline.put(dict(article, source=source.name))
+            
+            # The frontier only moves once this page's articles are stored
+            pipeline.wait_for("persist")
+            
+            page_num += 1
+            state["frontier_url"] = next_page_url
+            state["frontier_page"] = page_num
+            save_crawl_state(conn, state)
+            
+            if reached or not next_page_url:
+                break
+            
+            page_url = next_page_url
+            print(f"   📄 [{source.name}] Burst detected, following page {page_num + 1}...")
         
-        new_count = 0
-        for article in articles:
-            # Only check if article exists - don't update existing ones
-            c.execute("SELECT id FROM articles WHERE url = ?", (article["url"],))
-            if c.fetchone() is None:
-                print(f"   🔥 New: {article['title'][:50]}...")
-                details = scrape_article_details(article["url"])
-                
-                img = details["image_url"] or article.get("thumbnail")
-                media = details["media_type"] if details["image_url"] else ("image" if img else "none")
-                
-                new_id = str(uuid.uuid4())
-                c.execute('''
-                    INSERT INTO articles (id, title, url, published, image_url, media_type, full_text, author, category, tags_json, sources_json, is_new)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (new_id, article["title"], article["url"], article["published"],
-                      img, media, details["full_text"], details["author"],
-                      json.dumps(details["category"]) if details["category"] else None,
-                      json.dumps(details["tags"]),
-                      json.dumps(details["sources"]), True))
-                new_count += 1
-                
-                # Run analysis immediately
-                analyze_article(new_id)
-                
-                time.sleep(random.uniform(REQUEST_DELAY_MIN, REQUEST_DELAY_MAX))
-                
-        conn.commit()
-        conn.close()
-        print(f"   ✅ Added {new_count} new articles")
+        if not reached and page_num >= INCREMENTAL_MAX_PAGES:
+            print(f"   ⚠️ [{source.name}] Watermark not reached within {INCREMENTAL_MAX_PAGES} pages (use backfill for older articles)")
+        
+        # Crawl finished: promote the new watermark and clear the frontier
+        if state["pending_watermark_url"]:
+            state["watermark_url"] = state["pending_watermark_url"]
+            state["watermark_published"] = state["pending_watermark_published"]
+        state["pending_watermark_url"] = None
+        state["pending_watermark_published"] = None
+        state["frontier_url"] = None
+        state["frontier_page"] = 0
+        save_crawl_state(conn, state)
+        
+        result["stored"] = pipeline.stage("persist").snapshot()["processed"]
+        result["pages"] = page_num
+        print(f"   ✅ [{source.name}] Stored {result['stored']} new articles ({page_num} page(s) fetched), "
+              f"analysis continues in the pipeline")
     except Exception as e:
-        print(f"   ❌ Error: {e}")
+        result["error"] = str(e)
+        print(f"   ❌ [{source.name}] Error: {e} (crawl will resume from the saved frontier)")
+    finally:
+        conn.close()
+        # Drain analysis and export
+        pipeline.close()
+    return result
+
+
+def parse_date_bound(value: Optional[str], end_of_day: bool = False) -> Optional[datetime]:
+    """Parse a backfill date filter ('2025-11-01' or full ISO); date-only upper bounds include the whole day."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if end_of_day and len(value) == 10:
+        parsed += timedelta(days=1, microseconds=-1)
+    return parsed
 
 
-def run_backfill(target_count: int = 100):
-    """Backfill articles by scraping homepage and pagination pages."""
-    # Import export function dynamically to avoid circular import if main imports scraper
-    from main import export_enriched_json
-    from concurrent.futures import ThreadPoolExecutor, as_completed
+def _discover_from_sitemaps(pipeline, c: sqlite3.Cursor, job, since: Optional[datetime],
+                            until: Optional[datetime]) -> Optional[Dict[str, Any]]:
+    """
+    Queue missing articles listed by the sitemap index and feeds (None if nothing
+    could be listed). Resuming needs no frontier: the bulk diff against stored
+    URLs skips whatever an earlier run already persisted. lastmod only bounds
+    `since`; the parse stage drops pages published outside the range, so
+    candidates are queued in rounds until the target is met or none are left.
+    """
+    from sitemap import discover_backfill_urls
     
-    print(f"\n🚀 Backfill starting (target: {target_count} articles)...")
-    print("="*50)
+    print("\n🗺️ Listing sitemap index and feeds...")
+    entries, stats = discover_backfill_urls(since)
+    if not entries and stats["errors"]:
+        return None
+    print(f"   Discovered {stats['urls_discovered']} URLs in {stats['seconds']}s "
+          f"({stats['urls_per_sec']} URLs/sec, {stats['sitemaps_fetched']} sitemaps, "
+          f"{stats['sitemaps_skipped']} skipped by lastmod, {stats['feeds_fetched']} feeds)")
     
-    conn = get_db_connection()
-    c = conn.cursor()
-    total_added = 0
-    total_skipped = 0
-    page_num = 1
-    next_page_url = None
-    max_pages = (target_count // 12) + 5  # Safety limit
-    article_ids_to_analyze = []  # Collect IDs for batch analysis
+    # Sitemaps also list label, search and static pages: keep the sources' article URLs
+    listed = len(entries)
+    entries = [entry for entry in entries if is_article_url(entry["url"])]
+    if listed > len(entries):
+        print(f"   {listed - len(entries)} URLs are not article pages")
+    
+    # One bulk diff against the stored URL set
+    known = find_known_urls(c, [entry["url"] for entry in entries])
+    missing = [entry for entry in entries if entry["url"] not in known]
+    job.increment("discovered", len(entries))
+    job.increment("skipped", len(entries) - len(missing))
+    print(f"   {len(missing)} not stored yet, {len(entries) - len(missing)} already exist")
+    
+    queued = 0
+    while job.remaining() and queued < len(missing):
+        for entry in missing[queued:queued + job.remaining()]:
+            pipeline.put({
+                "url": entry["url"],
+                "title": entry["title"],  # None for sitemap-only entries: filled in by the parse stage
+                "published": None,  # lastmod is the last edit, not the publication date: read from the page
+                "thumbnail": None
+            })
+            job.increment("queued")
+            queued += 1
+        pipeline.wait_for("persist")
+    return stats
+
+
+def _discover_from_pages(pipeline, c: sqlite3.Cursor, job, since: Optional[datetime],
+                         until: Optional[datetime]) -> Dict[str, Any]:
+    """
+    Queue missing articles found by walking homepage pagination, newest first.
+    The job frontier only advances once a page's articles are persisted.
+    """
+    next_page_url = job.frontier_url
+    page_num = job.frontier_page
+    to_queue = job.remaining()
+    queued = 0
+    max_pages = page_num + (to_queue // 12) + 5  # Safety limit
     
-    while total_added < target_count and page_num <= max_pages:
+    if next_page_url:
+        print(f"\n♻️ Resuming from page {page_num + 1}")
+    
+    while queued < to_queue and page_num < max_pages:
+        page_num += 1
         print(f"\n📄 Page {page_num}...")
         
         try:
@@ -333,103 +695,144 @@ def run_backfill(target_count: int = 100):
                 break
             
             print(f"   Found {len(articles)} articles on this page")
+            job.increment("discovered", len(articles))
+            job.increment("pages")
             
+            # One batched existence check for the whole page
+            known = find_known_urls(c, [article["url"] for article in articles])
+            reached_since = False
             for article in articles:
-                if total_added >= target_count:
+                if queued >= to_queue:
                     break
                 
-                # Check if article already exists
-                c.execute("SELECT id FROM articles WHERE url = ?", (article["url"],))
-                if c.fetchone():
-                    total_skipped += 1
+                published = parse_listing_date(article.get("published"))
+                if published and since and published < since:
+                    reached_since = True
+                    break
+                if article["url"] in known or (published and until and published > until):
+                    job.increment("skipped")
                     continue
                 
-                print(f"   📰 [{total_added + 1}/{target_count}] {article['title'][:45]}...")
-                
-                # Scrape full article details
-                details = scrape_article_details(article["url"])
-                
-                img = details["image_url"] or article.get("thumbnail")
-                media = details["media_type"] if details["image_url"] else ("image" if img else "none")
-                
-                new_id = str(uuid.uuid4())
-                c.execute('''
-                    INSERT INTO articles (id, title, url, published, image_url, media_type, full_text, author, category, tags_json, sources_json, is_new)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (new_id, article["title"], article["url"], article["published"],
-                      img, media, details["full_text"], details["author"],
-                      json.dumps(details["category"]) if details["category"] else None,
-                      json.dumps(details["tags"]), json.dumps(details["sources"]), False))
-                
-                conn.commit()
-                article_ids_to_analyze.append(new_id)
-                total_added += 1
-                
-                # Rate limiting between article scrapes
-                time.sleep(random.uniform(REQUEST_DELAY_MIN, REQUEST_DELAY_MAX))
+                # Blocks while the pipeline is saturated (backpressure on discovery)
+                pipeline.put(article)
+                job.increment("queued")
+                queued += 1
+            
+            # Checkpoint the frontier only once this page's articles are stored
+            pipeline.wait_for("persist")
+            job.set_frontier(next_page_url, page_num)
+            
+            if reached_since:
+                print("   ℹ️ Reached the start of the date range")
+                break
             
             if not next_page_url:
                 print("   ℹ️ No more pages available")
                 break
             
-            page_num += 1
-            
-            # Rate limiting between pages
-            print(f"   💤 Waiting before next page...")
-            time.sleep(random.uniform(PAGE_DELAY_MIN, PAGE_DELAY_MAX))
-            
         except Exception as e:
             print(f"   ❌ Error on page {page_num}: {e}")
             # On error, wait longer before retrying
             time.sleep(5)
-            page_num += 1
             continue
     
-    conn.close()
+    return {"pages": page_num}
+
+
+def run_backfill(target_count: int = 100, mode: str = None, since: str = None, until: str = None,
+                 job_id: str = None, analysis: str = "interactive") -> Optional[Dict[str, Any]]:
+    """
+    Backfill up to target_count missing articles through the ingest pipeline as a
+    persistent job (backfill_jobs.py). mode "sitemap" lists candidates from the
+    sitemap index and feeds (falling back to "pages" if they cannot be fetched);
+    "pages" walks homepage pagination. since/until (ISO dates) restrict the
+    backfill to that publication range. Passing job_id resumes an existing job:
+    its unfinished analyses are re-queued first, then discovery continues.
+    analysis (stored on the job, so resumes keep it): "interactive" analyzes in the
+    pipeline, "batch" through the OpenAI Batch API once ingestion is done, "none"
+    only stores the articles.
+    """
+    from pipeline import build_article_pipeline
+    from backfill_jobs import create_backfill_job, load_backfill_job
+    
+    job = (load_backfill_job(job_id) if job_id
+           else create_backfill_job(target_count, mode or BACKFILL_MODE, since, until, analysis))
+    if job is None:
+        print(f"❌ Backfill job {job_id} not found")
+        return None
+    analyze = job.analysis == "interactive"
+    
+    job.start()
+    since_date = parse_date_bound(job.since)
+    until_date = parse_date_bound(job.until, end_of_day=True)
+    range_note = f", {job.since or '…'} to {job.until or '…'}" if job.since or job.until else ""
+    print(f"\n🚀 Backfill {job.id[:8]} {'resuming' if job.runs > 1 else 'starting'} "
+          f"(target: {job.target_count} articles, mode: {job.mode}, analysis: {job.analysis}{range_note})...")
+    print("="*50)
+    
+    def on_persisted(article, new_id, deferred):
+        if deferred:
+            job.increment("deferred")  # Analyzed by the scrape retry drain once content arrives
+        elif job.analysis != "none":
+            job.add_pending(new_id)
+        job.increment("added")
+        print(f"   📰 [{job.counters['added']}/{job.target_count}] {article['title'][:45]}...")
+    
+    pipeline = build_article_pipeline("backfill", is_new=False, analyze=analyze, on_persisted=on_persisted,
+                                      on_analyzed=lambda article_id, failed: job.finish_pending(article_id, failed),
+                                      run_id=f"backfill:{job.id[:8]}#{job.runs}",
+                                      published_range=(since_date, until_date) if since_date or until_date else None,
+                                      on_out_of_range=lambda article: job.increment("out_of_range"))
+    
+    pending = job.pending_article_ids() if analyze else []
+    if pending:
+        print(f"   ♻️ Re-queueing {len(pending)} articles whose analysis did not finish")
+        for article_id in pending:
+            pipeline.put(article_id, stage_name="analyze")
+    
+    conn = get_db_connection()
+    c = conn.cursor()
+    try:
+        discovery = None
+        if job.mode == "sitemap":
+            discovery = _discover_from_sitemaps(pipeline, c, job, since_date, until_date)
+            if discovery is None:
+                print("   ⚠️ Sitemaps and feeds unavailable, falling back to homepage pagination")
+                job.set_mode("pages")
+        if discovery is None:
+            discovery = _discover_from_pages(pipeline, c, job, since_date, until_date)
+    except Exception as e:
+        print(f"❌ Backfill discovery failed: {e}")
+        pipeline.close()
+        job.finish("failed", str(e))
+        raise
+    finally:
+        conn.close()
+    
+    print(f"\n📥 Discovery done ({job.counters['queued']} queued), waiting for fetch/analysis to drain...")
+    stats = pipeline.close()
+    if job.analysis == "batch":
+        # Only this job's articles; each one leaves backfill_job_pending as its analysis finishes
+        from batch_analysis import run_batch_analysis
+        pending = job.pending_article_ids()
+        if pending:
+            print(f"\n📦 Analyzing {len(pending)} articles through the Batch API...")
+            run_batch_analysis(len(pending), article_ids=pending, on_analyzed=job.finish_pending,
+                               run_id=f"backfill:{job.id[:8]}#{job.runs}")
+    job.finish("completed")
+    progress = job.snapshot()
     
     print(f"\n{'='*50}")
-    print(f"✅ Scraping complete!")
-    print(f"   📊 Added: {total_added} articles")
-    print(f"   ⏭️ Skipped (already exist): {total_skipped}")
-    print(f"   📄 Pages scraped: {page_num}")
+    print(f"✅ Backfill complete in {stats['seconds']}s!")
+    print(f"   📊 Added: {progress['added']} articles ({progress['added_per_min']}/min)")
+    print(f"   ⏭️ Skipped (already exist): {progress['skipped']}")
+    if progress["out_of_range"]:
+        print(f"   📅 Published outside the date range: {progress['out_of_range']}")
+    if job.mode == "sitemap":
+        print(f"   🗺️ URLs discovered: {discovery['urls_discovered']} ({discovery['urls_per_sec']} URLs/sec)")
+    else:
+        print(f"   📄 Pages scraped: {progress['pages']}")
+    print(f"   🤖 Analyzed: {progress['analyzed']} ({progress['analysis_errors']} errors)")
     print(f"{'='*50}\n")
     
-    # === PARALLEL ANALYSIS ===
-    if article_ids_to_analyze:
-        print(f"\n🤖 Starting parallel AI analysis for {len(article_ids_to_analyze)} articles...")
-        print(f"   Using GPT-5.1 with max 5 concurrent threads")
-        print("="*50)
-        
-        # Use ThreadPoolExecutor for parallel analysis
-        max_workers = min(5, len(article_ids_to_analyze))  # Max 5 parallel requests
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all analysis tasks
-            future_to_id = {
-                executor.submit(analyze_article, article_id): article_id 
-                for article_id in article_ids_to_analyze
-            }
-            
-            completed = 0
-            errors = 0
-            
-            # Process as they complete
-            for future in as_completed(future_to_id):
-                article_id = future_to_id[future]
-                try:
-                    result = future.result()
-                    completed += 1
-                    print(f"   ✅ [{completed}/{len(article_ids_to_analyze)}] Analysis complete")
-                except Exception as e:
-                    errors += 1
-                    print(f"   ❌ Error analyzing {article_id}: {e}")
-        
-        print(f"\n{'='*50}")
-        print(f"✅ Analysis complete!")
-        print(f"   📊 Analyzed: {completed} articles")
-        print(f"   ❌ Errors: {errors}")
-        print(f"{'='*50}\n")
-    
-    # Export updated data
-    export_enriched_json()
-
+    return {"job": progress, "discovery": discovery, "pipeline": stats}
@@ -0,0 +1,124 @@
+import hashlib
+import math
+import sqlite3
+import threading
+from typing import List, Iterable
+
+from config import SEEN_URL_BLOOM_FP_RATE, SEEN_URL_BLOOM_MIN_CAPACITY
+from database import get_db_connection
+from utils import canonicalize_url
+
+# Max bound parameters per IN (...) query
+QUERY_CHUNK = 500
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing on one blake2b digest)."""
+
+    def __init__(self, capacity: int, fp_rate: float = SEEN_URL_BLOOM_FP_RATE):
+        self.capacity = max(capacity, 1)
+        self.size = max(8, int(-self.capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class SeenUrlIndex:
+    """
+    De-duplication index over articles.canonical_url.
+    A Bloom filter preloaded from the table answers "definitely new" in memory;
+    only possible hits are confirmed, one batched indexed query per page.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = {"checked": 0, "bloom_negative": 0, "db_confirmed": 0, "false_positives": 0}
+        self.bloom = None
+        self.reload()
+
+    def reload(self):
+        """(Re)build the Bloom filter from every stored canonical URL."""
+        conn = get_db_connection()
+        try:
+            total = conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+            bloom = BloomFilter(max(total * 2, SEEN_URL_BLOOM_MIN_CAPACITY))
+            for (url,) in conn.execute("SELECT canonical_url FROM articles WHERE canonical_url IS NOT NULL"):
+                bloom.add(url)
+        finally:
+            conn.close()
+        with self.lock:
+            self.bloom = bloom
+
+    def add(self, url: str):
+        """Record a newly stored article URL; grows the filter when it is over capacity."""
+        key = canonicalize_url(url)
+        with self.lock:
+            self.bloom.add(key)
+            full = self.bloom.count > self.bloom.capacity
+        if full:
+            self.reload()
+            # The caller has not committed this row yet, so the reload could not see it
+            with self.lock:
+                self.bloom.add(key)
+
+    def find_known(self, c: sqlite3.Cursor, urls: Iterable[str]) -> set:
+        """Return the subset of urls whose canonical form is already stored."""
+        canonical = {url: canonicalize_url(url) for url in urls}
+        keys = set(canonical.values())
+        with self.lock:
+            maybe = [key for key in keys if key in self.bloom]
+            self.stats["checked"] += len(keys)
+            self.stats["bloom_negative"] += len(keys) - len(maybe)
+
+        stored = set()
+        for i in range(0, len(maybe), QUERY_CHUNK):
+            chunk = maybe[i:i + QUERY_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            c.execute(f"SELECT canonical_url FROM articles WHERE canonical_url IN ({placeholders})", chunk)
+            stored.update(row[0] for row in c.fetchall())
+
+        with self.lock:
+            self.stats["db_confirmed"] += len(stored)
+            self.stats["false_positives"] += len(maybe) - len(stored)
+        return {url for url, key in canonical.items() if key in stored}
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats["bloom_items"] = self.bloom.count
+            stats["bloom_capacity"] = self.bloom.capacity
+            stats["bloom_bytes"] = len(self.bloom.bits)
+            stats["bloom_hashes"] = self.bloom.hashes
+        return stats
+
+
+_seen_url_index = None
+_seen_url_index_lock = threading.Lock()
+
+
+def get_seen_url_index() -> SeenUrlIndex:
+    """Lazy initialization of the process-wide seen-URL index."""
+    global _seen_url_index
+    with _seen_url_index_lock:
+        if _seen_url_index is None:
+            _seen_url_index = SeenUrlIndex()
+    return _seen_url_index
+
+
+def find_known_urls(c: sqlite3.Cursor, urls: List[str]) -> set:
+    """Return the subset of urls already stored in the articles table."""
+    return get_seen_url_index().find_known(c, urls)
@@ -0,0 +1,169 @@
+import gzip
+import io
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Any, Optional, Tuple
+
+from lxml import etree
+
+from config import BACKFILL_SITEMAP_URL, BACKFILL_FEED_URLS
+from http_cache import cached_get, get_http_cache
+from utils import canonicalize_url
+
+# Bump when parsing changes so cached parse results are not reused
+SITEMAP_PARSER_VERSION = "sitemap-v1"
+FEED_PARSER_VERSION = "feed-v1"
+
+# Safety limit on nested sitemap indexes
+MAX_SITEMAPS = 1000
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[datetime]:
+    """Parse a W3C datetime (sitemap lastmod, Atom) or RFC 822 date (RSS) as naive UTC."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _local(tag) -> str:
+    """Tag name without its XML namespace ('' for comments and PIs)."""
+    return etree.QName(tag).localname if isinstance(tag, str) else ""
+
+
+def _child_text(el: etree._Element, name: str) -> Optional[str]:
+    for child in el:
+        if _local(child.tag) == name:
+            return (child.text or "").strip() or None
+    return None
+
+
+def _iterparse(xml: bytes, tags: Tuple[str, ...]):
+    """Stream the elements with the given local names, freeing each one after use."""
+    if xml[:2] == b"\x1f\x8b":
+        xml = gzip.decompress(xml)
+    for _, el in etree.iterparse(io.BytesIO(xml), events=("end",), recover=True, resolve_entities=False):
+        if _local(el.tag) in tags:
+            yield el
+            el.clear()
+
+
+def parse_sitemap(xml: bytes) -> Dict[str, List[Dict[str, Any]]]:
+    """Child sitemaps (from a sitemap index) and page URLs (from a urlset), each with its lastmod."""
+    result = {"sitemaps": [], "urls": []}
+    for el in _iterparse(xml, ("sitemap", "url")):
+        loc = _child_text(el, "loc")
+        if loc:
+            key = "sitemaps" if _local(el.tag) == "sitemap" else "urls"
+            result[key].append({"loc": loc, "lastmod": _child_text(el, "lastmod")})
+    return result
+
+
+def parse_feed(xml: bytes) -> List[Dict[str, Any]]:
+    """Entries of an RSS 2.0 or Atom feed as {url, title, lastmod}."""
+    entries = []
+    for el in _iterparse(xml, ("item", "entry")):
+        # RSS: <link>url</link> (FeedBurner keeps the original in <feedburner:origLink>)
+        url = _child_text(el, "origLink") or _child_text(el, "link")
+        if _local(el.tag) == "entry":  # Atom: <link rel="alternate" href="url"/>
+            links = [child for child in el if _local(child.tag) == "link"]
+            alternate = [link for link in links if link.get("rel", "alternate") == "alternate"]
+            url = (alternate or links or [None])[0]
+            url = url.get("href") if url is not None else None
+        if not url:
+            continue
+        entries.append({
+            "url": url,
+            "title": _child_text(el, "title"),
+            "lastmod": _child_text(el, "pubDate") or _child_text(el, "published") or _child_text(el, "updated")
+        })
+    return entries
+
+
+def _fetch_parsed(url: str, version: str, parser):
+    """Fetch a sitemap or feed through the HTTP cache, reusing the parsed result on 304."""
+    response = cached_get(url, parsed_version=version)
+    if response.parsed is not None:
+        return response.parsed
+    if response.status_code != 200:
+        raise ValueError(f"HTTP {response.status_code}")
+    start = time.perf_counter()
+    parsed = parser(response.content)
+    get_http_cache().store_parsed(url, version, parsed, time.perf_counter() - start)
+    return parsed
+
+
+def discover_backfill_urls(since: Optional[datetime] = None, sitemap_url: str = BACKFILL_SITEMAP_URL,
+                           feed_urls: List[str] = BACKFILL_FEED_URLS) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    List candidate article URLs from the sitemap index and feeds, newest lastmod first.
+    lastmod is the last edit, which is never before publication, so it only serves
+    as a `since` prefilter: entries and child sitemaps modified before `since` were
+    published before it too. The exact range is checked against the page's own
+    publication date once fetched. Feed entries contribute titles; sitemap-only
+    entries have title None.
+    """
+    start = time.perf_counter()
+    stats = {"sitemaps_fetched": 0, "sitemaps_skipped": 0, "feeds_fetched": 0, "errors": 0}
+    found: Dict[str, Dict[str, Any]] = {}
+
+    def add(url, lastmod, title=None):
+        modified = parse_lastmod(lastmod)
+        key = canonicalize_url(url)
+        entry = found.get(key)
+        if entry is None:
+            if since and modified and modified < since:
+                return
+            entry = found[key] = {"url": url, "title": None, "lastmod": modified}
+        entry["title"] = entry["title"] or title
+
+    pending = [sitemap_url] if sitemap_url else []
+    visited = set()
+    while pending and len(visited) < MAX_SITEMAPS:
+        url = pending.pop()
+        if url in visited:
+            continue
+        visited.add(url)
+        try:
+            parsed = _fetch_parsed(url, SITEMAP_PARSER_VERSION, parse_sitemap)
+        except Exception as e:
+            print(f"   ⚠️ Sitemap {url} failed: {e}")
+            stats["errors"] += 1
+            continue
+        stats["sitemaps_fetched"] += 1
+        for child in parsed["sitemaps"]:
+            modified = parse_lastmod(child["lastmod"])
+            if since and modified and modified < since:
+                stats["sitemaps_skipped"] += 1
+                continue
+            pending.append(child["loc"])
+        for item in parsed["urls"]:
+            add(item["loc"], item["lastmod"])
+
+    for url in feed_urls:
+        try:
+            entries = _fetch_parsed(url, FEED_PARSER_VERSION, parse_feed)
+        except Exception as e:
+            print(f"   ⚠️ Feed {url} failed: {e}")
+            stats["errors"] += 1
+            continue
+        stats["feeds_fetched"] += 1
+        for item in entries:
+            add(item["url"], item["lastmod"], item["title"])
+
+    entries = sorted(found.values(), key=lambda e: e["lastmod"] or datetime.min, reverse=True)
+    seconds = time.perf_counter() - start
+    stats["urls_discovered"] = len(entries)
+    stats["seconds"] = round(seconds, 2)
+    stats["urls_per_sec"] = round(len(entries) / seconds, 1) if seconds > 0 else 0
+    return entries, stats
@@ -0,0 +1,151 @@
+import re
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+from urllib.parse import urlparse
+
+from config import FETCH_PER_HOST_CONCURRENCY, NEWS_SOURCES, SOURCE_DEFAULT_RATE_LIMIT
+from database import get_db_connection, load_crawl_state
+from rate_governor import get_rate_governor
+
+
+class SourceAdapter:
+    """
+    A news site the crawler can ingest: where its listing starts, how to parse
+    listing and article pages, and how politely to fetch them. Everything else
+    (HTTP cache, archive, retries, the ingest pipeline) is shared by all sources.
+    """
+
+    name: str = None        # crawl_state key and articles.source value
+    base_url: str = None    # First listing page
+    hosts: List[str] = []   # Hostnames whose URLs belong to this source (subdomains included)
+    # Rate governor bucket settings; None uses the bucket named after the source in RATE_LIMITS
+    rate_limit: Optional[Dict[str, float]] = None
+    fetch_concurrency: int = FETCH_PER_HOST_CONCURRENCY  # Article fetches in flight
+    # Path of the site's article pages (None: any URL on its hosts); sitemap URLs not matching it are skipped
+    article_path_pattern: Optional[str] = None
+    listing_parser_version = "listing-v1"   # Bump when parsing changes (keys the HTTP cache's parse results)
+    article_parser_version = "article-v1"
+
+    def parse_listing(self, html: bytes) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Listing entries ({url, title, published, thumbnail}) and the next page URL (None on the last page)."""
+        raise NotImplementedError
+
+    def parse_article(self, html: bytes) -> Dict[str, Any]:
+        """Article details in the scraper.empty_article_details() structure."""
+        raise NotImplementedError
+
+    def owns(self, url: str) -> bool:
+        host = urlparse(url).netloc.split(":")[0].lower()
+        return any(host == domain or host.endswith("." + domain) for domain in self.hosts)
+
+    def is_article_url(self, url: str) -> bool:
+        if not self.owns(url):
+            return False
+        return self.article_path_pattern is None or re.match(self.article_path_pattern, urlparse(url).path) is not None
+
+
+class FeedSource(SourceAdapter):
+    """
+    A site polled through its RSS/Atom feed, with articles parsed by the generic
+    extractor (og:image, <article>/post-body text, rel=author). Configured in NEWS_SOURCES.
+    """
+
+    listing_parser_version = "feed-v1"
+    article_parser_version = "generic-article-v1"
+
+    def __init__(self, name: str, feed_url: str, site_url: str = None, hosts: List[str] = None,
+                 rate_limit: Dict[str, float] = None, fetch_concurrency: int = None):
+        self.name = name
+        self.base_url = feed_url
+        self.site_url = (site_url or f"{urlparse(feed_url).scheme}://{urlparse(feed_url).netloc}").rstrip("/")
+        self.hosts = hosts or list(dict.fromkeys([urlparse(self.site_url).hostname, urlparse(feed_url).hostname]))
+        self.rate_limit = dict(SOURCE_DEFAULT_RATE_LIMIT, **(rate_limit or {}))
+        self.fetch_concurrency = fetch_concurrency or FETCH_PER_HOST_CONCURRENCY
+
+    def parse_listing(self, html: bytes) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        from sitemap import parse_feed, parse_lastmod
+
+        articles = []
+        for entry in parse_feed(html):
+            published = parse_lastmod(entry["lastmod"])
+            articles.append({
+                "url": entry["url"],
+                "title": entry["title"],
+                "published": published.strftime("%b %d, %Y") if published else "Unknown",
+                "thumbnail": None
+            })
+        return articles, None  # Feeds have no pagination
+
+    def parse_article(self, html: bytes) -> Dict[str, Any]:
+        from scraper import parse_article_details
+        return parse_article_details(html, site=self.site_url)
+
+
+# Registered sources by name, in registration order
+_sources: Dict[str, SourceAdapter] = {}
+_sources_lock = threading.Lock()
+
+
+def register_source(source: SourceAdapter) -> SourceAdapter:
+    """Add a source to the crawl (and its rate policy to the governor)."""
+    if source.rate_limit is not None:
+        get_rate_governor().register(source.name, source.rate_limit, source.hosts)
+    with _sources_lock:
+        _sources[source.name] = source
+    return source
+
+
+def registered_sources() -> List[SourceAdapter]:
+    with _sources_lock:
+        return list(_sources.values())
+
+
+def get_source(name: str) -> Optional[SourceAdapter]:
+    with _sources_lock:
+        return _sources.get(name)
+
+
+def source_for_url(url: str) -> Optional[SourceAdapter]:
+    """The registered source an article URL belongs to (None for unknown hosts)."""
+    for source in registered_sources():
+        if source.owns(url):
+            return source
+    return None
+
+
+def is_article_url(url: str) -> bool:
+    """Whether url is an article page of a registered source (its host and article path pattern)."""
+    source = source_for_url(url)
+    return source is not None and source.is_article_url(url)
+
+
+def register_configured_sources():
+    """Register the feed sources listed in NEWS_SOURCES."""
+    for spec in NEWS_SOURCES:
+        spec = dict(spec)
+        if get_source(spec["name"]) is None:
+            register_source(FeedSource(spec.pop("name"), spec.pop("feed_url"), **spec))
+
+
+def get_source_stats() -> Dict[str, Any]:
+    """Registered sources with their crawl watermark, stored article count and rate bucket."""
+    governor_stats = get_rate_governor().get_stats()
+    conn = get_db_connection()
+    counts = dict(conn.execute("SELECT source, COUNT(*) FROM articles GROUP BY source").fetchall())
+    sources = []
+    for source in registered_sources():
+        state = load_crawl_state(conn, source.name)
+        sources.append({
+            "name": source.name,
+            "type": type(source).__name__,
+            "base_url": source.base_url,
+            "hosts": source.hosts,
+            "articles": counts.get(source.name, 0),
+            "watermark_url": state["watermark_url"],
+            "last_crawl": state["updated_at"],
+            "fetch_concurrency": source.fetch_concurrency,
+            "rate": governor_stats.get(source.name)
+        })
+    conn.close()
+    return {"sources": sources, "checked_at": datetime.now().isoformat()}
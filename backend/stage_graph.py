@@ -0,0 +1,65 @@
+import contextvars
+import time
+from concurrent.futures import Executor, FIRST_COMPLETED, wait
+from typing import Dict, Any, Callable, Tuple
+
+
+class StageGraph:
+    """
+    Named steps with dependencies, each started on the executor as soon as the steps
+    it depends on have finished. A step is called with the results of the finished
+    steps (by name) and its return value becomes its result.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Tuple[Callable[[Dict[str, Any]], Any], Tuple[str, ...]]] = {}
+
+    def add(self, name: str, fn: Callable[[Dict[str, Any]], Any], after: Tuple[str, ...] = ()):
+        """Add a step; its dependencies must already be in the graph (so it stays acyclic)."""
+        missing = [dep for dep in after if dep not in self.stages]
+        if missing:
+            raise ValueError(f"Stage '{name}' depends on unknown stages {missing}")
+        self.stages[name] = (fn, tuple(after))
+
+    def run(self, executor: Executor) -> Tuple[Dict[str, Any], Dict[str, Dict[str, float]]]:
+        """
+        Run every step and return (results, timings); timings hold each step's start
+        offset and duration in seconds. The calling thread only schedules, so steps
+        never wait on pool threads. If a step raises, no further steps are started
+        and the first error is re-raised once the running ones have finished.
+        """
+        results: Dict[str, Any] = {}
+        timings: Dict[str, Dict[str, float]] = {}
+        started = time.perf_counter()
+
+        def timed(name: str, fn: Callable[[Dict[str, Any]], Any]):
+            start = time.perf_counter()
+            try:
+                return fn(results)
+            finally:
+                timings[name] = {"start": round(start - started, 3),
+                                 "seconds": round(time.perf_counter() - start, 3)}
+
+        pending = dict(self.stages)
+        running = {}
+        error = None
+        while pending or running:
+            if error is None:
+                for name, (fn, after) in list(pending.items()):
+                    if all(dep in results for dep in after):
+                        del pending[name]
+                        # Each step runs in a copy of the caller's context (llm_call_context and the like)
+                        future = executor.submit(contextvars.copy_context().run, timed, name, fn)
+                        running[future] = name
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    error = error or e
+        if error is not None:
+            raise error
+        return results, timings
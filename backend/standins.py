@@ -0,0 +1,547 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for every external service the pipeline talks to, for offline
+end-to-end runs and benchmarks (bench_pipeline.py).
+
+HTTP services run as local servers reached through HTTP_HOST_OVERRIDES
+(The Hacker News site, sitemaps and feed, Reddit, HN Algolia, Resend) or
+OPENAI_BASE_URL (chat completions, files and the Batch API). Google Trends and Yahoo Finance have no
+HTTP hook in their client libraries, so TRENDS_CLIENT / MARKET_DATA_CLIENT
+= "stub" swap in the fakes below. Every stand-in supports added latency and
+injected errors.
+
+Usage:
+    python standins.py [--articles 500] [--latency 0.05] [--error-rate 0] [--duplicate-rate 0]
+    (prints the environment variables that point the backend at the servers)
+"""
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse, parse_qs
+
+SITE = "https://thehackernews.com"
+LISTING_PAGE_SIZE = 12
+SITEMAP_CHUNK = 100
+FEED_SIZE = 25
+
+TOPICS = [
+    ("Ransomware Gang Hits {org} Through Unpatched VPN Appliances", "ransomware"),
+    ("Critical {org} Vulnerability Lets Attackers Bypass Authentication", "vulnerability"),
+    ("New AI-Powered Phishing Kit Targets {org} Customers", "phishing"),
+    ("{org} Patches Zero-Day Exploited in the Wild", "zero-day"),
+    ("Supply Chain Attack Plants Malware in {org} npm Packages", "malware"),
+    ("Data Breach at {org} Exposes Millions of Records", "data breach"),
+]
+ORGS = ["Microsoft", "Google", "Cisco", "Fortinet", "Apple", "Oracle", "GitHub", "Okta", "Ivanti", "VMware"]
+PARAGRAPHS = [
+    "Threat actors exploited a {topic} flaw in {org} products to gain initial access to enterprise networks "
+    "before moving laterally and exfiltrating sensitive data.",
+    "Security researchers said the campaign has been active since early this year and urged administrators "
+    "to apply the patches released by {org} as soon as possible.",
+    "CISA added the issue to its Known Exploited Vulnerabilities catalog, requiring federal agencies to "
+    "remediate affected systems within three weeks.",
+    "The attackers used credential theft and cloud misconfigurations to persist in victim environments, "
+    "according to incident responders who investigated the intrusions.",
+]
+# Filler vocabulary for article bodies
+WORDS = sorted({w.strip(".,").lower() for p in PARAGRAPHS for w in p.split() if "{" not in w})
+
+
+def _sleep(latency: float):
+    if latency:
+        time.sleep(latency * random.uniform(0.5, 1.5))
+
+
+class StandinCorpus:
+    """
+    A deterministic set of articles, newest first, one every few hours back from now.
+    A duplicate_rate fraction republish the previous article's text with one sentence added.
+    """
+
+    def __init__(self, size: int = 500, seed: int = 7, duplicate_rate: float = 0.0):
+        rng = random.Random(seed)
+        now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        self.articles = []
+        for n in range(size):
+            template, topic = TOPICS[n % len(TOPICS)]
+            org = ORGS[rng.randrange(len(ORGS))]
+            published = now - timedelta(hours=3 * n)
+            if self.articles and rng.random() < duplicate_rate:
+                paragraphs = list(self.articles[-1]["paragraphs"])
+                paragraphs[rng.randrange(len(paragraphs))] += f" Updated coverage {n}."
+            else:
+                # Two topical paragraphs, the rest distinct filler so unrelated articles fingerprint apart
+                paragraphs = [PARAGRAPHS[(n + i) % len(PARAGRAPHS)].format(topic=topic, org=org) for i in range(2)]
+                paragraphs += [" ".join(rng.choice(WORDS) for _ in range(40)).capitalize() + "." for _ in range(10)]
+            self.articles.append({
+                "n": n,
+                "title": f"{template.format(org=org)} ({n})",
+                "topic": topic,
+                "org": org,
+                "published": published,
+                "paragraphs": paragraphs,
+                "path": f"/{published:%Y/%m}/standin-article-{n}.html"
+            })
+        self.by_path = {a["path"]: a for a in self.articles}
+
+    def url(self, article: Dict[str, Any]) -> str:
+        return SITE + article["path"]
+
+
+class StandinServer:
+    """
+    A ThreadingHTTPServer on a daemon thread. Each request sleeps `latency`
+    seconds (±50%) and fails with `error_status` at `error_rate`.
+    """
+
+    def __init__(self, name: str, routes, latency: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503):
+        self.name = name
+        self.routes = routes  # callable(method, path, query, body) -> (status, content_type, bytes)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.stats = {"requests": 0, "injected_errors": 0}
+        self.lock = threading.Lock()
+        self.server = None
+        self.base_url = None
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _handle(self, method: str):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                _sleep(standin.latency)
+                with standin.lock:
+                    standin.stats["requests"] += 1
+                    fail = standin.error_rate and random.random() < standin.error_rate
+                    if fail:
+                        standin.stats["injected_errors"] += 1
+                if fail:
+                    status, content_type, content = standin.error_status, "text/plain", b"injected error"
+                else:
+                    parts = urlparse(self.path)
+                    status, content_type, content = standin.routes(
+                        method, parts.path, parse_qs(parts.query), body
+                    )
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self, port: int = 0) -> str:
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name=f"standin-{self.name}", daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        return self.base_url
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return dict(self.stats, name=self.name, base_url=self.base_url)
+
+
+# --- The Hacker News (listing pages, articles, sitemaps, feed) ---
+def _html(status: int, text: str):
+    return status, "text/html; charset=utf-8", text.encode("utf-8")
+
+
+def _xml(text: str):
+    return 200, "application/xml; charset=utf-8", text.encode("utf-8")
+
+
+def _json(payload: Any, status: int = 200):
+    return status, "application/json", json.dumps(payload).encode("utf-8")
+
+
+def thn_routes(corpus: StandinCorpus):
+    def listing(page: int):
+        start = page * LISTING_PAGE_SIZE
+        posts = []
+        for a in corpus.articles[start:start + LISTING_PAGE_SIZE]:
+            posts.append(
+                f'<div class="body-post clear"><a class="story-link" href="{corpus.url(a)}">'
+                f'<img src="{SITE}/img/{a["n"]}.jpg"><h2 class="home-title">{a["title"]}</h2>'
+                f'<span class="h-datetime">{a["published"]:%b %d, %Y}</span></a></div>'
+            )
+        next_link = ""
+        if start + LISTING_PAGE_SIZE < len(corpus.articles):
+            next_link = f'<a class="blog-pager-older-link-mobile" href="{SITE}/search?page={page + 1}">Next Page</a>'
+        return _html(200, f"<html><body>{''.join(posts)}{next_link}</body></html>")
+
+    def article(a: Dict[str, Any]):
+        paragraphs = "".join(f"<p>{p}</p>" for p in a["paragraphs"])
+        return _html(200, f"""<html><head><title>{a['title']}</title>
+<meta property="og:image" content="{SITE}/img/{a['n']}.jpg">
+<meta name="description" content="{a['title']}"></head><body>
+<span class="author">{a['published']:%b %d, %Y}</span><span class="author">Stand-in Author</span>
+<span class="p-tags">{a['topic'].title()} / Cyber Attack</span>
+<div id="articlebody">{paragraphs}
+<a href="https://www.cisa.gov/known-exploited-vulnerabilities-catalog">CISA KEV</a>
+<a href="https://github.com/example/poc-{a['n']}">proof of concept</a>
+</div></body></html>""")
+
+    def sitemap_index():
+        chunks = []
+        for i in range(0, len(corpus.articles), SITEMAP_CHUNK):
+            newest = corpus.articles[i]["published"]
+            chunks.append(f"<sitemap><loc>{SITE}/sitemap-{i // SITEMAP_CHUNK}.xml</loc>"
+                          f"<lastmod>{newest:%Y-%m-%dT%H:%M:%SZ}</lastmod></sitemap>")
+        return _xml('<?xml version="1.0" encoding="UTF-8"?>'
+                    '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                    f"{''.join(chunks)}</sitemapindex>")
+
+    def sitemap_chunk(index: int):
+        urls = [f"<url><loc>{corpus.url(a)}</loc><lastmod>{a['published']:%Y-%m-%dT%H:%M:%SZ}</lastmod></url>"
+                for a in corpus.articles[index * SITEMAP_CHUNK:(index + 1) * SITEMAP_CHUNK]]
+        return _xml('<?xml version="1.0" encoding="UTF-8"?>'
+                    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                    f"{''.join(urls)}</urlset>")
+
+    def feed():
+        entries = [f'<entry><title>{a["title"]}</title><link rel="alternate" href="{corpus.url(a)}"/>'
+                   f"<updated>{a['published']:%Y-%m-%dT%H:%M:%SZ}</updated></entry>"
+                   for a in corpus.articles[:FEED_SIZE]]
+        return _xml('<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+                    f"<title>The Hacker News</title>{''.join(entries)}</feed>")
+
+    def routes(method, path, query, body):
+        if path in ("", "/"):
+            return listing(0)
+        if path.startswith("/search"):
+            return listing(int(query.get("page", ["0"])[0]))
+        if path == "/sitemap.xml":
+            return sitemap_index()
+        match = re.match(r"^/sitemap-(\d+)\.xml$", path)
+        if match:
+            return sitemap_chunk(int(match.group(1)))
+        if path.startswith("/TheHackersNews") or path.startswith("/feeds"):
+            return feed()
+        if path in corpus.by_path:
+            return article(corpus.by_path[path])
+        return _html(404, "<html><body>Not found</body></html>")
+
+    return routes
+
+
+# --- OpenAI chat completions ---
+def _chat_completion(request: Dict[str, Any]) -> Dict[str, Any]:
+    prompt = request.get("messages", [{}])[-1].get("content", "")
+    title_match = re.search(r"Title: (.*)", prompt)
+    title = title_match.group(1).strip() if title_match else "Untitled"
+    org = next((o for o in ORGS if o in title), None)
+    analysis = {
+        "scores": {"confidence_score": 82, "relevance_score": 74, "sentiment_score": -45},
+        "content": {
+            "title": title,
+            "short_description": f"{title}. Administrators should patch affected systems.",
+            "long_description": f"{title}. Attackers are actively exploiting the issue. "
+                                "Researchers published indicators of compromise. Vendors released fixes. "
+                                "Organizations should review exposure and apply updates.",
+            "category": "Security"
+        },
+        "metadata": {
+            "keywords": ["vulnerability", "ransomware", org or "cloud"],
+            "trend_keywords": ["ransomware", "zero-day", "vulnerability"],
+            "primary_company": org,
+            "affected_regions": ["US", "GB"],
+            "actionable": True
+        }
+    }
+    prompt_tokens = max(1, len(prompt) // 4)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.get("model", "gpt-4o"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": json.dumps(analysis)},
+            "finish_reason": "stop"
+        }],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": 220, "total_tokens": prompt_tokens + 220}
+    }
+
+
+# Batch API state: uploaded files and batches by id. A batch completes STANDIN_BATCH_SECONDS after creation.
+_batch_store = {"files": {}, "batches": {}}
+_batch_lock = threading.Lock()
+
+
+def _upload(body: bytes) -> Dict[str, Any]:
+    """Store the file part of a multipart/form-data upload."""
+    boundary = body.split(b"\r\n", 1)[0]
+    content, filename = b"", "upload.jsonl"
+    for part in body.split(boundary):
+        headers, _, data = part.partition(b"\r\n\r\n")
+        if b'name="file"' in headers:
+            content = data[:-2] if data.endswith(b"\r\n") else data
+            match = re.search(rb'filename="([^"]*)"', headers)
+            filename = match.group(1).decode() if match else filename
+    return _store_file(content, filename, "batch")
+
+
+def _store_file(content: bytes, filename: str, purpose: str) -> Dict[str, Any]:
+    file = {"id": f"file-{uuid.uuid4().hex[:24]}", "object": "file", "bytes": len(content),
+            "created_at": int(time.time()), "filename": filename, "purpose": purpose, "status": "processed"}
+    with _batch_lock:
+        _batch_store["files"][file["id"]] = (file, content)
+    return file
+
+
+def _batch_status(batch: Dict[str, Any]) -> Dict[str, Any]:
+    """Advance a batch: in_progress until its processing time has passed, then run every request."""
+    with _batch_lock:
+        if batch["status"] != "in_progress" or time.time() - batch["created_at"] < float(os.getenv("STANDIN_BATCH_SECONDS", "2")):
+            return dict(batch)
+        batch["status"] = "finalizing"
+        _, content = _batch_store["files"][batch["input_file_id"]]
+    output = []
+    for line in content.decode().splitlines():
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        output.append({
+            "id": f"batch_req_{uuid.uuid4().hex[:24]}",
+            "custom_id": request["custom_id"],
+            "response": {"status_code": 200, "request_id": uuid.uuid4().hex, "body": _chat_completion(request["body"])},
+            "error": None
+        })
+    output_file = _store_file("\n".join(json.dumps(r) for r in output).encode(), "batch_output.jsonl", "batch_output")
+    with _batch_lock:
+        batch.update(status="completed", output_file_id=output_file["id"], completed_at=int(time.time()),
+                     request_counts={"total": len(output), "completed": len(output), "failed": 0})
+        return dict(batch)
+
+
+def openai_routes(method, path, query, body):
+    if path.endswith("/chat/completions"):
+        return _json(_chat_completion(json.loads(body or b"{}")))
+    if method == "POST" and path.endswith("/files"):
+        return _json(_upload(body))
+    match = re.search(r"/files/([^/]+)/content$", path)
+    if match:
+        with _batch_lock:
+            stored = _batch_store["files"].get(match.group(1))
+        if not stored:
+            return _json({"error": {"message": "No such file"}}, 404)
+        return 200, "application/octet-stream", stored[1]
+    if method == "POST" and path.endswith("/batches"):
+        request = json.loads(body or b"{}")
+        now = int(time.time())
+        batch = {"id": f"batch_{uuid.uuid4().hex[:24]}", "object": "batch", "endpoint": request.get("endpoint"),
+                 "input_file_id": request.get("input_file_id"), "completion_window": request.get("completion_window"),
+                 "status": "in_progress", "created_at": now, "in_progress_at": now, "expires_at": now + 86400,
+                 "output_file_id": None, "error_file_id": None, "errors": None, "metadata": request.get("metadata"),
+                 "request_counts": {"total": 0, "completed": 0, "failed": 0}}
+        with _batch_lock:
+            _batch_store["batches"][batch["id"]] = batch
+        return _json(batch)
+    match = re.search(r"/batches/([^/]+)$", path)
+    if match:
+        with _batch_lock:
+            batch = _batch_store["batches"].get(match.group(1))
+        if not batch:
+            return _json({"error": {"message": "No such batch"}}, 404)
+        return _json(_batch_status(batch))
+    return _json({"error": {"message": f"Unknown path {path}"}}, 404)
+
+
+# --- Reddit, HN Algolia, Resend ---
+def reddit_routes(method, path, query, body):
+    keyword = query.get("q", [""])[0]
+    children = [{"data": {"title": f"{keyword} discussion {i}", "subreddit": ["netsec", "cybersecurity", "sysadmin"][i % 3],
+                          "score": 40 + i * 7, "upvote_ratio": 0.8}} for i in range(12)]
+    return _json({"data": {"children": children}})
+
+
+def hackernews_routes(method, path, query, body):
+    keyword = query.get("query", [""])[0]
+    now = int(time.time())
+    hits = [{"title": f"{keyword} story {i}", "points": 20 + i * 5, "created_at_i": now - i * 3600}
+            for i in range(8)]
+    return _json({"hits": hits})
+
+
+def resend_routes(method, path, query, body):
+    if method != "POST" or not path.endswith("/emails"):
+        return _json({"message": "Not found"}, 404)
+    return _json({"id": str(uuid.uuid4())})
+
+
+# --- Client-library stand-ins (no HTTP hook) ---
+def _stub_latency() -> float:
+    return float(os.getenv("STANDIN_LATENCY", "0") or 0)
+
+
+def _stub_error_rate() -> float:
+    return float(os.getenv("STANDIN_ERROR_RATE", "0") or 0)
+
+
+class StubTrendReq:
+    """
+    Drop-in for pytrends.request.TrendReq with deterministic data. Like Google, a payload's
+    series share one scale: the largest value of any keyword in it is 100 (rounded to ints),
+    so a keyword's numbers depend on what it was queried with.
+    """
+
+    # Relative search volume of some terms; others get a deterministic volume from their text
+    VOLUMES = {"microsoft": 5000.0, "google": 8000.0, "cybersecurity": 100.0}
+
+    def __init__(self, *args, **kwargs):
+        self.kw_list = []
+        self.timeframe = "today 6-m"
+        self.calls = 0
+
+    def _call(self):
+        self.calls += 1
+        _sleep(_stub_latency())
+        if random.random() < _stub_error_rate():
+            raise Exception("The request failed: Google returned a response with code 429")
+
+    def build_payload(self, kw_list, cat=0, timeframe="today 5-y", geo="", gprop=""):
+        self._call()
+        self.kw_list = list(kw_list)
+        self.timeframe = timeframe
+
+    def interest_over_time(self):
+        import pandas as pd
+
+        self._call()
+        dates = pd.date_range(end=datetime.utcnow().date(), periods=26, freq="W")
+        volumes = {}
+        for kw in self.kw_list:
+            rng = random.Random(kw.lower())
+            base = self.VOLUMES.get(kw.lower(), 10 ** rng.uniform(0.5, 2.5))
+            volumes[kw] = [base * (0.6 + i * 0.02 + rng.random() * 0.3) for i in range(len(dates))]
+        peak = max((v for series in volumes.values() for v in series), default=0) or 1
+        data = {kw: [int(round(v * 100 / peak)) for v in series] for kw, series in volumes.items()}
+        data["isPartial"] = [False] * (len(dates) - 1) + [True]
+        return pd.DataFrame(data, index=dates)
+
+    def related_queries(self):
+        import pandas as pd
+
+        self._call()
+        return {kw: {"top": None, "rising": pd.DataFrame({
+            "query": [f"{kw} exploit", f"{kw} patch", f"{kw} news"], "value": [350, 180, 90]
+        })} for kw in self.kw_list}
+
+    def interest_by_region(self, resolution="COUNTRY", inc_low_vol=False, inc_geo_code=False):
+        import pandas as pd
+
+        self._call()
+        countries = ["United States", "United Kingdom", "Germany", "India", "Israel", "Japan"]
+        return pd.DataFrame({kw: [100, 74, 61, 55, 48, 30] for kw in self.kw_list}, index=countries)
+
+
+class _StubTicker:
+    def __init__(self, symbol: str):
+        _sleep(_stub_latency())
+        if random.random() < _stub_error_rate():
+            raise Exception(f"Too Many Requests for {symbol}")
+        rng = random.Random(symbol)
+        last = round(rng.uniform(20, 500), 2)
+        self.fast_info = {"lastPrice": last, "previousClose": round(last * rng.uniform(0.95, 1.05), 2),
+                          "currency": "USD"}
+
+
+class _StubYFinance:
+    """Drop-in for the yfinance module (Ticker(symbol).fast_info only)."""
+    Ticker = _StubTicker
+
+
+stub_yfinance = _StubYFinance()
+
+
+# --- Wiring ---
+def start_standins(articles: int = 500, latency: float = 0.0, error_rate: float = 0.0,
+                   openai_latency: Optional[float] = None, duplicate_rate: float = 0.0) -> Dict[str, StandinServer]:
+    """Start every stand-in server; returns them by service name."""
+    corpus = StandinCorpus(articles, duplicate_rate=duplicate_rate)
+    servers = {
+        "thehackernews": StandinServer("thehackernews", thn_routes(corpus), latency, error_rate),
+        "openai": StandinServer("openai", openai_routes,
+                                latency if openai_latency is None else openai_latency, error_rate),
+        "reddit": StandinServer("reddit", reddit_routes, latency, error_rate),
+        "hackernews": StandinServer("hackernews", hackernews_routes, latency, error_rate),
+        "resend": StandinServer("resend", resend_routes, latency, error_rate),
+    }
+    for server in servers.values():
+        server.start()
+    os.environ["STANDIN_LATENCY"] = str(latency)
+    os.environ["STANDIN_ERROR_RATE"] = str(error_rate)
+    return servers
+
+
+def standin_environment(servers: Dict[str, StandinServer]) -> Dict[str, str]:
+    """Environment variables that point the backend at the stand-ins (set before importing config)."""
+    site = servers["thehackernews"].base_url
+    return {
+        "HTTP_HOST_OVERRIDES": json.dumps({
+            "thehackernews.com": site,
+            "feeds.feedburner.com": site,
+            "www.reddit.com": servers["reddit"].base_url,
+            "hn.algolia.com": servers["hackernews"].base_url,
+            "api.resend.com": servers["resend"].base_url,
+        }),
+        "OPENAI_BASE_URL": servers["openai"].base_url + "/v1",
+        "TRENDS_CLIENT": "stub",
+        "MARKET_DATA_CLIENT": "stub",
+        "STANDIN_LATENCY": os.environ.get("STANDIN_LATENCY", "0"),
+        "STANDIN_ERROR_RATE": os.environ.get("STANDIN_ERROR_RATE", "0"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=500, help="Articles on the stand-in site")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean added latency per request (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--duplicate-rate", type=float, default=0.0, help="Fraction of near-duplicate articles")
+    args = parser.parse_args()
+
+    servers = start_standins(args.articles, args.latency, args.error_rate, duplicate_rate=args.duplicate_rate)
+    print("🧪 Stand-in services running. Export these before starting the backend:\n")
+    for key, value in standin_environment(servers).items():
+        print(f"export {key}='{value}'")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        for server in servers.values():
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
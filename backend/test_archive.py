@@ -0,0 +1,28 @@
+import sqlite3
+
+import archive
+import near_dupes
+from archive import get_html_archive, reparse_archive
+from config import DB_FILE
+from fixtures import article_page
+from near_dupes import NearDuplicateIndex
+
+
+def test_reparse_keeps_stored_text_when_extraction_comes_back_empty(tmp_db, monkeypatch):
+    monkeypatch.setattr(archive, "_archive", None)
+    monkeypatch.setattr(near_dupes, "_near_duplicate_index", NearDuplicateIndex())
+    conn = sqlite3.connect(DB_FILE)
+    conn.executemany("INSERT INTO articles (id, url, full_text) VALUES (?, ?, ?)", [
+        ("good", "https://thehackernews.com/2025/11/good.html", "Old text."),
+        ("broken", "https://thehackernews.com/2025/11/broken.html", "Stored text worth keeping."),
+    ])
+    conn.commit()
+    get_html_archive().store("https://thehackernews.com/2025/11/good.html", article_page(1))
+    get_html_archive().store("https://thehackernews.com/2025/11/broken.html", b"<html><body></body></html>")
+
+    result = reparse_archive(workers=1)
+    assert (result["reparsed"], result["failed"]) == (1, 1)
+    texts = dict(conn.execute("SELECT id, full_text FROM articles").fetchall())
+    assert texts["broken"] == "Stored text worth keeping."
+    assert texts["good"].startswith("Threat actors exploited a zero-day vulnerability")
+    conn.close()
@@ -0,0 +1,22 @@
+import sqlite3
+
+from backfill_jobs import create_backfill_job, load_backfill_job
+from config import DB_FILE
+from database import init_db
+
+
+def test_analysis_mode_survives_a_reload(tmp_db):
+    job = create_backfill_job(10, "pages", analysis="batch")
+    reloaded = load_backfill_job(job.id)
+    assert reloaded.analysis == "batch"
+    assert reloaded.snapshot()["analysis"] == "batch"
+
+
+def test_jobs_from_before_the_column_resume_interactively(tmp_db):
+    job = create_backfill_job(10, "pages")
+    conn = sqlite3.connect(DB_FILE)
+    conn.execute("ALTER TABLE backfill_jobs DROP COLUMN analysis")
+    conn.commit()
+    conn.close()
+    init_db()
+    assert load_backfill_job(job.id).analysis == "interactive"
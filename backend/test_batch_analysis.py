@@ -0,0 +1,68 @@
+from datetime import datetime
+
+import pytest
+
+import llm_cache
+import llm_client
+from batch_analysis import apply_batch, prepare_batch_requests, submit_batch, wait_for_batch
+from database import get_db_connection
+from llm_cache import get_llm_cache
+from standins import StandinServer, openai_routes
+
+TEXT = ("Attackers exploited a zero-day vulnerability in a file transfer appliance to steal data from "
+        "hundreds of organizations. ") * 20
+
+
+@pytest.fixture
+def openai_standin(tmp_db, monkeypatch):
+    """A fresh LLM client and response cache pointed at the stand-in OpenAI server."""
+    server = StandinServer("openai", openai_routes)
+    monkeypatch.setattr(llm_client, "OPENAI_BASE_URL", server.start() + "/v1")
+    monkeypatch.setattr(llm_client, "_llm_client", None)
+    monkeypatch.setattr(llm_cache, "_llm_cache", None)
+    monkeypatch.setenv("STANDIN_BATCH_SECONDS", "0")
+    conn = get_db_connection()
+    for article_id in ("a", "b", "c"):
+        conn.execute("INSERT INTO articles (id, title, url, full_text, scraped_at) VALUES (?, ?, ?, ?, ?)",
+                     (article_id, f"Breach {article_id}", f"https://thehackernews.com/2025/11/{article_id}.html",
+                      f"{article_id.upper()} {TEXT}", datetime.now().isoformat()))
+    conn.commit()
+    conn.close()
+    yield server
+    server.stop()
+
+
+def run_batch(requests, keys):
+    batch_id = submit_batch(requests, keys)
+    assert wait_for_batch(batch_id, poll_seconds=0.05).status == "completed"
+    return batch_id, apply_batch(batch_id, run_id="test-run")
+
+
+def test_responses_are_cached_under_the_articles_keys(openai_standin):
+    requests, keys = prepare_batch_requests(10, article_ids=["a", "b"])
+    assert sorted(keys) == ["a", "b"]
+    batch_id, report = run_batch(requests, keys)
+
+    assert (report["applied"], report["failed"]) == (2, 0)
+    assert 0 < report["cost_usd"] < report["interactive_cost_usd"]
+    for key in keys.values():
+        entry, state = get_llm_cache().lookup(key)
+        assert state == "fresh" and entry["batch_id"] == batch_id and "content" in entry["result"]
+
+    conn = get_db_connection()
+    calls = conn.execute("SELECT article_id, run_id, batch FROM llm_calls ORDER BY article_id").fetchall()
+    applied_at = conn.execute("SELECT applied_at FROM analysis_batches WHERE id = ?", (batch_id,)).fetchone()[0]
+    conn.close()
+    assert [tuple(row) for row in calls] == [("a", "test-run", 1), ("b", "test-run", 1)]
+    assert applied_at is not None
+
+    # Cached responses are not requested again
+    assert sorted(prepare_batch_requests(10)[1]) == ["c"]
+
+
+def test_responses_without_a_known_key_count_as_failed(openai_standin):
+    requests, keys = prepare_batch_requests(10)
+    del keys["c"]
+    _, report = run_batch(requests, keys)
+    assert (report["applied"], report["failed"]) == (2, 1)
+    assert sorted(prepare_batch_requests(10)[1]) == ["c"]  # Left to the next batch or the per-article path
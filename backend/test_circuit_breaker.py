@@ -0,0 +1,77 @@
+import pytest
+
+import circuit_breaker
+from circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(circuit_breaker, "time", clock)
+    return clock
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("trends", failure_threshold=3, cooldown=60)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    breaker.record_success()  # Resets the count
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.snapshot()["rejected"] == 1
+
+
+def test_half_open_probe_closes_on_success(clock):
+    breaker = CircuitBreaker("trends", failure_threshold=1, cooldown=60)
+    breaker.record_failure()
+    clock.now += 59
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()  # The probe
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # Only one probe at a time
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_with_doubled_cooldown(clock, monkeypatch):
+    monkeypatch.setattr(circuit_breaker, "CIRCUIT_BREAKER_MAX_COOLDOWN", 200)
+    breaker = CircuitBreaker("trends", failure_threshold=1, cooldown=60)
+    breaker.record_failure()
+    for cooldown in (120, 200, 200):
+        clock.now += breaker.cooldown
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == OPEN and breaker.cooldown == cooldown
+    clock.now += 200
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.cooldown == 60
+
+
+def test_lost_probe_frees_its_slot_after_a_cooldown(clock):
+    breaker = CircuitBreaker("trends", failure_threshold=1, cooldown=60)
+    breaker.record_failure()
+    clock.now += 60
+    assert breaker.allow()
+    clock.now += 30
+    assert not breaker.allow()
+    clock.now += 30
+    assert breaker.allow()
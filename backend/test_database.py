@@ -0,0 +1,37 @@
+import sqlite3
+
+import seen_urls
+from config import DB_FILE
+from database import init_db
+
+
+def test_canonical_url_collisions_are_resolved_once(tmp_db, capsys):
+    conn = sqlite3.connect(DB_FILE)
+    conn.executemany("INSERT INTO articles (id, title, url) VALUES (?, ?, ?)", [
+        ("a", "Original", "https://thehackernews.com/2025/11/story.html"),
+        ("b", "Tracking copy", "https://thehackernews.com/2025/11/story.html?utm_source=feed"),
+        ("c", "Other", "https://thehackernews.com/2025/11/other.html"),
+    ])
+    conn.commit()
+    capsys.readouterr()
+
+    init_db()
+    assert "Indexed canonical URLs for 2 articles (1 URL copies linked)" in capsys.readouterr().out
+    rows = {row[0]: row[1:] for row in conn.execute("SELECT id, canonical_url, url_alias_of, duplicate_of FROM articles")}
+    assert rows["a"] == ("https://thehackernews.com/2025/11/story.html", None, None)
+    # A URL copy is not a near-duplicate: duplicate_of stays free for the SimHash link
+    assert rows["b"] == (None, "a", None)
+    assert rows["c"][1:] == (None, None)
+
+    init_db()
+    assert "Indexed canonical URLs" not in capsys.readouterr().out
+    conn.close()
+
+
+def test_url_added_during_a_filter_rebuild_stays_known(tmp_db, monkeypatch):
+    monkeypatch.setattr(seen_urls, "SEEN_URL_BLOOM_MIN_CAPACITY", 1)
+    index = seen_urls.SeenUrlIndex()
+    index.add("https://thehackernews.com/2025/11/first.html")
+    # Over capacity: the filter is rebuilt from the table before this row is committed
+    index.add("https://thehackernews.com/2025/11/second.html")
+    assert "https://thehackernews.com/2025/11/second.html" in index.bloom
@@ -0,0 +1,30 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from config import DB_FILE, OUTPUT_JSON
+
+
+def test_concurrent_exports_leave_one_complete_file(tmp_db):
+    from main import export_enriched_json
+
+    conn = sqlite3.connect(DB_FILE)
+    conn.executemany("INSERT INTO articles (id, title, url, full_text, analyzed_at) VALUES (?, ?, ?, ?, ?)", [
+        (str(n), f"Article {n}", f"https://thehackernews.com/2025/11/a{n}.html", "word " * 2000,
+         datetime.now().isoformat())
+        for n in range(50)
+    ])
+    conn.commit()
+    conn.close()
+
+    threads = [threading.Thread(target=export_enriched_json) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with open(OUTPUT_JSON, encoding="utf-8") as f:
+        assert json.load(f)["metadata"]["total_articles"] == 50
+    assert not [name for name in os.listdir(tmp_db) if name.startswith(f".{OUTPUT_JSON}.")]
@@ -0,0 +1,115 @@
+"""
+The lxml extractor must return exactly what the BeautifulSoup one does: on hand-written
+pages covering the template's edge cases (with the expected fields asserted), on
+generated fixture pages, and on the local HTML archive when there is one.
+"""
+import os
+
+import pytest
+
+from config import ARCHIVE_DB
+from fixtures import article_page
+from scraper import parse_article_details
+
+PAGES = {
+    # Nested inline and block markup, entities, dropped script/aside, site links that are not articles
+    "nested_entities": (b"""<html><head><title>Ivanti Flaw Exploited &amp; Patched</title>
+<meta property="og:image" content="https://example.com/img/ivanti.png"></head><body>
+<span class="author">Jan 09, 2026</span><span class="author">Ravie&nbsp;Lakshmanan</span>
+<span class="p-tags">Vulnerability / Zero-Day / </span>
+<div id="articlebody">
+<p>Attackers <b>chained <i>two</i> flaws</b> in Ivanti&#8217;s <a href="https://nvd.nist.gov/vuln/detail/CVE-2026-0001">CVE-2026-0001</a> &amp; a bypass.</p>
+<div class="note"><div><p>Versions &lt; 22.7 are affected.</p></div></div>
+<script>var tracking = "ignored";</script>
+<aside>Related: <a href="https://other.example.com/story">story</a></aside>
+<p>See <a href="https://thehackernews.com/search/label/Ivanti">more</a> and <a href="https://thehackernews.com/2025/12/ivanti-earlier.html">earlier</a> coverage.</p>
+</div></body></html>""", {
+        "full_text": "Attackers chained two flaws in Ivanti’s CVE-2026-0001 & a bypass. "
+                     "Versions < 22.7 are affected. See more and earlier coverage.",
+        "author": "Ravie\xa0Lakshmanan",
+        "tags": ["Vulnerability", "Zero-Day"],
+        "image_url": "https://example.com/img/ivanti.png",
+        "media_type": "image",
+        "sources": ["https://nvd.nist.gov/vuln/detail/CVE-2026-0001",
+                    "https://thehackernews.com/2025/12/ivanti-earlier.html"],
+    }),
+    # Only the date span: author from rel=author; post-body template; repeated domains and images skipped
+    "missing_author_span": (b"""<html><head><title>Botnet Takedown</title>
+<meta name="twitter:image" content="https://example.com/img/botnet.jpg"></head><body>
+<span class="author">Feb 02, 2026</span>
+<a rel="author" href="/p/author.html">Swati Khandelwal</a>
+<div class="post-body"><p>Police dismantled a botnet of 30,000 routers.</p>
+<a href="https://www.europol.europa.eu/news">Europol</a><a href="https://www.europol.europa.eu/other">again</a>
+<a href="/images/diagram.png">diagram</a></div></body></html>""", {
+        "full_text": "Police dismantled a botnet of 30,000 routers. Europol again diagram",
+        "author": "Swati Khandelwal",
+        "tags": [],
+        "image_url": "https://example.com/img/botnet.jpg",
+        "media_type": "image",
+        "sources": ["https://www.europol.europa.eu/news"],
+    }),
+    # No author spans at all: JSON-LD author; <article> body; YouTube embed as the media
+    "json_ld_author": (b"""<html><head><title>Phishing Kit</title>
+<script type="application/ld+json">{"@type": "NewsArticle", "author": {"name": " Jane Doe "}}</script></head><body>
+<article><p>A phishing kit targets Microsoft 365 users.</p>
+<iframe src="https://www.youtube.com/embed/dQw4w9WgXcQ"></iframe></article></body></html>""", {
+        "full_text": "A phishing kit targets Microsoft 365 users.",
+        "author": "Jane Doe",
+        "tags": [],
+        "image_url": "https://img.youtube.com/vi/dQw4w9WgXcQ/maxresdefault.jpg",
+        "media_type": "video",
+        "sources": [],
+    }),
+    # Several articlebody blocks: only the first is the article; too-short author span ignored
+    "multiple_articlebody": (b"""<html><head><title>Two Bodies</title></head><body>
+<span class="author">Mar 03, 2026</span><span class="author">Ab</span>
+<div id="articlebody"><p>First body with the ransomware story.</p><img data-src="https://example.com/first.gif"></div>
+<div id="articlebody"><p>Second body repeated by the template.</p></div>
+<div class="articlebody"><p>Third block.</p></div></body></html>""", {
+        "full_text": "First body with the ransomware story.",
+        "author": None,
+        "tags": [],
+        "image_url": "https://example.com/first.gif",
+        "media_type": "gif",
+        "sources": [],
+    }),
+    # No body container: the meta description stands in for the text
+    "no_body": (b"""<html><head><title>Only Meta</title>
+<meta name="description" content="Summary from the description tag."></head>
+<body><p>Loose paragraph outside any body container.</p></body></html>""", {
+        "full_text": "Summary from the description tag.",
+        "author": None,
+        "tags": [],
+        "image_url": None,
+        "media_type": "none",
+        "sources": [],
+    }),
+}
+
+
+def assert_parity(body: bytes):
+    expected = parse_article_details(body, engine="bs4")
+    actual = parse_article_details(body, engine="lxml")
+    assert actual == expected, [key for key in expected if expected[key] != actual.get(key)]
+    return actual
+
+
+@pytest.mark.parametrize("name", list(PAGES))
+def test_hand_written_pages(name):
+    body, expected = PAGES[name]
+    details = assert_parity(body)
+    details["sources"] = [source["url"] for source in details["sources"]]
+    assert {key: details[key] for key in expected} == expected
+
+
+@pytest.mark.parametrize("n", range(0, 200, 7))
+def test_generated_pages(n):
+    assert_parity(article_page(n, n % 60 + 1))
+
+
+@pytest.mark.skipif(not os.path.exists(ARCHIVE_DB), reason="no local HTML archive")
+def test_archived_pages():
+    from archive import get_html_archive
+
+    for url, body in get_html_archive().latest_pages(500):
+        assert parse_article_details(body, engine="lxml") == parse_article_details(body, engine="bs4"), url
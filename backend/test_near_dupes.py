@@ -0,0 +1,93 @@
+import random
+
+import numpy as np
+
+import near_dupes
+from config import NEAR_DUPLICATE_MAX_DISTANCE
+from database import get_db_connection
+from near_dupes import BANDS, BAND_BITS, NearDuplicateIndex, fingerprint_article, popcount, simhash
+
+
+def test_popcount_fallback_matches_bitwise_count(monkeypatch):
+    values = np.random.default_rng(0).integers(0, 2 ** 63, 500, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    expected = np.array([bin(int(v)).count("1") for v in values])
+    assert (popcount(values) == expected).all()
+    if hasattr(np, "bitwise_count"):
+        monkeypatch.delattr(near_dupes.np, "bitwise_count")
+    assert (popcount(values) == expected).all()
+
+
+def flip(fingerprint: int, bits) -> int:
+    for bit in bits:
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+
+def test_index_finds_every_fingerprint_at_the_max_distance(tmp_db):
+    rng = random.Random(3)
+    index = NearDuplicateIndex()
+    stored = [rng.getrandbits(64) for _ in range(5000)]
+    for n, fingerprint in enumerate(stored):
+        index.add(f"article-{n}", fingerprint)
+    with index.lock:
+        index._rebuild_buckets()
+    index.add("tail-article", stored[0] ^ (1 << 63) ^ 1)  # Scanned linearly until the next rebuild
+    # Flips spread as evenly as possible over the bands are the hardest case for the probes
+    spread = [band * BAND_BITS + offset for offset in range(BAND_BITS) for band in range(BANDS)]
+    for n in range(1, 300):
+        bits = spread[:NEAR_DUPLICATE_MAX_DISTANCE] if n % 2 else rng.sample(range(64), NEAR_DUPLICATE_MAX_DISTANCE)
+        assert index.find(flip(stored[n], bits)) == (f"article-{n}", NEAR_DUPLICATE_MAX_DISTANCE)
+        assert index.find(flip(stored[n], spread[:NEAR_DUPLICATE_MAX_DISTANCE + 1])) is None
+    assert index.find(stored[0] ^ (1 << 63)) in {("article-0", 1), ("tail-article", 1)}
+
+
+def test_edited_copies_fingerprint_close_and_unrelated_text_far():
+    rng = random.Random(5)
+    words = [rng.choice(["ransomware", "cloud", "patch", "botnet", "exploit", "firmware", "breach", "loader"])
+             for _ in range(600)]
+    text = " ".join(words)
+    edited = words[:]
+    for i in rng.sample(range(len(words)), 3):
+        edited[i] = "advisory"
+    other = " ".join(rng.sample(words, len(words)))
+    distance = lambda a, b: bin(simhash(a) ^ simhash(b)).count("1")
+    assert distance(text, " ".join(edited) + " Found this article interesting?") <= NEAR_DUPLICATE_MAX_DISTANCE
+    assert distance(text, other) > NEAR_DUPLICATE_MAX_DISTANCE
+
+
+def test_removed_fingerprints_never_match(tmp_db):
+    index = NearDuplicateIndex()
+    index.add("kept", 0)
+    index.add("replaced", (1 << 64) - 1)
+    index.add("replaced", 0xFFFF)  # A rescrape replaces the fingerprint
+    assert index.find((1 << 64) - 1) is None
+    assert index.find(0xFFFF) == ("replaced", 0)
+    index.remove("kept")
+    with index.lock:
+        index._rebuild_buckets()
+    assert index.find(0) is None
+    assert index.get_stats()["indexed"] == 1
+
+
+def article_text(seed: int) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(["ransomware", "cloud", "patch", "botnet", "exploit", "firmware", "breach", "loader"])
+                    for _ in range(600))
+
+
+def test_fingerprint_article_links_only_to_canonical_rows(tmp_db, monkeypatch):
+    monkeypatch.setattr(near_dupes, "_near_duplicate_index", NearDuplicateIndex())
+    conn = get_db_connection()
+    c = conn.cursor()
+    c.executemany("INSERT INTO articles (id, full_text) VALUES (?, ?)", [(name, "") for name in "abcd"])
+    assert fingerprint_article(c, "a", article_text(1)) is None
+
+    # Reparsed with new text: the old fingerprint no longer matches
+    fingerprint_article(c, "a", article_text(2))
+    assert fingerprint_article(c, "b", article_text(1)) is None
+    assert fingerprint_article(c, "c", article_text(2) + " Updated.") == "a"
+
+    # "b" is marked a near-duplicate elsewhere after it was indexed: never chosen as canonical
+    c.execute("UPDATE articles SET duplicate_of = 'a' WHERE id = 'b'")
+    assert fingerprint_article(c, "d", article_text(1) + " Updated.") is None
+    conn.close()
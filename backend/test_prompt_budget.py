@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from prompt_budget import GAP_MARKER, count_tokens, fit_article
+
+FILLER = "Analysts said the campaign remains under investigation and more details are expected soon."
+KEYWORDS = [{"keyword": "Citrix"}, {"keyword": "ransomware"}]
+
+
+def article(paragraphs: int = 60) -> str:
+    rng = random.Random(11)
+    body = ["Attackers exploited a Citrix NetScaler flaw to deploy ransomware on hospital networks."]
+    for n in range(paragraphs):
+        sentences = [FILLER] * rng.randint(2, 4)
+        if n == 30:
+            sentences = ["The flaw, CVE-2025-12345, affects versions 13.1 and 14.1 and cost victims $4.5 million."]
+        if n == 40:
+            sentences.append("Found this article interesting? Follow us on Twitter to read more exclusive content.")
+        body.append(" ".join(sentences))
+    body.append("Citrix urged customers to patch immediately and rotate credentials.")
+    return "\n\n".join(body)
+
+
+@pytest.mark.parametrize("max_tokens", [60, 150, 400, 1000])
+def test_fitted_content_stays_within_the_budget(max_tokens):
+    content = fit_article("Citrix Flaw Exploited in Ransomware Attacks", KEYWORDS, article(), max_tokens)
+    assert 0 < count_tokens(content) <= max_tokens
+
+
+def test_lead_conclusion_and_specific_passages_are_kept():
+    content = fit_article("Citrix Flaw Exploited in Ransomware Attacks", KEYWORDS, article(), 150)
+    assert content.startswith("Attackers exploited a Citrix NetScaler flaw")
+    assert content.endswith("rotate credentials.")
+    assert "CVE-2025-12345" in content
+    assert GAP_MARKER.strip() in content
+    assert "Follow us on Twitter" not in content
+
+
+def test_short_articles_are_kept_whole_minus_boilerplate():
+    text = ("Okta disclosed a breach of its support system.\n\n"
+            "Found this article interesting? Follow us on LinkedIn.\n\n"
+            "Customers were told to review their logs.")
+    content = fit_article("Okta Breach", [], text, 500)
+    assert content == "Okta disclosed a breach of its support system. Customers were told to review their logs."
+
+
+def test_one_passage_over_the_budget_is_truncated():
+    content = fit_article("", [], "word " * 2000, 50)
+    assert 0 < count_tokens(content) <= 50
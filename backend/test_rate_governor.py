@@ -0,0 +1,61 @@
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from threading import Thread
+from types import SimpleNamespace
+
+import pytest
+
+import http_client
+from rate_governor import RateGovernor, TokenBucket
+
+LIMITS = {"rate": 1.0, "burst": 100, "min_rate": 0.1, "max_rate": 5.0, "target_latency": 5.0}
+
+
+def test_error_responses_hold_the_rate():
+    bucket = TokenBucket("site", **LIMITS)
+    bucket.record(latency=0.01, error=True)
+    assert bucket.rate == 1.0
+    bucket.record(latency=0.01)
+    assert bucket.rate > 1.0
+    bucket.record(latency=0.01, throttled=True)
+    assert bucket.rate < 1.0
+
+
+@pytest.fixture
+def flaky_server():
+    """Answers each path's first request with the status in the path and Retry-After: 7, then 200."""
+    seen = set()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status = 200 if self.path in seen else int(self.path.strip("/"))
+            seen.add(self.path)
+            self.send_response(status)
+            if status != 200:
+                self.send_header("Retry-After", "7")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+@pytest.mark.parametrize("status, slept", [(502, [7]), (429, [])])
+def test_retry_after_is_honoured_unless_the_bucket_pauses(flaky_server, monkeypatch, status, slept):
+    governor = RateGovernor()
+    governor.register("site", LIMITS, ["127.0.0.1"])
+    sleeps = []
+    monkeypatch.setattr(http_client, "get_rate_governor", lambda: governor)
+    monkeypatch.setattr(http_client, "time", SimpleNamespace(perf_counter=time.perf_counter, sleep=sleeps.append))
+    monkeypatch.setattr(governor.bucket("site"), "acquire", lambda: 0.0)
+
+    response = http_client.get(f"{flaky_server}/{status}")
+    assert response.status_code == 200
+    # A 502 does not pause the bucket, so the client itself waits out Retry-After
+    assert sleeps == slept
+    assert (governor.bucket("site").paused_until > 0) == (status == 429)
@@ -0,0 +1,29 @@
+import pytest
+
+from config import SCRAPE_RETRY_MAX_ATTEMPTS
+from database import get_db_connection
+from scrape_retries import ScrapeError, http_error_class, record_scrape_failure
+
+
+def fail(article_id: str, error_class: str):
+    conn = get_db_connection()
+    outcome = record_scrape_failure(conn, article_id, f"https://example.com/{article_id}", ScrapeError(error_class))
+    conn.commit()
+    conn.close()
+    return outcome
+
+
+@pytest.mark.parametrize("status", [404, 410])
+def test_client_errors_are_dead_lettered_on_the_first_failure(tmp_db, status):
+    outcome = fail("gone", http_error_class(status))
+    assert outcome == {"status": "dead", "attempts": 1, "next_retry_at": None}
+
+
+@pytest.mark.parametrize("error_class", [http_error_class(403), http_error_class(408), http_error_class(429),
+                                         http_error_class(503), "timeout", "connection"])
+def test_transient_errors_are_retried_until_the_attempt_limit(tmp_db, error_class):
+    for attempt in range(1, SCRAPE_RETRY_MAX_ATTEMPTS):
+        outcome = fail("flaky", error_class)
+        assert outcome["status"] == "pending" and outcome["attempts"] == attempt
+        assert outcome["next_retry_at"] is not None
+    assert fail("flaky", error_class)["status"] == "dead"
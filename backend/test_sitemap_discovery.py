@@ -0,0 +1,72 @@
+import sqlite3
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+import scraper  # Registers The Hacker News source
+from config import DB_FILE
+from extractor import extract_page_published
+from fixtures import article_page
+from sources import is_article_url
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://thehackernews.com/2025/11/ransomware-hits-cloud.html", True),
+    ("https://thehackernews.com/search/label/Malware", False),
+    ("https://thehackernews.com/p/about-us.html", False),
+    ("https://thehackernews.com/2025/11/", False),
+    ("https://example.com/2025/11/ransomware-hits-cloud.html", False),
+])
+def test_only_article_pages_are_backfilled(url, expected):
+    assert is_article_url(url) is expected
+
+
+def test_published_comes_from_the_page():
+    assert extract_page_published(article_page(1)) == "Nov 28, 2025"
+    meta = b'<html><head><meta property="article:published_time" content="2024-02-09T08:30:00Z"></head></html>'
+    assert extract_page_published(meta) == "Feb 09, 2024"
+    assert extract_page_published(b"<html><body><span class='author'>Jane Doe</span></body></html>") is None
+
+
+def test_lastmod_only_bounds_since(monkeypatch):
+    import sitemap
+
+    urls = [
+        # Published in range, edited long after `until`: must stay a candidate
+        {"loc": "https://thehackernews.com/2025/03/edited-later.html", "lastmod": "2025-12-01T10:00:00Z"},
+        {"loc": "https://thehackernews.com/2025/03/in-range.html", "lastmod": "2025-03-10T10:00:00Z"},
+        {"loc": "https://thehackernews.com/2024/12/too-old.html", "lastmod": "2024-12-20T10:00:00Z"},
+        {"loc": "https://thehackernews.com/2025/03/undated.html", "lastmod": None},
+    ]
+    monkeypatch.setattr(sitemap, "_fetch_parsed", lambda url, version, parser: {"sitemaps": [], "urls": urls})
+    entries, _ = sitemap.discover_backfill_urls(datetime(2025, 3, 1), sitemap_url="https://sitemap", feed_urls=[])
+    assert [entry["url"].rsplit("/", 1)[-1] for entry in entries] == ["edited-later.html", "in-range.html",
+                                                                      "undated.html"]
+
+
+def test_parse_stage_applies_the_exact_range(tmp_db, monkeypatch):
+    from pipeline import build_article_pipeline
+
+    pages = {
+        "https://thehackernews.com/2025/03/in-range.html": article_page(1).replace(b"Nov 28, 2025", b"Mar 10, 2025"),
+        "https://thehackernews.com/2025/03/edited-later.html": article_page(2).replace(b"Nov 28, 2025", b"Mar 31, 2025"),
+        "https://thehackernews.com/2025/04/after-until.html": article_page(3).replace(b"Nov 28, 2025", b"Apr 01, 2025"),
+        "https://thehackernews.com/2025/02/before-since.html": article_page(4).replace(b"Nov 28, 2025", b"Feb 28, 2025"),
+    }
+    monkeypatch.setattr(scraper, "fetch_article_page", lambda url: SimpleNamespace(content=pages[url], parsed=None))
+    dropped = []
+    pipeline = build_article_pipeline("test", is_new=False, analyze=False,
+                                      published_range=(datetime(2025, 3, 1), datetime(2025, 3, 31, 23, 59)),
+                                      on_out_of_range=lambda entry: dropped.append(entry["url"]))
+    for url in pages:
+        pipeline.put({"url": url, "title": None, "published": None, "thumbnail": None})
+    pipeline.close()
+
+    conn = sqlite3.connect(DB_FILE)
+    stored = dict(conn.execute("SELECT url, published FROM articles").fetchall())
+    conn.close()
+    assert stored == {"https://thehackernews.com/2025/03/in-range.html": "Mar 10, 2025",
+                      "https://thehackernews.com/2025/03/edited-later.html": "Mar 31, 2025"}
+    assert sorted(dropped) == ["https://thehackernews.com/2025/02/before-since.html",
+                               "https://thehackernews.com/2025/04/after-until.html"]
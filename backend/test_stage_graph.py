@@ -0,0 +1,89 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+
+import pytest
+
+from stage_graph import StageGraph
+
+request_id: ContextVar[str] = ContextVar("request_id", default=None)
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        yield pool
+
+
+def test_steps_run_after_their_dependencies_with_their_results(executor):
+    order = []
+    lock = threading.Lock()
+
+    def step(name, value):
+        def run(results):
+            with lock:
+                order.append(name)
+            return value(results)
+        return run
+
+    graph = StageGraph()
+    graph.add("details", step("details", lambda r: "text"))
+    graph.add("keywords", step("keywords", lambda r: r["details"].upper()), after=("details",))
+    graph.add("market", step("market", lambda r: 1))
+    graph.add("analysis", step("analysis", lambda r: (r["keywords"], r["market"])), after=("keywords", "market"))
+    results, timings = graph.run(executor)
+
+    assert results == {"details": "text", "keywords": "TEXT", "market": 1, "analysis": ("TEXT", 1)}
+    assert order.index("details") < order.index("keywords") < order.index("analysis")
+    assert order.index("market") < order.index("analysis")
+    assert set(timings) == set(results)
+    assert timings["analysis"]["start"] >= timings["keywords"]["start"] + timings["keywords"]["seconds"] - 0.001
+
+
+def test_independent_steps_overlap(executor):
+    graph = StageGraph()
+    for name in ("trends", "market", "geo"):
+        graph.add(name, lambda r: time.sleep(0.2))
+    start = time.perf_counter()
+    graph.run(executor)
+    assert time.perf_counter() - start < 0.5
+
+
+def test_unknown_dependency_is_rejected():
+    graph = StageGraph()
+    with pytest.raises(ValueError, match="unknown stages"):
+        graph.add("analysis", lambda r: None, after=("details",))
+
+
+def test_first_error_is_raised_and_dependents_never_start(executor):
+    started = []
+
+    def slow(results):
+        time.sleep(0.2)
+        started.append("slow")
+        return "done"
+
+    def fail(results):
+        raise RuntimeError("scrape failed")
+
+    graph = StageGraph()
+    graph.add("slow", slow)
+    graph.add("details", fail)
+    graph.add("analysis", lambda r: started.append("analysis"), after=("details",))
+    graph.add("after_slow", lambda r: started.append("after_slow"), after=("slow",))
+    with pytest.raises(RuntimeError, match="scrape failed"):
+        graph.run(executor)
+    # The running step finished before the error was raised; nothing was started after it
+    assert started == ["slow"]
+
+
+def test_steps_see_the_callers_context(executor):
+    graph = StageGraph()
+    graph.add("read", lambda r: request_id.get())
+    token = request_id.set("article-1")
+    try:
+        results, _ = graph.run(executor)
+    finally:
+        request_id.reset(token)
+    assert results["read"] == "article-1"
@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+
+import config
+from rate_governor import get_rate_governor
+from standins import StubTrendReq
+from trends_broker import TrendsBroker
+
+TIMEFRAME = "today 6-m"
+
+
+@pytest.fixture(autouse=True)
+def stub_trends(monkeypatch):
+    monkeypatch.setattr(config, "TRENDS_CLIENT", "stub")
+    monkeypatch.setattr(config, "pytrends", None)
+    bucket = get_rate_governor().bucket("google_trends")
+    monkeypatch.setattr(bucket, "rate", 1000.0)
+    monkeypatch.setattr(bucket, "tokens", 1000.0)
+
+
+def alone(keyword: str):
+    """The keyword's series as Google reports it when queried on its own (peak = 100)."""
+    pt = StubTrendReq()
+    pt.build_payload([keyword], timeframe=TIMEFRAME)
+    return pt.interest_over_time()[keyword].astype(float)
+
+
+def packed(article_keywords, other_articles):
+    """interest_over_time of one article's keywords, packed with other articles' keywords."""
+    broker = TrendsBroker(window=0.3)
+    others = [threading.Thread(target=broker.interest_over_time, args=(keywords, TIMEFRAME))
+              for keywords in other_articles]
+    for thread in others:
+        thread.start()
+    interest_df, _ = broker.interest_over_time(article_keywords, TIMEFRAME)
+    for thread in others:
+        thread.join()
+    return interest_df, broker
+
+
+@pytest.mark.parametrize("companions", [
+    [],
+    [["Microsoft"]],                   # A keyword far bigger than the anchor and "Botnet"
+    [["Google", "Ransomware"], ["Okta"]],
+])
+def test_keyword_series_does_not_depend_on_its_pack(companions):
+    interest_df, broker = packed(["Botnet"], companions)
+    assert broker.get_stats()["payloads"] >= 1
+    expected = alone("Botnet")
+    # Same series up to Google's integer rounding
+    assert (interest_df["Botnet"] - expected).abs().max() <= 2
+
+
+def test_article_keywords_keep_their_relative_volumes():
+    interest_df, _ = packed(["Botnet", "Cybersecurity"], [["Microsoft", "Google"]])
+    pt = StubTrendReq()
+    pt.build_payload(["Botnet", "Cybersecurity"], timeframe=TIMEFRAME)
+    together = pt.interest_over_time()
+    assert interest_df.max().max() == pytest.approx(100)
+    for keyword in ("Botnet", "Cybersecurity"):
+        assert (interest_df[keyword] - together[keyword]).abs().max() <= 2
+
+
+def test_region_lookups_are_not_packed():
+    broker = TrendsBroker(window=0.3)
+    threads = [threading.Thread(target=broker.trending_regions, args=(kw,)) for kw in ("Botnet", "Okta")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert broker.get_stats()["payloads"] == 2
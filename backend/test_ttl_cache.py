@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+
+import ttl_cache
+from ttl_cache import PersistentTTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ttl_cache.time, "time", clock.time)
+    return clock
+
+
+def make_cache(tmp_path, **kwargs):
+    return PersistentTTLCache(str(tmp_path / "cache.db"), "entries", **kwargs)
+
+
+def test_concurrent_misses_compute_once(tmp_path):
+    cache = make_cache(tmp_path, ttl=60)
+    calls = []
+    barrier = threading.Barrier(8)
+    results = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"score": 42}
+
+    def worker():
+        barrier.wait()
+        results.append(cache.get_or_compute("microsoft", compute))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(state for _, state in results) == ["computed"] + ["fresh"] * 7
+    assert all(value == {"score": 42} for value, _ in results)
+    stats = cache.get_stats()
+    assert (stats["misses"], stats["coalesced"]) == (1, 7)
+
+
+def test_expired_entries_are_served_stale_then_recomputed(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl=60, stale_seconds=60)
+    cache.get_or_compute("k", lambda: 1)
+    clock.now += 90
+    refreshed = threading.Event()
+
+    def refresh():
+        refreshed.set()
+        return 2
+
+    assert cache.get_or_compute("k", refresh) == (1, "stale")
+    assert refreshed.wait(2)
+    for _ in range(100):
+        if cache.get_stats()["refreshing"] == 0:
+            break
+        time.sleep(0.01)
+    assert cache.lookup("k") == (2, "fresh")
+
+    clock.now += 200
+    assert cache.lookup("k") == (None, None)
+    assert cache.get_or_compute("k", lambda: 3) == (3, "computed")
+
+
+def test_eviction_drops_expired_entries_then_least_recently_used(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl=60, max_entries=3)
+    cache.store("expired", 0)
+    clock.now += 100
+    cache.store("a", 1)
+    clock.now += 1
+    cache.store("b", 2)
+    clock.now += 1
+    cache.store("c", 3)  # Over the limit: the expired entry goes first
+    assert cache.lookup("expired") == (None, None)
+    assert cache.get_stats()["entries"] == 3
+
+    clock.now += 1
+    cache.lookup("a")  # "b" is now the least recently used
+    clock.now += 1
+    cache.store("d", 4)
+    assert [cache.lookup(key)[0] for key in ("a", "b", "c", "d")] == [1, None, 3, 4]
+    stats = cache.get_stats()
+    assert (stats["entries"], stats["evictions"]) == (3, 2)
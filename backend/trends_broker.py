@@ -0,0 +1,267 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import List, Dict, Any, Tuple
+
+import pandas as pd
+
+from config import (
+    TRENDS_BATCH_SIZE, TRENDS_BATCH_WINDOW, TRENDS_KEYWORD_TTL, TRENDS_KEYWORD_MEMO_MAX,
+    TRENDS_REQUEST_TIMEOUT, TRENDS_ANCHOR_KEYWORD, TRENDS_ANCHOR_MIN_MEAN, get_pytrends
+)
+from rate_governor import get_rate_governor
+from circuit_breaker import get_circuit_breaker, CircuitOpenError
+
+REGION_TIMEFRAME = "now 7-d"
+
+
+def is_blocked(error: Exception) -> bool:
+    """Google Trends answers rate limiting with 429 (and sometimes 400)."""
+    message = str(error)
+    return "400" in message or "429" in message or "rate limit" in message.lower()
+
+
+class TrendsBroker:
+    """
+    Sole user of the (stateful, not thread-safe) pytrends client.
+
+    Analyses ask for per-keyword data; identical keywords already queued, in flight or
+    fetched within TRENDS_KEYWORD_TTL share one result, and keywords from different
+    articles are packed TRENDS_BATCH_SIZE to a build_payload by a single worker thread.
+    Google scales each payload to its own maximum, so every interest payload also carries
+    TRENDS_ANCHOR_KEYWORD and series are kept relative to it (100 = the anchor's average),
+    which makes them independent of the pack. Region lookups are not packed.
+    """
+
+    def __init__(self, batch_size: int = TRENDS_BATCH_SIZE, window: float = TRENDS_BATCH_WINDOW,
+                 keyword_ttl: float = TRENDS_KEYWORD_TTL, memo_max: int = TRENDS_KEYWORD_MEMO_MAX):
+        self.batch_size = batch_size
+        self.window = window
+        self.keyword_ttl = keyword_ttl
+        self.memo_max = memo_max
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.pending: Dict[Tuple[str, str], List[str]] = {}      # (kind, timeframe) -> queued keywords
+        self.first_queued: Dict[Tuple[str, str], float] = {}
+        self.futures: Dict[Tuple[str, str, str], Future] = {}    # Queued or in flight, by (kind, timeframe, keyword)
+        self.memo: "OrderedDict[Tuple[str, str, str], Tuple[float, Any]]" = OrderedDict()
+        self.worker = None
+        self.stats = {
+            "keyword_requests": 0,  # Keywords asked for by analyses
+            "memo_hits": 0,         # Answered from a recent result
+            "coalesced": 0,         # Joined a queued or in-flight request
+            "keywords_fetched": 0,
+            "payloads": 0,          # build_payload calls
+            "api_calls": 0,         # All pytrends round trips
+            "failed_payloads": 0,
+            "rejected": 0           # Refused while the google_trends circuit was open
+        }
+
+    # --- public API ---
+
+    def interest_over_time(self, keywords: List[str], timeframe: str) -> Tuple[pd.DataFrame, Dict[str, List[Dict]]]:
+        """
+        Interest over time of each keyword (one column each) and the rising related queries
+        of each keyword. The columns share one scale with the largest value at 100, as if
+        the keywords had been queried together. Raises the pack's error if Trends failed.
+        """
+        results = self._request("interest", timeframe, keywords)
+        series = {kw: data["series"] for kw, data in results.items() if data and data["series"] is not None}
+        related = {kw: data["related_queries"] for kw, data in results.items() if data}
+        interest_df = pd.DataFrame(series)
+        peak = interest_df.max().max() if not interest_df.empty else 0
+        if peak > 0:
+            interest_df = interest_df * (100.0 / peak)
+        return interest_df, related
+
+    def trending_regions(self, keyword: str) -> List[Dict[str, Any]]:
+        """Top countries by interest in the keyword over the last 7 days."""
+        return self._request("region", REGION_TIMEFRAME, [keyword])[keyword] or []
+
+    # --- queueing ---
+
+    def _request(self, kind: str, timeframe: str, keywords: List[str]) -> Dict[str, Any]:
+        now = time.time()
+        futures = {}
+        breaker = get_circuit_breaker("google_trends")
+        with self.lock:
+            # Refuse up front when new keywords would have to be fetched from an unhealthy Trends
+            if any(self._needs_fetch((kind, timeframe, kw.lower()), now) for kw in keywords) and not breaker.allow():
+                self.stats["rejected"] += 1
+                raise CircuitOpenError("Google Trends circuit is open")
+            for kw in dict.fromkeys(keywords):
+                key = (kind, timeframe, kw.lower())
+                self.stats["keyword_requests"] += 1
+                memo = self.memo.get(key)
+                if memo and now - memo[0] < self.keyword_ttl:
+                    self.memo.move_to_end(key)
+                    self.stats["memo_hits"] += 1
+                    futures[kw] = Future()
+                    futures[kw].set_result(memo[1])
+                    continue
+                future = self.futures.get(key)
+                if future is not None:
+                    self.stats["coalesced"] += 1
+                else:
+                    future = self.futures[key] = Future()
+                    group = (kind, timeframe)
+                    if group not in self.pending:
+                        self.pending[group] = []
+                        self.first_queued[group] = now
+                    self.pending[group].append(kw)
+                futures[kw] = future
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._run, daemon=True, name="trends-broker")
+                self.worker.start()
+            self.wakeup.notify()
+        return {kw: future.result(timeout=TRENDS_REQUEST_TIMEOUT) for kw, future in futures.items()}
+
+    def _needs_fetch(self, key: Tuple[str, str, str], now: float) -> bool:
+        memo = self.memo.get(key)
+        return key not in self.futures and not (memo and now - memo[0] < self.keyword_ttl)
+
+    def _run(self):
+        while True:
+            with self.lock:
+                while not self.pending:
+                    self.wakeup.wait()
+                # Oldest group first; wait out its batching window unless the pack fills up
+                group = min(self.pending, key=self.first_queued.get)
+                batch_size = self.batch_size if group[0] == "interest" else 1
+                deadline = self.first_queued[group] + self.window
+                while len(self.pending[group]) < batch_size and time.time() < deadline:
+                    self.wakeup.wait(deadline - time.time())
+                keywords = self.pending[group][:batch_size]
+                rest = self.pending[group][batch_size:]
+                if rest:
+                    self.pending[group] = rest
+                else:
+                    del self.pending[group]
+                    del self.first_queued[group]
+            self._run_pack(group[0], group[1], keywords)
+
+    def _run_pack(self, kind: str, timeframe: str, keywords: List[str]):
+        try:
+            if kind == "interest":
+                values = self._fetch_interest(keywords, timeframe)
+            else:
+                values = self._fetch_regions(keywords, timeframe)
+        except Exception as e:
+            if is_blocked(e):
+                get_rate_governor().record("google_trends", throttled=True)
+            get_circuit_breaker("google_trends").record_failure()
+            with self.lock:
+                self.stats["failed_payloads"] += 1
+                futures = [self.futures.pop((kind, timeframe, kw.lower())) for kw in keywords]
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        get_circuit_breaker("google_trends").record_success()
+        now = time.time()
+        with self.lock:
+            self.stats["keywords_fetched"] += len(keywords)
+            futures = []
+            for kw in keywords:
+                key = (kind, timeframe, kw.lower())
+                self.memo[key] = (now, values.get(kw))
+                self.memo.move_to_end(key)
+                futures.append((self.futures.pop(key), values.get(kw)))
+            while len(self.memo) > self.memo_max:
+                self.memo.popitem(last=False)
+        for future, value in futures:
+            future.set_result(value)
+
+    # --- pytrends round trips (worker thread only) ---
+
+    def _call(self, method, *args, **kwargs):
+        governor = get_rate_governor()
+        governor.acquire("google_trends")
+        start = time.perf_counter()
+        value = method(*args, **kwargs)
+        governor.record("google_trends", latency=time.perf_counter() - start)
+        with self.lock:
+            self.stats["api_calls"] += 1
+        return value
+
+    def _build_payload(self, keywords: List[str], timeframe: str):
+        pt = get_pytrends()
+        self._call(pt.build_payload, keywords, cat=0, timeframe=timeframe, geo='', gprop='')
+        with self.lock:
+            self.stats["payloads"] += 1
+        return pt
+
+    def _fetch_interest(self, keywords: List[str], timeframe: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Series of each keyword relative to the anchor keyword (100 = the anchor's mean over
+        the timeframe). When a keyword dwarfs the anchor, the pack's other keywords are
+        rounded to almost nothing, so they are queried again without it.
+        """
+        anchor = next((kw for kw in keywords if kw.lower() == TRENDS_ANCHOR_KEYWORD.lower()), TRENDS_ANCHOR_KEYWORD)
+        payload = keywords if anchor in keywords else keywords + [anchor]
+        pt = self._build_payload(payload, timeframe)
+        interest_df = self._call(pt.interest_over_time)
+        anchor_mean = float(interest_df[anchor].mean()) if anchor in interest_df.columns else 0.0
+
+        related = {}
+        try:
+            queries = self._call(pt.related_queries)
+            for kw in keywords:
+                rising = queries.get(kw, {}).get('rising')
+                if rising is not None and not rising.empty:
+                    related[kw] = [{"query": row['query'], "growth": str(row.get('value', 'N/A'))}
+                                   for _, row in rising.head(5).iterrows()]
+        except Exception:
+            pass  # Related queries are optional
+
+        requery = []
+        if anchor_mean < TRENDS_ANCHOR_MIN_MEAN and len(keywords) > 1:
+            means = {kw: interest_df[kw].mean() for kw in keywords if kw in interest_df.columns}
+            top = max(means, key=means.get) if means else None
+            requery = [kw for kw in keywords if kw != top]
+
+        # A zero anchor mean only happens next to a huge keyword; 0.5 is the most it can have been rounded from
+        scale = 100.0 / max(anchor_mean, 0.5)
+        values = {kw: {
+            "series": interest_df[kw].astype(float) * scale if kw in interest_df.columns else None,
+            "related_queries": related.get(kw, [])
+        } for kw in keywords if kw not in requery}
+        if requery:
+            values.update(self._fetch_interest(requery, timeframe))
+        return values
+
+    def _fetch_regions(self, keywords: List[str], timeframe: str) -> Dict[str, List[Dict[str, Any]]]:
+        pt = self._build_payload(keywords, timeframe)
+        regions = self._call(pt.interest_by_region, resolution='COUNTRY')
+        values = {}
+        for kw in keywords:
+            if regions.empty or kw not in regions.columns:
+                continue
+            values[kw] = [{"country": country, "interest": int(score)}
+                          for country, score in regions[kw].nlargest(5).items() if score > 0]
+        return values
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = dict(self.stats)
+            stats["queued"] = sum(len(keywords) for keywords in self.pending.values())
+            stats["in_flight"] = len(self.futures) - stats["queued"]
+            stats["memo_entries"] = len(self.memo)
+        served = stats["memo_hits"] + stats["coalesced"]
+        stats["shared_rate"] = round(served / stats["keyword_requests"], 3) if stats["keyword_requests"] else 0
+        stats["keywords_per_payload"] = round(stats["keywords_fetched"] / stats["payloads"], 2) if stats["payloads"] else 0
+        return stats
+
+
+_trends_broker = None
+_trends_broker_lock = threading.Lock()
+
+
+def get_trends_broker() -> TrendsBroker:
+    """Lazy initialization of the process-wide trends broker."""
+    global _trends_broker
+    with _trends_broker_lock:
+        if _trends_broker is None:
+            _trends_broker = TrendsBroker()
+    return _trends_broker
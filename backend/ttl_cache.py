@@ -0,0 +1,190 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class PersistentTTLCache:
+    """
+    JSON values in a SQLite table with a freshness TTL, a stale window and LRU eviction.
+
+    Within `ttl` an entry is fresh; for `stale_seconds` after that it is still served
+    while one background refresh recomputes it (stale-while-revalidate). Computations
+    are serialized per key, so concurrent callers missing the same key compute it once.
+    """
+
+    def __init__(self, db_file: str, table: str, ttl: float, stale_seconds: float = 0,
+                 max_entries: int = 10000):
+        self.table = table
+        self.ttl = ttl
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                key TEXT PRIMARY KEY,
+                value TEXT,
+                stored_at REAL,
+                last_access REAL
+            )
+        ''')
+        self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_access ON {table}(last_access)")
+        self.conn.commit()
+        self.entries = self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        # Per-key locks: key -> [lock, holders]; dropped when the last holder releases
+        self.key_locks: Dict[str, list] = {}
+        self.refreshing = set()
+        self.stats = {
+            "hits": 0,          # Fresh entry served
+            "stale_hits": 0,    # Expired entry served while refreshing in the background
+            "misses": 0,        # Computed in the caller's thread
+            "coalesced": 0,     # Waited on another thread's computation of the same key
+            "refreshes": 0,
+            "refresh_errors": 0,
+            "evictions": 0
+        }
+
+    # --- storage ---
+
+    def lookup(self, key: str) -> Tuple[Optional[Any], Optional[str]]:
+        """(value, "fresh" | "stale") for a usable entry, (None, None) otherwise."""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(f"SELECT value, stored_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if not row:
+                return None, None
+            age = now - row[1]
+            if age >= self.ttl + self.stale_seconds:
+                return None, None
+            self.conn.execute(f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+        return json.loads(row[0]), "fresh" if age < self.ttl else "stale"
+
+    def store(self, key: str, value: Any):
+        now = time.time()
+        with self.lock:
+            cursor = self.conn.execute(
+                f"UPDATE {self.table} SET value = ?, stored_at = ?, last_access = ? WHERE key = ?",
+                (json.dumps(value), now, now, key)
+            )
+            if cursor.rowcount == 0:
+                self.conn.execute(
+                    f"INSERT INTO {self.table} (key, value, stored_at, last_access) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), now, now)
+                )
+                self.entries += 1
+                self._evict()
+            self.conn.commit()
+
+    def invalidate(self, key: str):
+        with self.lock:
+            if self.conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,)).rowcount:
+                self.entries -= 1
+            self.conn.commit()
+
+    def _evict(self):
+        """Drop least recently used entries beyond max_entries, expired ones first (lock held)."""
+        if self.entries <= self.max_entries:
+            return
+        expired = self.conn.execute(
+            f"DELETE FROM {self.table} WHERE stored_at < ?",
+            (time.time() - self.ttl - self.stale_seconds,)
+        ).rowcount
+        excess = self.entries - expired - self.max_entries
+        if excess > 0:
+            self.conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY last_access ASC LIMIT ?)",
+                (excess,)
+            )
+        self.stats["evictions"] += expired + max(0, excess)
+        self.entries = self.conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    # --- per-key locking ---
+
+    def _acquire_key(self, key: str) -> threading.Lock:
+        with self.lock:
+            entry = self.key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        entry[0].acquire()
+        return entry[0]
+
+    def _release_key(self, key: str):
+        with self.lock:
+            entry = self.key_locks[key]
+            entry[0].release()
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self.key_locks[key]
+
+    # --- read-through ---
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Tuple[Any, str]:
+        """
+        The cached value of key, computing and storing it on a miss.
+        Returns (value, "fresh" | "stale" | "computed").
+        """
+        value, state = self.lookup(key)
+        if state == "fresh":
+            with self.lock:
+                self.stats["hits"] += 1
+            return value, state
+        if state == "stale":
+            with self.lock:
+                self.stats["stale_hits"] += 1
+            self._refresh_in_background(key, compute)
+            return value, state
+
+        self._acquire_key(key)
+        try:
+            # Another thread may have computed it while we waited for the key
+            value, state = self.lookup(key)
+            if state is not None:
+                with self.lock:
+                    self.stats["coalesced"] += 1
+                return value, state
+            with self.lock:
+                self.stats["misses"] += 1
+            value = compute()
+            self.store(key, value)
+            return value, "computed"
+        finally:
+            self._release_key(key)
+
+    def _refresh_in_background(self, key: str, compute: Callable[[], Any]):
+        with self.lock:
+            if key in self.refreshing:
+                return
+            self.refreshing.add(key)
+
+        def refresh():
+            self._acquire_key(key)
+            try:
+                self.store(key, compute())
+                with self.lock:
+                    self.stats["refreshes"] += 1
+            except Exception as e:
+                print(f"⚠️ Background refresh of {self.table} entry failed: {e}")
+                with self.lock:
+                    self.stats["refresh_errors"] += 1
+            finally:
+                self._release_key(key)
+                with self.lock:
+                    self.refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True, name=f"{self.table}-refresh").start()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = dict(self.stats)
+            stats["refreshing"] = len(self.refreshing)
+        served = stats["hits"] + stats["stale_hits"] + stats["coalesced"]
+        total = served + stats["misses"]
+        stats["hit_ratio"] = round(served / total, 3) if total else 0
+        stats["entries"] = self.entries
+        stats["max_entries"] = self.max_entries
+        stats["ttl_seconds"] = self.ttl
+        stats["stale_seconds"] = self.stale_seconds
+        return stats
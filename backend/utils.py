@@ -1,4 +1,8 @@
-from urllib.parse import urlparse
+import re
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+# Query parameters that never change which article a URL points to
+TRACKING_PARAMS = {"m", "fbclid", "gclid", "ref", "amp"}
 
 def get_favicon_url(url: str) -> str:
     """Get favicon URL using Google's service."""
@@ -19,3 +23,34 @@ def get_domain_name(url: str) -> str:
         return domain[4:] if domain.startswith('www.') else domain
     except:
         return "Unknown"
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize an article URL for de-duplication: https, lowercase host without
+    www./default port, no fragment, tracking params (utm_*, ?m=1, ...) dropped.
+    """
+    try:
+        parsed = urlparse(url.strip())
+        host = (parsed.hostname or "").lower()
+        if host.startswith("www."):
+            host = host[4:]
+        if parsed.port and parsed.port not in (80, 443):
+            host = f"{host}:{parsed.port}"
+        query = sorted(
+            (k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+            if k.lower() not in TRACKING_PARAMS and not k.lower().startswith("utm_")
+        )
+        path = parsed.path or "/"
+        if len(path) > 1:
+            path = path.rstrip("/")
+        return urlunparse(("https", host, path, "", urlencode(query), ""))
+    except Exception:
+        return url
+
+
+def title_from_url(url: str) -> str:
+    """Readable placeholder title from a URL slug ('.../new-botnet-hits.html' -> 'New botnet hits')."""
+    slug = urlparse(url).path.rstrip("/").rsplit("/", 1)[-1]
+    slug = re.sub(r"\.\w+$", "", slug).replace("-", " ").replace("_", " ").strip()
+    return slug[:1].upper() + slug[1:] if slug else url